@@ -40,7 +40,7 @@ SOFTWARE.
 
 __version__ = "0.2.0"
 
-from ._base import no_processing, load_data
+from ._base import no_processing, load_data, DataReader
 from ._utils import (
     # random_guess,
     # random_index,
@@ -165,6 +165,7 @@ from ._hpo import (
 
 __all__ = [
     "load_data",  # _base
+    "DataReader",
     "no_processing",
     "random_guess",  # _utils
     "random_index",
@@ -44,7 +44,7 @@ import warnings
 
 from My_AutoML._utils._data import is_imbalance
 from ._over_sampling import Smote
-from ._under_sampling import TomekLink, EditedNearestNeighbor
+from ._under_sampling import NeighborIndex, TomekLink, EditedNearestNeighbor
 
 """
 Reference for: Simple Random Over Sampling, Simple Random Under Sampling, Tomek Link, \
@@ -60,6 +60,26 @@ class Smote_TomekLink(Smote, TomekLink):
 
     """
     Run Smote then run Tomek Link to balance dataset
+
+    Parameters
+    ----------
+    imbalance_threshold: determine to what extent will the data be considered as imbalanced data, default = 0.9
+
+    norm: how the distance between different samples calculated, default = 'l2'
+    all supported norm ['l1', 'l2']
+
+    all: whether to stop until all features are balanced, default = False
+
+    max_iter: Maximum number of iterations for over-/under-sampling, default = 1000
+
+    seed: random seed, default = 1
+
+    k: number of nearest neighbors, default = 5
+
+    generation: how to generation new sample, default = 'mean'
+    use link sample and random sample to generate the new sample
+
+    n_jobs: number of jobs to run the neighbor queries, default = 1
     """
 
     def __init__(
@@ -71,6 +91,7 @@ class Smote_TomekLink(Smote, TomekLink):
         seed=1,
         k=5,
         generation="mean",
+        n_jobs=1,
     ):
         self.imbalance_threshold = imbalance_threshold
         self.norm = norm
@@ -79,6 +100,7 @@ class Smote_TomekLink(Smote, TomekLink):
         self.seed = seed
         self.k = k
         self.generation = generation
+        self.n_jobs = n_jobs
 
         self._fitted = False  # whether the model has been fitted
 
@@ -101,28 +123,18 @@ class Smote_TomekLink(Smote, TomekLink):
             data = X
 
         _data = data.copy(deep=True)
+
         if not is_imbalance(_data, self.imbalance_threshold):
             warnings.warn("The dataset is balanced, no change.")
         else:
-            super().__init__(
-                imbalance_threshold=(1.0 + self.imbalance_threshold) / 2,
-                norm=self.norm,
-                all=self.all,
-                max_iter=self.max_iter,
-                seed=self.seed,
-                k=self.k,
-                generation=self.generation,
-            )
-            _data = super().fit_transform(_data)
-
-            super(Smote, self).__init__(
-                imbalance_threshold=self.imbalance_threshold,
-                norm=self.norm,
-                all=self.all,
-                max_iter=self.max_iter,
-                seed=self.seed,
-            )
-            _data = super(Smote, self).fit_transform(_data)
+            if self.all == True:
+                while is_imbalance(_data, self.imbalance_threshold):
+                    _n = len(_data)
+                    _data = self._fit_transform(_data)
+                    if len(_data) == _n:  # no sample can be added or removed
+                        break
+            else:
+                _data = self._fit_transform(_data)
 
         self._fitted = True
 
@@ -131,11 +143,52 @@ class Smote_TomekLink(Smote, TomekLink):
         else:
             return _data
 
+    def _fit_transform(self, X):
+
+        # over-sample by Smote to the intermediate threshold
+        X = Smote._fit_transform(
+            self, X, threshold=(1.0 + self.imbalance_threshold) / 2
+        )
+
+        _imbalanced_feature, _ = is_imbalance(X, self.imbalance_threshold, value=True)
+        if _imbalanced_feature is None:
+            return X
+
+        # one neighbor index of the over-sampled data for Tomek Link
+        index = NeighborIndex(
+            X.loc[:, X.columns != _imbalanced_feature], self.norm, self.n_jobs
+        )
+        TomekLink._select(
+            self, X, index, _imbalanced_feature, self.imbalance_threshold
+        )
+
+        return X.iloc[np.where(index.alive)[0]].reset_index(drop=True)
+
 
 class Smote_ENN(Smote, EditedNearestNeighbor):
 
     """
     Run Smote then run ENN to balance dataset
+
+    Parameters
+    ----------
+    imbalance_threshold: determine to what extent will the data be considered as imbalanced data, default = 0.9
+
+    norm: how the distance between different samples calculated, default = 'l2'
+    all supported norm ['l1', 'l2']
+
+    all: whether to stop until all features are balanced, default = False
+
+    max_iter: Maximum number of iterations for over-/under-sampling, default = 1000
+
+    seed: random seed, default = 1
+
+    k: number of nearest neighbors, default = 5
+
+    generation: how to generation new sample, default = 'mean'
+    use link sample and random sample to generate the new sample
+
+    n_jobs: number of jobs to run the neighbor queries, default = 1
     """
 
     def __init__(
@@ -147,6 +200,7 @@ class Smote_ENN(Smote, EditedNearestNeighbor):
         seed=1,
         k=5,
         generation="mean",
+        n_jobs=1,
     ):
         self.imbalance_threshold = imbalance_threshold
         self.norm = norm
@@ -155,6 +209,7 @@ class Smote_ENN(Smote, EditedNearestNeighbor):
         self.seed = seed
         self.k = k
         self.generation = generation
+        self.n_jobs = n_jobs
 
         self._fitted = False  # whether the model has been fitted
 
@@ -181,25 +236,14 @@ class Smote_ENN(Smote, EditedNearestNeighbor):
         if not is_imbalance(_data, self.imbalance_threshold):
             warnings.warn("The dataset is balanced, no change.")
         else:
-            super().__init__(
-                imbalance_threshold=(1.0 + self.imbalance_threshold) / 2,
-                norm=self.norm,
-                all=self.all,
-                max_iter=self.max_iter,
-                seed=self.seed,
-                k=self.k,
-                generation=self.generation,
-            )
-            _data = super().fit_transform(_data)
-
-            super(Smote, self).__init__(
-                imbalance_threshold=self.imbalance_threshold,
-                all=self.all,
-                max_iter=self.max_iter,
-                seed=self.seed,
-                k=self.k,
-            )
-            _data = super(Smote, self).fit_transform(_data)
+            if self.all == True:
+                while is_imbalance(_data, self.imbalance_threshold):
+                    _n = len(_data)
+                    _data = self._fit_transform(_data)
+                    if len(_data) == _n:  # no sample can be added or removed
+                        break
+            else:
+                _data = self._fit_transform(_data)
 
         self._fitted = True
 
@@ -207,3 +251,24 @@ class Smote_ENN(Smote, EditedNearestNeighbor):
             return _data[features], _data[response]
         else:
             return _data
+
+    def _fit_transform(self, X):
+
+        # over-sample by Smote to the intermediate threshold
+        X = Smote._fit_transform(
+            self, X, threshold=(1.0 + self.imbalance_threshold) / 2
+        )
+
+        _imbalanced_feature, _ = is_imbalance(X, self.imbalance_threshold, value=True)
+        if _imbalanced_feature is None:
+            return X
+
+        # one neighbor index of the over-sampled data for ENN
+        index = NeighborIndex(
+            X.loc[:, X.columns != _imbalanced_feature], self.norm, self.n_jobs
+        )
+        EditedNearestNeighbor._select(
+            self, X, index, _imbalanced_feature, self.imbalance_threshold
+        )
+
+        return X.iloc[np.where(index.alive)[0]].reset_index(drop=True)
@@ -44,7 +44,7 @@ import warnings
 import sklearn
 import sklearn.utils
 
-from My_AutoML._utils._data import is_imbalance, LinkTable
+from My_AutoML._utils._data import is_imbalance
 
 """
 Reference for: Simple Random Over Sampling, Simple Random Under Sampling, Tomek Link, \
@@ -106,9 +106,11 @@ class SimpleRandomOverSampling:
             response = None
             data = X
 
-        _data = data.copy(deep=True)
+        # sampling selects rows by index, no need to copy the full data first
+        _data = data
         if not is_imbalance(_data, self.imbalance_threshold):
             warnings.warn("The dataset is balanced, no change.")
+            _data = data.copy(deep=True)
         else:
             if self.all == True:
                 while is_imbalance(_data, self.imbalance_threshold):
@@ -127,24 +129,37 @@ class SimpleRandomOverSampling:
         self, X
     ):  # using random over-sampling to balance the first imbalanced feature
 
-        features = list(X.columns)
+        # select rows by the sampled index once, no copy of every iteration
+        return X.iloc[self._get_index(X)].reset_index(drop=True)
+
+    # get positions of rows after over-sampling
+    def _get_index(self, X):
+
         _imbalanced_feature, _majority = is_imbalance(
             X, self.imbalance_threshold, value=True
         )
-        _seed = self.seed
-        _iter = 0
-
-        while (
-            is_imbalance(X[[_imbalanced_feature]], self.imbalance_threshold)
-            and _iter <= self.max_iter
-        ):
-            _minority_class = X.loc[X[_imbalanced_feature] != _majority]
-            X = pd.concat([X, _minority_class.sample(n=1, random_state=_seed)])
-            _seed += 1
-            _iter += 1
-        X = sklearn.utils.shuffle(X.reset_index(drop=True)).reset_index(drop=True)
+        _response = X[_imbalanced_feature].values
+
+        # number of minority samples needed to balance the feature
+        # every iteration draws one sample, at most max_iter + 1 samples
+        _n_new = int(
+            # round off floating errors before ceiling
+            np.ceil(
+                np.round(
+                    np.sum(_response == _majority) / self.imbalance_threshold - len(X),
+                    8,
+                )
+            )
+        )
+        _n_new = min(max(_n_new, 0), self.max_iter + 1)
 
-        return X
+        # draw all minority samples with replacement at once
+        rng = np.random.RandomState(self.seed)
+        _minority = np.where(_response != _majority)[0]
+        _index = np.concatenate([np.arange(len(X)), rng.choice(_minority, size=_n_new)])
+
+        # shuffle the rows
+        return rng.permutation(_index)
 
 
 class Smote:
@@ -172,6 +187,8 @@ class Smote:
 
     generation: how to generation new sample, default = 'mean'
     use link sample and random sample to generate the new sample
+
+    n_jobs: number of jobs to run the neighbor queries, default = 1
     """
 
     def __init__(
@@ -183,6 +200,7 @@ class Smote:
         seed=1,
         k=5,
         generation="mean",
+        n_jobs=1,
     ):
         self.imbalance_threshold = imbalance_threshold
         self.norm = norm
@@ -191,6 +209,7 @@ class Smote:
         self.seed = seed
         self.k = k
         self.generation = generation
+        self.n_jobs = n_jobs
 
         self._fitted = False  # whether the model has been fitted
 
@@ -229,43 +248,84 @@ class Smote:
         else:
             return _data
 
-    def _fit_transform(self, X):
-
-        _imbalanced_feature, _majority = is_imbalance(
-            X, self.imbalance_threshold, value=True
+    def _fit_transform(self, X, threshold=None):
+
+        from sklearn.neighbors import NearestNeighbors
+
+        threshold = self.imbalance_threshold if threshold is None else threshold
+
+        if self.generation not in ["mean", "random"]:
+            raise ValueError(
+                'Not recognizing generation method! Should be in \
+                ["mean", "random"], get {}'.format(
+                    self.generation
+                )
+            )
+
+        _imbalanced_feature, _majority = is_imbalance(X, threshold, value=True)
+        if _imbalanced_feature is None:
+            return X
+        _response = X[_imbalanced_feature].values
+        _values = X.values.astype(float)
+
+        # number of synthetic samples needed to balance the feature
+        # every iteration generates one sample, at most max_iter + 1 samples
+        _n_new = int(
+            # round off floating errors before ceiling
+            np.ceil(
+                np.round(
+                    np.sum(_response == _majority) / threshold - len(X),
+                    8,
+                )
+            )
+        )
+        _n_new = min(max(_n_new, 0), self.max_iter + 1)
+
+        # draw all random samples from the minority class at once
+        rng = np.random.RandomState(self.seed)
+        _minority = np.where(_response != _majority)[0]
+        _sample = rng.choice(_minority, size=_n_new)
+        _link = np.empty(_n_new, dtype=int)
+
+        # link samples are drawn from k nearest neighbors in the same class
+        for _class in np.unique(_response[_minority]):
+            _class_index = _minority[_response[_minority] == _class]
+            _draw = np.where(_response[_sample] == _class)[0]
+            if len(_draw) == 0:
+                continue
+            if len(_class_index) < 2:  # no neighbors, link to the sample itself
+                _link[_draw] = _sample[_draw]
+                continue
+
+            # k nearest neighbors of all class samples by one query, sample itself excluded
+            _k = min(self.k, len(_class_index) - 1)
+            _k_nearest = (
+                NearestNeighbors(
+                    n_neighbors=_k,
+                    metric="manhattan" if self.norm == "l1" else "euclidean",
+                    n_jobs=self.n_jobs,
+                )
+                .fit(_values[_class_index])
+                .kneighbors(return_distance=False)
+            )
+            _position = np.searchsorted(_class_index, _sample[_draw])
+            _link[_draw] = _class_index[
+                _k_nearest[_position, rng.randint(0, _k, size=len(_draw))]
+            ]
+
+        # generate all synthetic samples at once
+        if self.generation == "mean":
+            _new = (_values[_sample] + _values[_link]) / 2
+        elif self.generation == "random":
+            _new = _values[_sample] + rng.rand(_n_new, 1) * (
+                _values[_link] - _values[_sample]
+            )
+
+        _dtype = X[_imbalanced_feature].dtype
+        X = pd.concat(
+            [X, pd.DataFrame(_new, columns=X.columns)], axis=0, ignore_index=True
         )
-        _seed = self.seed
-        _iter = 0
-
-        while (
-            is_imbalance(X[[_imbalanced_feature]], self.imbalance_threshold)
-            and _iter <= self.max_iter
-        ):
-            _minority_class = X.loc[X[_imbalanced_feature] != _majority]
-            _sample = _minority_class.sample(n=1, random_state=_seed)
-            _link_table = LinkTable(_sample, X, self.norm)
-            for _link_item in _link_table:
-                _k_nearest = [
-                    _link_item.index(item)
-                    for item in sorted(_link_item)[1 : (self.k + 1)]
-                ]
-                _link = _k_nearest[np.random.randint(0, len(_k_nearest))]
-                if self.generation == "mean":
-                    X.loc[len(X), :] = X.loc[
-                        [_sample.index[0], X.index[_link]], :
-                    ].mean()
-                elif self.generation == "random":
-                    X.loc[len(X), :] = X.loc[_sample.index, :] + np.random.rand() * (
-                        X.loc[X.index[_link], :] - X.lox[_sample.index, :]
-                    )
-                else:
-                    raise ValueError(
-                        'Not recognizing generation method! Should be in \
-                        ["mean", "random"], get {}'.format(
-                            self.generation
-                        )
-                    )
-            _seed += 1
-            _iter += 1
+        # synthetic samples keep the class of the minority sample
+        X[_imbalanced_feature] = X[_imbalanced_feature].astype(_dtype)
 
         return X
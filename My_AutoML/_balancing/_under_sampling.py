@@ -44,7 +44,7 @@ import warnings
 import sklearn
 import sklearn.utils
 
-from My_AutoML._utils._data import is_imbalance, LinkTable
+from My_AutoML._utils._data import is_imbalance
 
 """
 Reference for: Simple Random Over Sampling, Simple Random Under Sampling, Tomek Link, \
@@ -56,6 +56,159 @@ balancing machine learning training data. ACM SIGKDD explorations newsletter, 6(
 """
 
 
+# number of majority samples to remove so the proportion of majority class
+# is not larger than threshold
+def _drop_count(n_majority, n, threshold):
+
+    if threshold >= 1:
+        return 0
+
+    # round off floating errors before ceiling
+    return max(
+        int(np.ceil(np.round((n_majority - threshold * n) / (1 - threshold), 8))), 0
+    )
+
+
+class NeighborIndex:
+
+    """
+    Nearest neighbor index fitted once on the data and shared by the under-sampling methods,
+    removed samples are masked out, the index is only refitted when many samples are removed
+
+    Parameters
+    ----------
+    data: features to find the nearest neighbors
+
+    norm: how the distance between different samples calculated, default = 'l2'
+    all supported norm ['l1', 'l2']
+
+    n_jobs: number of jobs to run the neighbor queries, default = 1
+    """
+
+    def __init__(self, data, norm="l2", n_jobs=1):
+
+        if norm not in ["l1", "l2"]:
+            raise ValueError(
+                'Not recognizing norm! Should be in ["l1", "l2"], get {}'.format(norm)
+            )
+
+        self.data = np.asarray(data, dtype=float)
+        self.norm = norm
+        self.n_jobs = n_jobs
+        self.alive = np.ones(len(self.data), dtype=bool)  # samples not removed
+
+        self._rows = np.arange(len(self.data))  # samples the index fitted on
+        self._model = self._get_model().fit(self.data)
+        # cached k nearest neighbors of samples, and mask of samples need to update
+        self._cache = {}
+
+    def _get_model(self):
+
+        from sklearn.neighbors import NearestNeighbors
+
+        return NearestNeighbors(
+            metric="manhattan" if self.norm == "l1" else "euclidean",
+            n_jobs=self.n_jobs,
+        )
+
+    def remove(self, positions):
+
+        self.alive[positions] = False
+
+        # samples with removed neighbors need to update cached neighbors
+        _removed = np.zeros(len(self.data), dtype=bool)
+        _removed[positions] = True
+        for _neighbors, _stale in self._cache.values():
+            _stale |= _removed[_neighbors].any(axis=1)
+
+    # k nearest neighbors of samples, at default, all samples not removed
+    # only samples whose cached neighbors have been removed are queried again
+    def neighbors(self, k=1, positions=None):
+
+        positions = (
+            np.where(self.alive)[0]
+            if positions is None
+            else np.asarray(positions, dtype=int)
+        )
+        k = int(min(k, max(self.alive.sum() - 1, 0)))
+        if k not in self._cache:
+            self._cache[k] = (
+                np.zeros((len(self.data), k), dtype=int),
+                np.ones(len(self.data), dtype=bool),
+            )
+
+        _neighbors, _stale = self._cache[k]
+        _query = positions[_stale[positions]]
+        _neighbors[_query] = self.query(_query, k=k)
+        _stale[_query] = False
+
+        return _neighbors[positions]
+
+    def query(self, positions, k=1, candidates=None):
+
+        """
+        Parameters
+        ----------
+        positions: positions of samples to find k nearest neighbors, sample itself excluded
+
+        k: number of nearest neighbors, default = 1
+
+        candidates: mask of samples can be neighbors, default = None
+        if None, all samples not removed can be neighbors
+
+        Returns
+        -------
+        positions of k nearest neighbors, ordered by distance
+        """
+
+        positions = np.asarray(positions, dtype=int)
+        _allowed = self.alive if candidates is None else (self.alive & candidates)
+        k = int(min(k, max(_allowed.sum() - 1, 0)))
+        _neighbors = np.zeros((len(positions), k), dtype=int)
+        if len(positions) == 0 or k == 0:
+            return _neighbors
+
+        # few candidates, search in a small index of candidates
+        if _allowed.sum() < self.alive.sum() / 2:
+            _candidates = np.where(_allowed)[0]
+            _, _index = (
+                self._get_model()
+                .fit(self.data[_candidates])
+                .kneighbors(
+                    self.data[positions], n_neighbors=min(k + 1, len(_candidates))
+                )
+            )
+            _index = _candidates[_index]
+            _valid = _index != positions[:, None]
+            _order = np.argsort(~_valid, axis=1, kind="stable")[:, :k]
+            return np.take_along_axis(_index, _order, axis=1)
+
+        # many samples removed, refit the index on samples not removed
+        if self.alive[self._rows].mean() < 0.9:
+            self._rows = np.where(self.alive)[0]
+            self._model = self._get_model().fit(self.data[self._rows])
+
+        # query more neighbors until k allowed neighbors found for every sample
+        _todo = np.arange(len(positions))
+        _n_query = k + 1
+        while len(_todo) > 0:
+            _n_query = min(_n_query, len(self._rows))
+            _, _index = self._model.kneighbors(
+                self.data[positions[_todo]], n_neighbors=_n_query
+            )
+            _index = self._rows[_index]
+            _valid = _allowed[_index] & (_index != positions[_todo, None])
+            _enough = (_valid.sum(axis=1) >= k) | (_n_query == len(self._rows))
+            _order = np.argsort(~_valid[_enough], axis=1, kind="stable")[:, :k]
+            _neighbors[_todo[_enough]] = np.take_along_axis(
+                _index[_enough], _order, axis=1
+            )
+            _todo = _todo[~_enough]
+            _n_query *= 2
+
+        return _neighbors
+
+
 class SimpleRandomUnderSampling:
 
     """
@@ -106,9 +259,11 @@ class SimpleRandomUnderSampling:
             response = None
             data = X
 
-        _data = data.copy(deep=True)
+        # sampling selects rows by index, no need to copy the full data first
+        _data = data
         if not is_imbalance(_data, self.imbalance_threshold):
             warnings.warn("The dataset is balanced, no change.")
+            _data = data.copy(deep=True)
         else:
             if self.all == True:
                 while is_imbalance(_data, self.imbalance_threshold):
@@ -125,27 +280,32 @@ class SimpleRandomUnderSampling:
 
     def _fit_transform(
         self, X
-    ):  # using random over-sampling to balance the first imbalanced feature
+    ):  # using random under-sampling to balance the first imbalanced feature
+
+        # select rows by the sampled index once, no copy of every iteration
+        return X.iloc[self._get_index(X)].reset_index(drop=True)
+
+    # get positions of rows after under-sampling
+    def _get_index(self, X):
 
-        features = list(X.columns)
         _imbalanced_feature, _majority = is_imbalance(
             X, self.imbalance_threshold, value=True
         )
-        _seed = self.seed
-        _iter = 0
+        _response = X[_imbalanced_feature].values
+        _majority_index = np.where(_response == _majority)[0]
 
-        while (
-            is_imbalance(X[[_imbalanced_feature]], self.imbalance_threshold)
-            and _iter <= self.max_iter
-        ):
-            _majority_class = X.loc[X[_imbalanced_feature] == _majority]
-            sample = _majority_class.sample(n=1, random_state=_seed)
-            X = X.drop(sample.index)
-            _seed += 1
-            _iter += 1
-        X = sklearn.utils.shuffle(X.reset_index(drop=True)).reset_index(drop=True)
+        # number of majority samples to remove to balance the feature
+        # every iteration removes one sample, at most max_iter + 1 samples
+        _n_drop = _drop_count(len(_majority_index), len(X), self.imbalance_threshold)
+        _n_drop = min(_n_drop, self.max_iter + 1, len(_majority_index))
+
+        # draw all majority samples to remove without replacement at once
+        rng = np.random.RandomState(self.seed)
+        _keep = np.ones(len(X), dtype=bool)
+        _keep[rng.choice(_majority_index, size=_n_drop, replace=False)] = False
 
-        return X
+        # shuffle the rows
+        return rng.permutation(np.where(_keep)[0])
 
 
 class TomekLink:
@@ -167,16 +327,25 @@ class TomekLink:
 
     seed: random seed, default = 1
     every random draw from the majority class will increase the random seed by 1
+
+    n_jobs: number of jobs to run the neighbor queries, default = 1
     """
 
     def __init__(
-        self, imbalance_threshold=0.9, norm="l2", all=False, max_iter=1000, seed=1
+        self,
+        imbalance_threshold=0.9,
+        norm="l2",
+        all=False,
+        max_iter=1000,
+        seed=1,
+        n_jobs=1,
     ):
         self.imbalance_threshold = imbalance_threshold
         self.norm = norm
         self.all = all
         self.max_iter = max_iter
         self.seed = seed
+        self.n_jobs = n_jobs
 
         self._fitted = False  # whether the model has been fitted
 
@@ -204,7 +373,10 @@ class TomekLink:
         else:
             if self.all == True:
                 while is_imbalance(_data, self.imbalance_threshold):
+                    _n = len(_data)
                     _data = self._fit_transform(_data)
+                    if len(_data) == _n:  # no sample can be removed
+                        break
             else:
                 _data = self._fit_transform(_data)
 
@@ -217,35 +389,53 @@ class TomekLink:
 
     def _fit_transform(self, X):
 
-        _imbalanced_feature, _majority = is_imbalance(
-            X, self.imbalance_threshold, value=True
+        _imbalanced_feature, _ = is_imbalance(X, self.imbalance_threshold, value=True)
+
+        # neighbors are found by features except the imbalanced one
+        index = NeighborIndex(
+            X.loc[:, X.columns != _imbalanced_feature], self.norm, self.n_jobs
         )
-        _seed = self.seed
+        self._select(X, index, _imbalanced_feature, self.imbalance_threshold)
+
+        return X.iloc[np.where(index.alive)[0]].reset_index(drop=True)
+
+    # remove samples from the index, X is the data the index fitted on
+    def _select(self, X, index, feature, threshold):
+
+        _response = X[feature].values
         _iter = 0
 
-        while (
-            is_imbalance(X[[_imbalanced_feature]], self.imbalance_threshold)
-            and _iter <= self.max_iter
-        ):
-            _minority_class = X.loc[X[_imbalanced_feature] != _majority]
-            _minority_sample = _minority_class.sample(
-                n=max(int(len(_minority_class) / 100), 1), random_state=_seed
+        while _iter <= self.max_iter:
+            _alive = np.where(index.alive)[0]
+            _imbalanced_feature, _majority = is_imbalance(
+                X[[feature]].iloc[_alive], threshold, value=True
+            )
+            if _imbalanced_feature is None:
+                break
+
+            # nearest neighbors of all minority samples by one batched query
+            _minority = _alive[_response[_alive] != _majority]
+            _nearest = index.neighbors(k=1, positions=_minority)[:, 0]
+            # if nearest of minority sample is the majority class, they form a Tomek link
+            _link = _response[_nearest] == _majority
+            _distance = np.linalg.norm(
+                index.data[_minority[_link]] - index.data[_nearest[_link]],
+                ord=1 if index.norm == "l1" else 2,
+                axis=1,
             )
-            _link_table = LinkTable(_minority_sample, X, self.norm)
-            drop_index = []
-            for _link_item in _link_table:
-                _nearest = _link_item.index(
-                    sorted(_link_item)[1]
-                )  # since the closest will always be the sample itself
-                # if nearest is the majority class, add to drop_index
-                if X.loc[_nearest, _imbalanced_feature] == _majority:
-                    drop_index.append(_nearest)
-                drop_index = list(set(drop_index))  # get unique drop indexes
-            X = X.drop(index=drop_index, axis=0).reset_index(drop=True)
-            _seed += 1
+            # remove majority samples of the closest links, only as many as needed
+            _drop = pd.unique(_nearest[_link][np.argsort(_distance, kind="stable")])
+            _drop = _drop[
+                : _drop_count(
+                    np.sum(_response[_alive] == _majority), len(_alive), threshold
+                )
+            ]
+            if len(_drop) == 0:
+                break
+            index.remove(_drop)
             _iter += 1
 
-        return X
+        return index
 
 
 class EditedNearestNeighbor:
@@ -269,6 +459,8 @@ class EditedNearestNeighbor:
     every random draw from the majority class will increase the random seed by 1
 
     k: nearest neighbors to find, default = 3
+
+    n_jobs: number of jobs to run the neighbor queries, default = 1
     """
 
     def __init__(
@@ -279,6 +471,7 @@ class EditedNearestNeighbor:
         max_iter=1000,
         seed=1,
         k=3,
+        n_jobs=1,
     ):
         self.imbalance_threshold = imbalance_threshold
         self.norm = norm
@@ -286,6 +479,7 @@ class EditedNearestNeighbor:
         self.max_iter = max_iter
         self.seed = seed
         self.k = k
+        self.n_jobs = n_jobs
 
         self._fitted = False  # whether the model has been fitted
 
@@ -321,7 +515,10 @@ class EditedNearestNeighbor:
         else:
             if self.all == True:
                 while is_imbalance(_data, self.imbalance_threshold):
+                    _n = len(_data)
                     _data = self._fit_transform(_data)
+                    if len(_data) == _n:  # no sample can be removed
+                        break
             else:
                 _data = self._fit_transform(_data)
 
@@ -334,52 +531,58 @@ class EditedNearestNeighbor:
 
     def _fit_transform(self, X):
 
-        _imbalanced_feature, _majority = is_imbalance(
-            X, self.imbalance_threshold, value=True
+        _imbalanced_feature, _ = is_imbalance(X, self.imbalance_threshold, value=True)
+
+        # neighbors are found by features except the imbalanced one
+        index = NeighborIndex(
+            X.loc[:, X.columns != _imbalanced_feature], self.norm, self.n_jobs
         )
-        _seed = self.seed
+        self._select(X, index, _imbalanced_feature, self.imbalance_threshold)
+
+        return X.iloc[np.where(index.alive)[0]].reset_index(drop=True)
+
+    # remove samples from the index, X is the data the index fitted on
+    def _select(self, X, index, feature, threshold):
+
+        _response = X[feature].values
         _iter = 0
 
-        while (
-            is_imbalance(X[[_imbalanced_feature]], self.imbalance_threshold)
-            and _iter <= self.max_iter
-        ):
-            _majority_class = X.loc[X[_imbalanced_feature] == _majority]
-            _majority_index = _majority_class.index
-            _sample = X.sample(n=1, random_state=_seed)
-            _sample_type = (
-                "majority" if (_sample.index[0] in _majority_index) else "minority"
+        while _iter <= self.max_iter:
+            _alive = np.where(index.alive)[0]
+            _imbalanced_feature, _majority = is_imbalance(
+                X[[feature]].iloc[_alive], threshold, value=True
             )
-            _link_table = LinkTable(_sample, X, self.norm)
-            for _link_item in _link_table:
-                _k_nearest = [
-                    _link_item.index(item)
-                    for item in sorted(_link_item)[1 : (self.k + 1)]
-                ]
-                count = 0
-                for _index in _k_nearest:
-                    _class = "majority" if (_index in _majority_index) else "minority"
-                    if _class == _sample_type:
-                        count += 1
-                if count < (self.k + 1) / 2:
-                    # if sample belongs to majority, remove the sample; else, remove the nearest neighbor
-                    if _sample_type == "majority":
-                        X = X.drop(_sample.index).reset_index(drop=True)
-                    else:
-                        X = X.drop(_link_item.index(sorted(_link_item)[1])).reset_index(
-                            drop=True
-                        )
-            _seed += 1
-            _iter += 1
-
-            if len(_majority_class) == len(X):
-                warnings.warn("No minority class left!")
+            if _imbalanced_feature is None:
                 break
 
-            if len(X) < 1:
-                warnings.warn("No sample left!")
+            # k nearest neighbors of all samples by one batched query
+            _k_nearest = index.neighbors(k=self.k, positions=_alive)
+            _count = np.sum(
+                _response[_k_nearest] == _response[_alive][:, None], axis=1
+            )
+            _disagree = _count < (_k_nearest.shape[1] + 1) / 2
 
-        return X
+            # if sample belongs to majority, remove the sample; else, remove the nearest neighbor
+            _is_majority = _response[_alive] == _majority
+            _candidate = np.where(
+                _is_majority, _alive, _k_nearest[:, 0] if _k_nearest.shape[1] else -1
+            )
+            _candidate = _candidate[_disagree]
+            _strength = _count[_disagree]
+            # only majority samples are removed, the most disagreed first
+            _keep = (_candidate >= 0) & (_response[_candidate] == _majority)
+            _drop = pd.unique(
+                _candidate[_keep][np.argsort(_strength[_keep], kind="stable")]
+            )
+            _drop = _drop[
+                : _drop_count(np.sum(_is_majority), len(_alive), threshold)
+            ]
+            if len(_drop) == 0:
+                break
+            index.remove(_drop)
+            _iter += 1
+
+        return index
 
 
 class CondensedNearestNeighbor:
@@ -400,13 +603,18 @@ class CondensedNearestNeighbor:
 
     seed: random seed, default = 1
     every random draw from the majority class will increase the random seed by 1
+
+    n_jobs: number of jobs to run the neighbor queries, default = 1
     """
 
-    def __init__(self, imbalance_threshold=0.9, all=False, max_iter=1000, seed=1):
+    def __init__(
+        self, imbalance_threshold=0.9, all=False, max_iter=1000, seed=1, n_jobs=1
+    ):
         self.imbalance_threshold = imbalance_threshold
         self.all = all
         self.max_iter = max_iter
         self.seed = seed
+        self.n_jobs = n_jobs
 
         self._fitted = False  # whether the model has been fitted
 
@@ -434,7 +642,10 @@ class CondensedNearestNeighbor:
         else:
             if self.all == True:
                 while is_imbalance(_data, self.imbalance_threshold):
+                    _n = len(_data)
                     _data = self._fit_transform(_data)
+                    if len(_data) == _n:  # no sample can be removed
+                        break
             else:
                 _data = self._fit_transform(_data)
 
@@ -447,44 +658,47 @@ class CondensedNearestNeighbor:
 
     def _fit_transform(self, X):
 
-        from sklearn.neighbors import KNeighborsClassifier
+        _imbalanced_feature, _ = is_imbalance(X, self.imbalance_threshold, value=True)
 
-        _imbalanced_feature, _majority = is_imbalance(
-            X, self.imbalance_threshold, value=True
+        # neighbors are found by features except the imbalanced one
+        index = NeighborIndex(
+            X.loc[:, X.columns != _imbalanced_feature], "l2", self.n_jobs
         )
-        _seed = self.seed
+        self._select(X, index, _imbalanced_feature, self.imbalance_threshold)
+
+        return X.iloc[np.where(index.alive)[0]].reset_index(drop=True)
+
+    # remove samples from the index, X is the data the index fitted on
+    def _select(self, X, index, feature, threshold):
+
+        _response = X[feature].values
+        rng = np.random.RandomState(self.seed)
         _iter = 0
 
-        while (
-            is_imbalance(X[[_imbalanced_feature]], self.imbalance_threshold)
-            and _iter <= self.max_iter
-        ):
-            _minority_class = X.loc[X[_imbalanced_feature] != _majority]
-            _majority_class = X.loc[X[_imbalanced_feature] == _majority]
-            _subset = pd.concat(
-                [_minority_class, _majority_class.sample(n=1, random_state=_seed)]
-            ).reset_index(drop=True)
-            neigh = KNeighborsClassifier(n_neighbors=1)
-            neigh.fit(
-                _subset.loc[:, _subset.columns != _imbalanced_feature],
-                _subset[_imbalanced_feature],
-            )
-            y_predict = neigh.predict(
-                X.loc[
-                    ~X.index.isin(list(_subset.index)), X.columns != _imbalanced_feature
-                ]
-            )
-            y_true = X.loc[
-                ~X.index.isin(list(_subset.index)), X.columns == _imbalanced_feature
-            ].values.T[0]
-            _not_matching_index = np.where((np.array(y_predict) != np.array(y_true)))[0]
-            X = pd.concat([_subset, X.iloc[_not_matching_index, :]]).reset_index(
-                drop=True
+        while _iter <= self.max_iter:
+            _alive = np.where(index.alive)[0]
+            _imbalanced_feature, _majority = is_imbalance(
+                X[[feature]].iloc[_alive], threshold, value=True
             )
-            _seed += 1
+            if _imbalanced_feature is None:
+                break
+
+            # subset of all minority samples and one random majority sample
+            _subset = np.zeros(len(index.data), dtype=bool)
+            _subset[_alive[_response[_alive] != _majority]] = True
+            _subset[rng.choice(_alive[_response[_alive] == _majority])] = True
+
+            # predict all other samples by 1-NN of the subset
+            _rest = _alive[~_subset[_alive]]
+            _nearest = index.query(_rest, k=1, candidates=_subset)[:, 0]
+            # misclassified samples are put to the subset, others removed
+            _drop = _rest[_response[_nearest] == _response[_rest]]
+            if len(_drop) == 0:
+                break
+            index.remove(_drop)
             _iter += 1
 
-        return X
+        return index
 
 
 class OneSidedSelection(TomekLink, CondensedNearestNeighbor):
@@ -507,64 +721,44 @@ class OneSidedSelection(TomekLink, CondensedNearestNeighbor):
 
     seed: random seed, default = 1
     every random draw from the majority class will increase the random seed by 1
+
+    n_jobs: number of jobs to run the neighbor queries, default = 1
     """
 
     def __init__(
-        self, imbalance_threshold=0.9, norm="l2", all=False, max_iter=1000, seed=1
+        self,
+        imbalance_threshold=0.9,
+        norm="l2",
+        all=False,
+        max_iter=1000,
+        seed=1,
+        n_jobs=1,
     ):
         self.imbalance_threshold = imbalance_threshold
         self.norm = norm
         self.all = all
         self.max_iter = max_iter
         self.seed = seed
+        self.n_jobs = n_jobs
 
         self._fitted = False  # whether the model has been fitted
 
-    def fit_transform(self, X, y=None):
+    def _fit_transform(self, X):
 
-        try:  # if missing y, will be None value; or will be dataframe, use df.empty for judge
-            _empty = y.empty
-        except AttributeError:
-            _empty = y == None
+        _imbalanced_feature, _ = is_imbalance(X, self.imbalance_threshold, value=True)
 
-        if (
-            not _empty
-        ):  # if no y input, only convert X; or, combine X and y to consider balancing
-            features = list(X.columns)
-            response = list(y.columns)
-            data = pd.concat([X, y], axis=1)
-        else:
-            features = list(X.columns)
-            response = None
-            data = X
-
-        _data = data.copy(deep=True)
-        if not is_imbalance(_data, self.imbalance_threshold):
-            warnings.warn("The dataset is balanced, no change.")
-        else:
-            super().__init__(
-                imbalance_threshold=(1.0 + self.imbalance_threshold) / 2,
-                norm=self.norm,
-                all=self.all,
-                max_iter=self.max_iter,
-                seed=self.seed,
-            )
-            _data = super().fit_transform(_data)
+        # one neighbor index shared by Tomek Link and CNN
+        index = NeighborIndex(
+            X.loc[:, X.columns != _imbalanced_feature], self.norm, self.n_jobs
+        )
+        TomekLink._select(
+            self, X, index, _imbalanced_feature, (1.0 + self.imbalance_threshold) / 2
+        )
+        CondensedNearestNeighbor._select(
+            self, X, index, _imbalanced_feature, self.imbalance_threshold
+        )
 
-            super(TomekLink, self).__init__(
-                imbalance_threshold=self.imbalance_threshold,
-                all=self.all,
-                max_iter=self.max_iter,
-                seed=self.seed,
-            )
-            _data = super(TomekLink, self).fit_transform(_data)
-
-        self._fitted = True
-
-        if not _empty:
-            return _data[features], _data[response]
-        else:
-            return _data
+        return X.iloc[np.where(index.alive)[0]].reset_index(drop=True)
 
 
 class CNN_TomekLink(CondensedNearestNeighbor, TomekLink):
@@ -587,61 +781,41 @@ class CNN_TomekLink(CondensedNearestNeighbor, TomekLink):
 
     seed: random seed, default = 1
     every random draw from the majority class will increase the random seed by 1
+
+    n_jobs: number of jobs to run the neighbor queries, default = 1
     """
 
     def __init__(
-        self, imbalance_threshold=0.9, norm="l2", all=False, max_iter=1000, seed=1
+        self,
+        imbalance_threshold=0.9,
+        norm="l2",
+        all=False,
+        max_iter=1000,
+        seed=1,
+        n_jobs=1,
     ):
         self.imbalance_threshold = imbalance_threshold
         self.norm = norm
         self.all = all
         self.max_iter = max_iter
         self.seed = seed
+        self.n_jobs = n_jobs
 
         self._fitted = False  # whether the model has been fitted
 
-    def fit_transform(self, X, y=None):
-
-        try:  # if missing y, will be None value; or will be dataframe, use df.empty for judge
-            _empty = y.empty
-        except AttributeError:
-            _empty = y == None
-
-        if (
-            not _empty
-        ):  # if no y input, only convert X; or, combine X and y to consider balancing
-            features = list(X.columns)
-            response = list(y.columns)
-            data = pd.concat([X, y], axis=1)
-        else:
-            features = list(X.columns)
-            response = None
-            data = X
+    def _fit_transform(self, X):
 
-        _data = data.copy(deep=True)
-        if not is_imbalance(_data, self.imbalance_threshold):
-            warnings.warn("The dataset is balanced, no change.")
-        else:
-            super().__init__(
-                imbalance_threshold=(1.0 + self.imbalance_threshold) / 2,
-                all=self.all,
-                max_iter=self.max_iter,
-                seed=self.seed,
-            )
-            _data = super().fit_transform(_data)
-
-            super(CondensedNearestNeighbor, self).__init__(
-                imbalance_threshold=self.imbalance_threshold,
-                norm=self.norm,
-                all=self.all,
-                max_iter=self.max_iter,
-                seed=self.seed,
-            )
-            _data = super(CondensedNearestNeighbor, self).fit_transform(_data)
+        _imbalanced_feature, _ = is_imbalance(X, self.imbalance_threshold, value=True)
 
-        self._fitted = True
+        # one neighbor index shared by CNN and Tomek Link
+        index = NeighborIndex(
+            X.loc[:, X.columns != _imbalanced_feature], self.norm, self.n_jobs
+        )
+        CondensedNearestNeighbor._select(
+            self, X, index, _imbalanced_feature, (1.0 + self.imbalance_threshold) / 2
+        )
+        TomekLink._select(
+            self, X, index, _imbalanced_feature, self.imbalance_threshold
+        )
 
-        if not _empty:
-            return _data[features], _data[response]
-        else:
-            return _data
+        return X.iloc[np.where(index.alive)[0]].reset_index(drop=True)
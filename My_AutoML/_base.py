@@ -109,6 +109,225 @@ class no_processing:
         return X
 
 
+class DataReader:
+
+    """
+    Lazy reader of data files, data are only read when required
+    read full data, read by chunks of rows or draw a random sample of rows in one
+    pass, only one chunk of rows is in memory at a time
+
+    Parameters
+    ----------
+    path: path of the data file, can be a directory, a glob pattern or a list of
+    files of same format and columns (e.g. parts of a partitioned dataset), rows of
+    the files are read in order of sorted file names as one dataset
+    supported types ('.csv', '.data', '.asc', '.parquet', '.feather', '.npy')
+    '.parquet' and '.feather' require pyarrow, '.npy' is memory-mapped
+
+    chunksize: number of rows in every chunk, default = 100000
+
+    dtype: dtypes of columns for text files, default = None
+    explicit dtypes (e.g. {'column_1': 'float32', 'column_2': 'category'}) skip
+    type inference and reduce memory
+
+    columns: columns to read, default = None
+    if None, read all columns
+    """
+
+    _formats = [".csv", ".data", ".asc", ".parquet", ".feather", ".npy"]
+
+    def __init__(self, path, chunksize=100000, dtype=None, columns=None):
+        self.path = path
+        self.chunksize = chunksize
+        self.dtype = dtype
+        self.columns = columns
+
+        self.files = self._get_files(path)
+
+        _formats = set(os.path.splitext(file)[-1].lower() for file in self.files)
+        if len(_formats) > 1:
+            raise ValueError(
+                "Files must be of same type, get {}!".format(sorted(_formats))
+            )
+        self.format = _formats.pop()
+        if self.format not in self._formats:
+            raise ValueError("Not recognizing file type {}!".format(self.format))
+
+        # files are read as one dataset, only the schema of every file is read
+        _columns = self._get_columns(self.files[0])
+        for file in self.files[1:]:
+            if self._get_columns(file) != _columns:
+                raise ValueError(
+                    "Columns of {} are not same as {}!".format(file, self.files[0])
+                )
+
+    def __repr__(self):
+
+        return "DataReader({})".format(self.path)
+
+    # data files of the path, directory is expanded to data files in it
+    def _get_files(self, path):
+
+        if isinstance(path, (list, tuple)):
+            files = list(path)
+        elif os.path.isdir(path):
+            files = sorted(
+                os.path.join(path, file)
+                for file in os.listdir(path)
+                if os.path.splitext(file)[-1].lower() in self._formats
+            )
+        elif any(char in path for char in "*?["):  # glob pattern
+            files = sorted(glob.glob(path))
+        else:
+            files = [path]
+
+        if not files:
+            raise ValueError("No data file found in {}!".format(path))
+
+        return files
+
+    # names of all columns in the file, only the header/schema is read
+    def _get_columns(self, file):
+
+        if self.format == ".parquet":
+            import pyarrow.parquet as pq
+
+            return pq.read_schema(file).names
+        elif self.format == ".feather":
+            import pyarrow.feather as feather
+
+            return feather.read_table(file, memory_map=True).column_names
+        elif self.format == ".npy":
+            return list(range(np.load(file, mmap_mode="r").shape[1]))
+
+        return list(pd.read_csv(file, nrows=0).columns)
+
+    # names of all columns in the files
+    def get_columns(self):
+
+        return self._get_columns(self.files[0])
+
+    # read full data of one file
+    def _read(self, file, columns):
+
+        if self.format == ".parquet":
+            return pd.read_parquet(file, columns=columns)
+        elif self.format == ".feather":
+            return pd.read_feather(file, columns=columns)
+        elif self.format == ".npy":
+            # memory-mapped, values are only loaded when accessed
+            _data = np.load(file, mmap_mode="r")
+            return pd.DataFrame(
+                _data if columns is None else _data[:, columns],
+                columns=columns,
+                copy=False,
+            )
+
+        return pd.read_csv(file, dtype=self.dtype, usecols=columns)
+
+    # read full data, columns overwrite the columns of the reader
+    def read(self, columns=None):
+
+        columns = self.columns if columns is None else columns
+
+        if len(self.files) == 1:
+            return self._read(self.files[0], columns)
+
+        # index of rows are row numbers in the dataset
+        return pd.concat(
+            [self._read(file, columns) for file in self.files], ignore_index=True
+        )
+
+    # read one file by chunks of rows
+    def _chunks(self, file, columns):
+
+        if self.format == ".csv" or self.format == ".data" or self.format == ".asc":
+            yield from pd.read_csv(
+                file, dtype=self.dtype, usecols=columns, chunksize=self.chunksize
+            )
+            return
+
+        if self.format == ".parquet":
+            import pyarrow.parquet as pq
+
+            _batches = pq.ParquetFile(file).iter_batches(
+                batch_size=self.chunksize, columns=columns
+            )
+        elif self.format == ".feather":
+            import pyarrow.feather as feather
+
+            _batches = feather.read_table(
+                file, columns=columns, memory_map=True
+            ).to_batches(max_chunksize=self.chunksize)
+        elif self.format == ".npy":
+            _data = np.load(file, mmap_mode="r")
+            _columns = slice(None) if columns is None else columns
+            _batches = (
+                pd.DataFrame(
+                    np.array(_data[_start : _start + self.chunksize, _columns]),
+                    columns=columns,
+                )
+                for _start in range(0, len(_data), self.chunksize)
+            )
+
+        for _batch in _batches:
+            yield _batch if isinstance(_batch, pd.DataFrame) else _batch.to_pandas()
+
+    # read data by chunks of rows, chunks do not span files
+    # index of chunks are row numbers in the dataset
+    def chunks(self, columns=None):
+
+        columns = self.columns if columns is None else columns
+
+        _start = 0
+        for file in self.files:
+            for _chunk in self._chunks(file, columns):
+                _chunk.index = pd.RangeIndex(_start, _start + len(_chunk))
+                _start += len(_chunk)
+                yield _chunk
+
+    def sample(self, n=None, frac=None, columns=None, seed=1):
+
+        """
+        Draw a random sample of rows in one pass over the chunks
+
+        Parameters
+        ----------
+        n: number of rows to sample, default = None
+
+        frac: fraction of rows to sample, default = None
+        if both n and frac are None, read all rows
+
+        columns: columns to read, default = None
+
+        seed: random seed, default = 1
+        """
+
+        if n is None and frac is None:
+            return self.read(columns=columns)
+        if n is not None and frac is not None:
+            raise ValueError("Only one of n and frac can be specified!")
+
+        rng = np.random.RandomState(seed)
+        _sample, _keys = [], np.empty(0)
+        for _chunk in self.chunks(columns=columns):
+            _random = rng.uniform(size=len(_chunk))
+            if frac is not None:
+                # every row is kept with probability frac
+                _sample.append(_chunk[_random < frac])
+            else:
+                # keep the n rows with smallest random keys, uniform sample without replacement
+                _sample = pd.concat(_sample + [_chunk])
+                _keys = np.concatenate([_keys, _random])
+                _keep = np.sort(np.argsort(_keys, kind="stable")[: int(n)])
+                _sample, _keys = [_sample.iloc[_keep]], _keys[_keep]
+
+        if not _sample:
+            return self.read(columns=columns).iloc[:0]
+
+        return pd.concat(_sample)
+
+
 class load_data:
 
     """
@@ -119,14 +338,42 @@ class load_data:
     path: path of the files to search for, can be list of paths
 
     data_type: matching data file types, default = 'all'
-    supported types ('all', '.csv', '.asc', '.data', '.rda', '.rdata')
+    supported types ('all', '.csv', '.asc', '.data', '.rda', '.rdata', '.parquet',
+    '.feather', '.npy'), '.parquet' and '.feather' require pyarrow
+
+    lazy: whether to load DataReader instead of dataframe, default = False
+    DataReader only reads data when required (by chunks or a sample of rows),
+    for data larger than memory, not available for '.rda' and '.rdata'
+    if lazy, directories of data files with same columns are also loaded, every
+    directory as one DataReader named by the directory
 
+    chunksize: number of rows in every chunk of DataReader, default = 100000
+
+    dtype: dtypes of columns for text files, default = None
+
+    columns: columns to read, default = None
+    if None, read all columns
     """
 
-    def __init__(self, data_type="all"):
+    def __init__(
+        self, data_type="all", lazy=False, chunksize=100000, dtype=None, columns=None
+    ):
         self.data_type = data_type
+        self.lazy = lazy
+        self.chunksize = chunksize
+        self.dtype = dtype
+        self.columns = columns
         self.database = {}
 
+    # read the data file, or only create the reader if lazy
+    def _read(self, path):
+
+        _reader = DataReader(
+            path, chunksize=self.chunksize, dtype=self.dtype, columns=self.columns
+        )
+
+        return _reader if self.lazy else _reader.read()
+
     def load(self, path, filename=None):
 
         if isinstance(path, list):  # add / at the end of path
@@ -201,7 +448,56 @@ class load_data:
                     # )
                     # use os.path.split for unify path separator
                     _filename = os.path.split(_data_path)[-1]
-                    self.database[_filename.split(".")[0]] = pd.read_csv(_data_path)
+                    self.database[_filename.split(".")[0]] = self._read(_data_path)
+
+        # load .parquet/.feather/.npy files in the path
+        for _type in [".parquet", ".feather", ".npy"]:
+            if self.data_type == _type or self.data_type == "all":
+                if filename == None:
+                    _files = glob.glob(path + "*" + _type)
+                elif isinstance(filename, list):
+                    _files = []
+                    for _filename in filename:
+                        _files += glob.glob(path + _filename + _type)
+                else:
+                    _files = glob.glob(path + filename + _type)
+
+                if not _files and self.data_type == _type:
+                    warnings.warn("No {} file found!".format(_type))
+                for _data_path in _files:
+                    _filename = os.path.split(_data_path)[-1]
+                    self.database[_filename.split(".")[0]] = self._read(_data_path)
+
+        # in lazy mode, directory of data files with same columns (e.g. parts of
+        # a partitioned dataset) is loaded as one DataReader
+        if self.lazy:
+            if filename == None:
+                _dirs = glob.glob(path + "*")
+            elif isinstance(filename, list):
+                _dirs = []
+                for _filename in filename:
+                    _dirs += glob.glob(path + _filename)
+            else:
+                _dirs = glob.glob(path + filename)
+
+            _types = (
+                DataReader._formats if self.data_type == "all" else [self.data_type]
+            )
+            for _dir_path in filter(os.path.isdir, _dirs):
+                _dir_types = set(
+                    os.path.splitext(file)[-1].lower()
+                    for file in os.listdir(_dir_path)
+                ).intersection(_types)
+                if len(_dir_types) > 1:
+                    warnings.warn(
+                        "Directory {} has files of types {}, specify data_type to load.".format(
+                            _dir_path, sorted(_dir_types)
+                        )
+                    )
+                elif _dir_types:
+                    self.database[os.path.split(_dir_path)[-1]] = self._read(
+                        os.path.join(_dir_path, "*" + _dir_types.pop())
+                    )
 
         # load .rda/.rdata files in the path
         # will not read any files if rpy2 is not available
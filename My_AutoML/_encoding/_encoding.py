@@ -41,7 +41,7 @@ SOFTWARE.
 import numpy as np
 import pandas as pd
 from sklearn import preprocessing
-from My_AutoML._utils._base import is_date
+from My_AutoML._utils._base import infer_date_format
 from My_AutoML._utils._data import formatting
 
 
@@ -54,6 +54,11 @@ class DataEncoding(formatting):
     3. refit for test data (in cases train/test data is already divided),
     using category table recorded while convert train data, only deal with non nan values
 
+    categories of every column are stored as a codebook, the whole column is encoded by
+    one hashed lookup in both fit and refit; column types (date with its format, category,
+    numeric) are inferred on samples once in fit and stored as schema, refit applies the
+    schema without detecting the types again
+
     Parameters
     ----------
     df: data
@@ -64,56 +69,106 @@ class DataEncoding(formatting):
     transform: how to transform numerical features, default = False
     'standardize', 'center', 'log' are available
 
+    unseen_code: code of categories not seen in fit, default = np.nan
+    at default, unseen categories are treated as missing values, for dummy coding,
+    unseen categories have all dummy variables 0
+
+    sparse: whether to store dummy variables as sparse columns, default = False
     """
 
-    def __init__(self, dummy_coding=False, transform=False):
+    def __init__(
+        self, dummy_coding=False, transform=False, unseen_code=np.nan, sparse=False
+    ):
         self.dummy_coding = dummy_coding
         self.transform = transform
+        self.unseen_code = unseen_code
+        self.sparse = sparse
 
         self._fitted = False  # record whether the method is fitted
 
+    # infer type of the column, return ("date", format), ("category", None) or ("numeric", None)
+    def _infer_type(self, data):
+
+        if data.dtype == object:
+            # only detect date format on samples of values
+            if len(data.dropna().unique()) > 31:
+                _is_date, _format = infer_date_format(data)
+                if _is_date:
+                    return "date", _format
+            return "category", None
+        elif str(data.dtype) == "category":
+            return "category", None
+
+        return "numeric", None
+
+    # convert date column to numerical by the stored format at once
+    def _encode_date(self, data, format=None):
+
+        _date = pd.to_datetime(data, format=format, errors="coerce")
+        _values = _date.values.astype("int64").astype(float)
+        _values[_date.isnull().values] = np.nan
+
+        return pd.Series(_values, index=data.index, name=data.name)
+
+    # encode categorical column by the codebook
+    # return codes, or block of dummy variables if dummy coding
+    def _encode(self, data):
+
+        codebook = self._codebook[data.name]
+        # missing and unseen categories get code -1
+        codes = pd.Categorical(data, categories=codebook).codes
+
+        if self.dummy_coding == True:
+            columns = [str(data.name) + "_" + str(elem) for elem in codebook]
+            _rows = np.where(codes >= 0)[0]
+            if self.sparse:
+                from scipy import sparse
+
+                return pd.DataFrame.sparse.from_spmatrix(
+                    sparse.csr_matrix(
+                        (np.ones(len(_rows), dtype=int), (_rows, codes[_rows])),
+                        shape=(len(data), len(codebook)),
+                    ),
+                    index=data.index,
+                    columns=columns,
+                )
+            _block = np.zeros((len(data), len(codebook)), dtype=int)
+            _block[_rows, codes[_rows]] = 1
+
+            return pd.DataFrame(_block, index=data.index, columns=columns)
+
+        _missing = data.isnull().values
+        codes = codes.astype(float)
+        codes[(codes < 0) & ~_missing] = self.unseen_code
+        codes[_missing] = np.nan
+        if not np.isnan(codes).any():
+            codes = codes.astype(int)
+
+        return pd.Series(codes, index=data.index, name=data.name)
+
     def fit(self, _df):
         df = _df.copy(deep=True)
         features = list(df.columns)
-        self.category = pd.DataFrame()
+        self._schema = {}  # inferred type of features
+        self._codebook = {}  # sorted categories of categorical features
         self.mean_scaler = {}
         self.sigma_scaler = {}
+        _dummy = []  # blocks of dummy variables
         for column in features:
-            if (
-                df[column].dtype == object
-                and is_date(df[[column]])
-                and len(df[column].dropna().unique()) > 31
-            ):
-                df[column] = pd.to_numeric(pd.to_datetime(df[column]))
-            elif (df[column].dtype == object) or (str(df[column].dtype) == "category"):
+            self._schema[column] = self._infer_type(df[column])
+            if self._schema[column][0] == "date":
+                df[column] = self._encode_date(df[column], self._schema[column][1])
+            elif self._schema[column][0] == "category":
                 # dummy coding for string categorical features
                 if str(df[column].dtype) == "category":
-                    df[column] = df[column].astype(str)
+                    df[column] = df[column].astype(str).where(df[column].notnull())
+                self._codebook[column] = pd.Index(
+                    np.sort(df[column].dropna().unique())
+                )
                 if self.dummy_coding == True:
-                    unique_value = np.sort(df[column].dropna().unique())
-                    if self.category.empty:
-                        self.category = pd.DataFrame({column: unique_value})
-                    else:
-                        self.category = pd.concat(
-                            [self.category, pd.DataFrame({column: unique_value})],
-                            axis=1,
-                        )
-                    for elem in unique_value:
-                        df[column + "_" + str(elem)] = (df[column] == elem).astype(int)
+                    _dummy.append(self._encode(df[column]))
                 else:
-                    unique_value = np.sort(df[column].dropna().unique())
-                    if self.category.empty:
-                        self.category = pd.DataFrame({column: unique_value})
-                    else:
-                        self.category = pd.concat(
-                            [self.category, pd.DataFrame({column: unique_value})],
-                            axis=1,
-                        )
-                    for i in range(len(unique_value)):
-                        df.loc[df[column] == unique_value[i], column] = i
-                    df.loc[~df[column].isnull(), column] = df.loc[
-                        ~df[column].isnull(), column
-                    ].astype(int)
+                    df[column] = self._encode(df[column])
             else:
                 df.loc[~df[column].isnull(), column] = df.loc[
                     ~df[column].isnull(), column
@@ -141,52 +196,93 @@ class DataEncoding(formatting):
                         df.loc[~df[column].isnull(), column]
                     )
 
-        # remove categorical variables
+        # category table of categorical features
+        self.category = self._category_table()
+
+        # remove categorical variables, add dummy variables as one block
         if self.dummy_coding == True:
-            df.drop(columns=list(self.category.columns), inplace=True)
+            df = pd.concat(
+                [df.drop(columns=list(self._codebook.keys()))] + _dummy, axis=1
+            )
 
         self._fitted = True
 
         return df
 
+    # category table of categorical features, one column of categories per feature
+    def _category_table(self):
+
+        return (
+            pd.concat(
+                [
+                    pd.DataFrame({column: codebook})
+                    for column, codebook in self._codebook.items()
+                ],
+                axis=1,
+            )
+            if self._codebook
+            else pd.DataFrame()
+        )
+
+    def partial_fit(self, _df, y=None):
+
+        """
+        Fit by chunks of data, types of columns are inferred on the first chunk,
+        categories of all chunks are added to the codebook
+
+        Parameters
+        ----------
+        _df: chunk of data
+        """
+
+        # transform of numerical features is fitted on every data in refit
+        if self.transform != False:
+            raise ValueError(
+                "partial_fit only supports transform = False, get {}.".format(
+                    self.transform
+                )
+            )
+
+        if not self._fitted:
+            self.fit(_df)
+            return self
+
+        for column, codebook in self._codebook.items():
+            _values = _df[column]
+            if str(_values.dtype) == "category":
+                _values = _values.astype(str).where(_values.notnull())
+            self._codebook[column] = pd.Index(
+                np.sort(codebook.append(pd.Index(_values.dropna().unique())).unique())
+            )
+        self.category = self._category_table()
+
+        return self
+
     def refit(self, _df):
         df = _df.copy(deep=True)
-        if self.category.empty:
+        # no categorical or date features, no change
+        if self.category.empty and not any(
+            _type == "date" for (_type, _) in self._schema.values()
+        ):
             return df
-        categorical_features = list(self.category.columns)
+        _dummy = []  # blocks of dummy variables
         for column in list(df.columns):
-            if (
-                df[column].dtype == object
-                and is_date(df[[column]])
-                and len(df[column].dropna().unique()) > 31
-            ):
-                df[column] = pd.to_numeric(pd.to_datetime(df[column]))
+            # use the schema inferred in fit, types are not detected again
+            _type, _format = self._schema.get(column, ("numeric", None))
+            if _type == "date":
+                df[column] = self._encode_date(df[column], _format)
             elif df[column].dtype == object or str(df[column].dtype) == "category":
                 if str(df[column].dtype) == "category":
-                    df[column] = df[column].astype(str)
+                    df[column] = df[column].astype(str).where(df[column].notnull())
                 if (
-                    column in categorical_features
+                    column in self._codebook
                 ):  # map categorical testdata based on category
-                    unique_values = self.category.loc[
-                        self.category[column].notnull(), column
-                    ].values  # Select only non nan values
+                    # Notice: categorical values not appear in traindata will be mapped to
+                    # unseen_code, or have all dummy variables 0 if dummy coding
                     if self.dummy_coding == True:
-                        for value in unique_values:
-                            df[str(column) + "_" + str(value)] = (
-                                df[column] == value
-                            ).astype(int)
-                            # Notice: categorical values not appear in traindata will be dropped,
-                            # it's not a problem seems it can not be trained if it's not even in train data
-                            # if False in (np.sort(unique_values) == np.sort(df[column].unique())) :
-                            #     raise ValueError('Testdata has unkown categories!')
+                        _dummy.append(self._encode(df[column]))
                     else:
-                        # update, put notin in front of refit, so after refit, there will be no mistake
-                        df.loc[~df[column].isin(unique_values), column] = np.NaN
-                        for i in range(len(unique_values)):
-                            df.loc[df[column] == unique_values[i], column] = i
-                        df.loc[~df[column].isnull(), column] = df.loc[
-                            ~df[column].isnull(), column
-                        ].astype(int)
+                        df[column] = self._encode(df[column])
             else:
                 df.loc[~df[column].isnull(), column] = df.loc[
                     ~df[column].isnull(), column
@@ -214,9 +310,11 @@ class DataEncoding(formatting):
                         df.loc[~df[column].isnull(), column]
                     )
 
-        # remove categorical variables
+        # remove categorical variables, add dummy variables as one block
         if self.dummy_coding == True:
-            df.drop(columns=list(self.category.columns), inplace=True)
+            df = pd.concat(
+                [df.drop(columns=list(self.category.columns))] + _dummy, axis=1
+            )
 
         return df
 
@@ -58,6 +58,7 @@ from My_AutoML._utils import (
     ANOVA,
     random_index,
 )
+from My_AutoML._utils._stat import discretize, MI_codes
 from My_AutoML._utils._optimize import (
     get_estimator,
     get_metrics,
@@ -1122,41 +1123,39 @@ class mRMR:
     n_prop: float, default = None
     proprotion of features to select, if None, no limit
     n_components have higher priority than n_prop
+
+    bins: number of histogram bins for numerical features, default = None
+    if None, every unique value is a category
+
+    n_jobs: number of threads to calculate mutual information, default = 1
     """
 
     def __init__(
         self,
         n_components=None,
         n_prop=None,
+        bins=None,
+        n_jobs=1,
     ):
         self.n_components = n_components
         self.n_prop = n_prop
+        self.bins = bins
+        self.n_jobs = n_jobs
 
         self._fitted = False
 
-    def select_feature(self, X, y, selected_features, unselected_features):
-
-        # select one feature as step, get all possible combinations
-        test_item = list(combinations(unselected_features, 1))
+    def select_feature(self, selected_features, unselected_features):
 
-        # initialize test results
-        results = []
-        for _comb in test_item:
-            dependency = MI(X.iloc[:, _comb[0]], y)
-            if len(selected_features) > 0:
-                redundancy = np.mean(
-                    [
-                        MI(X.iloc[:, item], X.iloc[:, _comb[0]])
-                        for item in selected_features
-                    ]
-                )
-                # append test results
-                results.append(dependency - redundancy)
-            # at initial, no selected feature, so no redundancy
-            else:
-                results.append(dependency)
+        # relevance: MI with response, redundancy: mean MI with selected features
+        # _redundancy keeps the sum of MI with selected features over rounds
+        results = self._relevance[unselected_features]
+        if len(selected_features) > 0:
+            results = (
+                results - self._redundancy[unselected_features] / len(selected_features)
+            )
+        # at initial, no selected feature, so no redundancy
 
-        return test_item[maxloc(results)][0]  # use 0 to select item instead of tuple
+        return unselected_features[maxloc(list(results))]
 
     def fit(self, X, y=None):
 
@@ -1169,18 +1168,38 @@ class mRMR:
         elif self.n_prop is not None:
             self.n_components = max(1, int(self.n_prop * X.shape[1]))
 
+        if not isinstance(y, pd.DataFrame):
+            y = pd.DataFrame(y)
+
+        # discretize features/response only once
+        _X_codes, _X_n_codes = discretize(X, bins=self.bins)
+        _y_codes, _y_n_codes = discretize(y.iloc[:, [0]], bins=self.bins)
+
+        self._relevance = np.array(
+            MI_codes(_X_codes, _X_n_codes, _y_codes[:, 0], _y_n_codes[0], self.n_jobs)
+        )
+        self._redundancy = np.zeros(X.shape[1])
+
         # initialize selected/unselected features
         selected_features = []
         unselected_features = list(range(X.shape[1]))
 
         for _ in range(self.n_components):
             # get the current optimal loss and feature
-            new_feature = self.select_feature(
-                X, y, selected_features, unselected_features
-            )
+            new_feature = self.select_feature(selected_features, unselected_features)
             selected_features.append(new_feature)
             unselected_features.remove(new_feature)
 
+            # only MI with the new selected feature is needed for next round
+            if len(unselected_features) > 0:
+                self._redundancy[unselected_features] += MI_codes(
+                    _X_codes[:, unselected_features],
+                    _X_n_codes[unselected_features],
+                    _X_codes[:, new_feature],
+                    _X_n_codes[new_feature],
+                    self.n_jobs,
+                )
+
         # record selected features
         self.select_features = selected_features
 
@@ -42,6 +42,7 @@ import numpy as np
 import pandas as pd
 
 from ._base import AutoTabularBase
+from My_AutoML._base import DataReader
 
 from My_AutoML._utils._base import type_of_task
 
@@ -155,6 +156,31 @@ class AutoTabularRegressor(AutoTabularBase):
     if you wish to use these methods and set reset_index = False, please make sure 
     all input index are ordered and starting from 0
 
+    cache_size: maximum memory (in MB) used to cache preprocessing results across trials, default = 1024
+    trials sharing the same encoder/imputer/balancing/scaling/feature selection settings
+    reuse the cached fitted methods and transformed data, set 0 to disable caching
+
+    trial_mode: how each trial is trained, default = "one_shot"
+    support ("one_shot", "multi_fidelity")
+    "one_shot" fits the pipeline once, reports the loss and finishes the trial
+    "multi_fidelity" preprocesses once, then every step continues training the model
+    (more iterations if model supports iterative_fit, otherwise more rows),
+    allowing schedulers like ASHAScheduler/HyperBandScheduler to stop trials early
+
+    n_fidelity: number of fidelity levels for models retrained on rows, default = 4
+    only effective when trial_mode = "multi_fidelity", the number of training rows
+    doubles every step until the full train set is used at step n_fidelity
+
+    save_preprocessed: whether to save preprocessed train/test sets of every trial, default = False
+    support (False, True, "npy", "parquet", "feather"), True will use "npy"
+    data are written in the background, "parquet" and "feather" require pyarrow
+
+    search_sample: rows used in model selection/hyperparameter search, default = None
+    int for number of rows, float in (0, 1) for fraction of rows, if None, use all rows
+    searched pipelines are refitted on full data, X can be a DataReader (y is then the
+    response column name(s)), pipelines are fitted by chunks of the reader if all
+    stages support it (partial_fit), otherwise full data are read if they fit in memory
+
     seed: random seed, default = 1
     """
 
@@ -189,6 +215,11 @@ class AutoTabularRegressor(AutoTabularBase):
         cpu_threads=None,
         use_gpu=None,
         reset_index=True,
+        cache_size=1024,
+        trial_mode="one_shot",
+        n_fidelity=4,
+        save_preprocessed=False,
+        search_sample=None,
         seed=1,
     ):
         self.n_estimators = n_estimators
@@ -220,6 +251,11 @@ class AutoTabularRegressor(AutoTabularBase):
         self.cpu_threads = cpu_threads
         self.use_gpu = use_gpu
         self.reset_index = reset_index
+        self.cache_size = cache_size
+        self.trial_mode = trial_mode
+        self.n_fidelity = n_fidelity
+        self.save_preprocessed = save_preprocessed
+        self.search_sample = search_sample
         self.seed = seed
         
         self._fitted = False # whether the model has been fitted
@@ -255,6 +291,11 @@ class AutoTabularRegressor(AutoTabularBase):
             cpu_threads=self.cpu_threads,
             use_gpu=self.use_gpu,
             reset_index=self.reset_index,
+            cache_size=self.cache_size,
+            trial_mode=self.trial_mode,
+            n_fidelity=self.n_fidelity,
+            save_preprocessed=self.save_preprocessed,
+            search_sample=self.search_sample,
             seed=self.seed,
         )
 
@@ -381,6 +422,31 @@ class AutoTabularClassifier(AutoTabularBase):
     if you wish to use these methods and set reset_index = False, please make sure 
     all input index are ordered and starting from 0
 
+    cache_size: maximum memory (in MB) used to cache preprocessing results across trials, default = 1024
+    trials sharing the same encoder/imputer/balancing/scaling/feature selection settings
+    reuse the cached fitted methods and transformed data, set 0 to disable caching
+
+    trial_mode: how each trial is trained, default = "one_shot"
+    support ("one_shot", "multi_fidelity")
+    "one_shot" fits the pipeline once, reports the loss and finishes the trial
+    "multi_fidelity" preprocesses once, then every step continues training the model
+    (more iterations if model supports iterative_fit, otherwise more rows),
+    allowing schedulers like ASHAScheduler/HyperBandScheduler to stop trials early
+
+    n_fidelity: number of fidelity levels for models retrained on rows, default = 4
+    only effective when trial_mode = "multi_fidelity", the number of training rows
+    doubles every step until the full train set is used at step n_fidelity
+
+    save_preprocessed: whether to save preprocessed train/test sets of every trial, default = False
+    support (False, True, "npy", "parquet", "feather"), True will use "npy"
+    data are written in the background, "parquet" and "feather" require pyarrow
+
+    search_sample: rows used in model selection/hyperparameter search, default = None
+    int for number of rows, float in (0, 1) for fraction of rows, if None, use all rows
+    searched pipelines are refitted on full data, X can be a DataReader (y is then the
+    response column name(s)), pipelines are fitted by chunks of the reader if all
+    stages support it (partial_fit), otherwise full data are read if they fit in memory
+
     seed: random seed, default = 1
     """
 
@@ -415,6 +481,11 @@ class AutoTabularClassifier(AutoTabularBase):
         cpu_threads=None,
         use_gpu=None,
         reset_index=True,
+        cache_size=1024,
+        trial_mode="one_shot",
+        n_fidelity=4,
+        save_preprocessed=False,
+        search_sample=None,
         seed=1,
     ):
         self.n_estimators = n_estimators
@@ -446,6 +517,11 @@ class AutoTabularClassifier(AutoTabularBase):
         self.cpu_threads = cpu_threads
         self.use_gpu = use_gpu
         self.reset_index = reset_index
+        self.cache_size = cache_size
+        self.trial_mode = trial_mode
+        self.n_fidelity = n_fidelity
+        self.save_preprocessed = save_preprocessed
+        self.search_sample = search_sample
         self.seed = seed
         
         self._fitted = False # whether the model has been fitted
@@ -481,6 +557,11 @@ class AutoTabularClassifier(AutoTabularBase):
             cpu_threads=self.cpu_threads,
             use_gpu=self.use_gpu,
             reset_index=self.reset_index,
+            cache_size=self.cache_size,
+            trial_mode=self.trial_mode,
+            n_fidelity=self.n_fidelity,
+            save_preprocessed=self.save_preprocessed,
+            search_sample=self.search_sample,
             seed=self.seed,
         )
 
@@ -612,6 +693,31 @@ class AutoTabular(AutoTabularClassifier, AutoTabularRegressor):
     if you wish to use these methods and set reset_index = False, please make sure 
     all input index are ordered and starting from 0
 
+    cache_size: maximum memory (in MB) used to cache preprocessing results across trials, default = 1024
+    trials sharing the same encoder/imputer/balancing/scaling/feature selection settings
+    reuse the cached fitted methods and transformed data, set 0 to disable caching
+
+    trial_mode: how each trial is trained, default = "one_shot"
+    support ("one_shot", "multi_fidelity")
+    "one_shot" fits the pipeline once, reports the loss and finishes the trial
+    "multi_fidelity" preprocesses once, then every step continues training the model
+    (more iterations if model supports iterative_fit, otherwise more rows),
+    allowing schedulers like ASHAScheduler/HyperBandScheduler to stop trials early
+
+    n_fidelity: number of fidelity levels for models retrained on rows, default = 4
+    only effective when trial_mode = "multi_fidelity", the number of training rows
+    doubles every step until the full train set is used at step n_fidelity
+
+    save_preprocessed: whether to save preprocessed train/test sets of every trial, default = False
+    support (False, True, "npy", "parquet", "feather"), True will use "npy"
+    data are written in the background, "parquet" and "feather" require pyarrow
+
+    search_sample: rows used in model selection/hyperparameter search, default = None
+    int for number of rows, float in (0, 1) for fraction of rows, if None, use all rows
+    searched pipelines are refitted on full data, X can be a DataReader (y is then the
+    response column name(s)), pipelines are fitted by chunks of the reader if all
+    stages support it (partial_fit), otherwise full data are read if they fit in memory
+
     seed: random seed, default = 1
     """
 
@@ -646,6 +752,11 @@ class AutoTabular(AutoTabularClassifier, AutoTabularRegressor):
         cpu_threads=None,
         use_gpu=None,
         reset_index=True,
+        cache_size=1024,
+        trial_mode="one_shot",
+        n_fidelity=4,
+        save_preprocessed=False,
+        search_sample=None,
         seed=1,
     ):
         self.n_estimators = n_estimators
@@ -677,13 +788,21 @@ class AutoTabular(AutoTabularClassifier, AutoTabularRegressor):
         self.cpu_threads = cpu_threads
         self.use_gpu = use_gpu
         self.reset_index = reset_index
+        self.cache_size = cache_size
+        self.trial_mode = trial_mode
+        self.n_fidelity = n_fidelity
+        self.save_preprocessed = save_preprocessed
+        self.search_sample = search_sample
         self.seed = seed
         
         self._fitted = False # whether the model has been fitted
 
     def fit(self, X, y=None):
 
-        if isinstance(y, pd.DataFrame) or isinstance(y, np.ndarray):
+        if isinstance(X, DataReader):
+            # only read the response column(s) to decide the task
+            self._type = type_of_task(X.read(columns=[y] if isinstance(y, str) else y))
+        elif isinstance(y, pd.DataFrame) or isinstance(y, np.ndarray):
             self._type = type_of_task(y)
         elif y == None:
             self._type = "Unsupervised"
@@ -719,6 +838,11 @@ class AutoTabular(AutoTabularClassifier, AutoTabularRegressor):
                 cpu_threads=self.cpu_threads,
                 use_gpu=self.use_gpu,
                 reset_index=self.reset_index,
+                cache_size=self.cache_size,
+                trial_mode=self.trial_mode,
+                n_fidelity=self.n_fidelity,
+                save_preprocessed=self.save_preprocessed,
+                search_sample=self.search_sample,
                 seed=self.seed,
             )
         elif self._type in ["integer", "continuous"]:  # assign regression tasks
@@ -751,6 +875,11 @@ class AutoTabular(AutoTabularClassifier, AutoTabularRegressor):
                 cpu_threads=self.cpu_threads,
                 use_gpu=self.use_gpu,
                 reset_index=self.reset_index,
+                cache_size=self.cache_size,
+                trial_mode=self.trial_mode,
+                n_fidelity=self.n_fidelity,
+                save_preprocessed=self.save_preprocessed,
+                search_sample=self.search_sample,
                 seed=self.seed,
             )
         else:
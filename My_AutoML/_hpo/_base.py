@@ -57,12 +57,13 @@ from My_AutoML._hpo._utils import (
     RegressorEnsemble,
 )
 from My_AutoML._constant import UNI_CLASS, MAX_TIME
-from My_AutoML._base import no_processing
-from My_AutoML._utils._base import type_of_script
+from My_AutoML._base import no_processing, DataReader
+from My_AutoML._utils._base import type_of_script, available_memory
 from My_AutoML._utils._file import (
     save_methods,
     load_methods,
-    find_exact_path,
+    ModelStore,
+    StoredComponent,
 )
 from My_AutoML._utils._data import (
     str2list,
@@ -224,6 +225,31 @@ class AutoTabularBase:
     if you wish to use these methods and set reset_index = False, please make sure
     all input index are ordered and starting from 0
 
+    cache_size: maximum memory (in MB) used to cache preprocessing results across trials, default = 1024
+    trials sharing the same encoder/imputer/balancing/scaling/feature selection settings
+    reuse the cached fitted methods and transformed data, set 0 to disable caching
+
+    trial_mode: how each trial is trained, default = "one_shot"
+    support ("one_shot", "multi_fidelity")
+    "one_shot" fits the pipeline once, reports the loss and finishes the trial
+    "multi_fidelity" preprocesses once, then every step continues training the model
+    (more iterations if model supports iterative_fit, otherwise more rows),
+    allowing schedulers like ASHAScheduler/HyperBandScheduler to stop trials early
+
+    n_fidelity: number of fidelity levels for models retrained on rows, default = 4
+    only effective when trial_mode = "multi_fidelity", the number of training rows
+    doubles every step until the full train set is used at step n_fidelity
+
+    save_preprocessed: whether to save preprocessed train/test sets of every trial, default = False
+    support (False, True, "npy", "parquet", "feather"), True will use "npy"
+    data are written in the background, "parquet" and "feather" require pyarrow
+
+    search_sample: rows used in model selection/hyperparameter search, default = None
+    int for number of rows, float in (0, 1) for fraction of rows, if None, use all rows
+    searched pipelines are refitted on full data, X can be a DataReader (y is then the
+    response column name(s)), pipelines are fitted by chunks of the reader if all
+    stages support it (partial_fit), otherwise full data are read if they fit in memory
+
     seed: random seed, default = 1
     """
 
@@ -259,6 +285,11 @@ class AutoTabularBase:
         cpu_threads=None,
         use_gpu=None,
         reset_index=True,
+        cache_size=1024,
+        trial_mode="one_shot",
+        n_fidelity=4,
+        save_preprocessed=False,
+        search_sample=None,
         seed=1,
     ):
         self.task_mode = task_mode
@@ -291,6 +322,11 @@ class AutoTabularBase:
         self.cpu_threads = cpu_threads
         self.use_gpu = use_gpu
         self.reset_index = reset_index
+        self.cache_size = cache_size
+        self.trial_mode = trial_mode
+        self.n_fidelity = n_fidelity
+        self.save_preprocessed = save_preprocessed
+        self.search_sample = search_sample
         self.seed = seed
 
         self._iter = 0  # record iteration number
@@ -690,7 +726,7 @@ class AutoTabularBase:
     #     return self
 
     # select optimal settings and fit on optimal hyperparameters
-    def _fit_optimal(self, idx, optimal_point, best_path):
+    def _fit_optimal(self, idx, optimal_point, trial_id):
 
         # optimal encoder
         optimal_encoder_hyperparameters = optimal_point["encoder"]
@@ -866,14 +902,34 @@ class AutoTabularBase:
         # )
         # self._fit_model.fit(_X, _y.values.ravel())
 
-        (
-            _fit_encoder,
-            _fit_imputer,
-            _fit_balancing,
-            _fit_scaling,
-            _fit_feature_selection,
-            _fit_model,
-        ) = load_methods(best_path)
+        # search used a sample of rows, new components are fitted on full data
+        if self._refit:
+            return (
+                "pipe_" + str(idx + 1),
+                Pipeline(
+                    encoder=self._all_encoders[optimal_encoder](
+                        **optimal_encoder_hyperparameters
+                    ),
+                    imputer=self._all_imputers[optimal_imputer](
+                        **optimal_imputer_hyperparameters
+                    ),
+                    balancing=self._all_balancings[optimal_balancing](
+                        **optimal_balancing_hyperparameters
+                    ),
+                    scaling=self._all_scalings[optimal_scaling](
+                        **optimal_scaling_hyperparameters
+                    ),
+                    feature_selection=self._all_feature_selection[
+                        optimal_feature_selection
+                    ](**optimal_feature_selection_hyperparameters),
+                    model=self._all_models[optimal_model](
+                        **optimal_model_hyperparameters
+                    ),
+                ),
+            )
+
+        # fitted components of the trial, loaded only when used
+        _components = ModelStore(self._model_store).load(trial_id)
 
         # # save the model
         # if self.save:
@@ -905,16 +961,7 @@ class AutoTabularBase:
         #     )
 
         # create a pipeline using loaded methods
-        pip_setting = {
-            "encoder": _fit_encoder,
-            "imputer": _fit_imputer,
-            "balancing": _fit_balancing,
-            "scaling": _fit_scaling,
-            "feature_selection": _fit_feature_selection,
-            "model": _fit_model,
-        }
-
-        return ("pipe_" + str(idx + 1), Pipeline(**pip_setting))
+        return ("pipe_" + str(idx + 1), Pipeline(**_components))
 
     def _fit_ensemble(self, trial_id, config):
 
@@ -924,13 +971,7 @@ class AutoTabularBase:
         # loop through all configs, trial_id, get model ensemble
         for idx, (trial_id, config) in enumerate(zip(trial_id, config)):
 
-            # find the exact path
-            _path = find_exact_path(
-                os.path.join(self.temp_directory, self.model_name), "id_" + trial_id
-            )
-            _path = os.path.join(_path, self.model_name)
-
-            ensemble_list.append(self._fit_optimal(idx, config, _path))
+            ensemble_list.append(self._fit_optimal(idx, config, trial_id))
 
         # wrap pipelines into ensemble
         if self.task_mode == "classification":
@@ -938,6 +979,102 @@ class AutoTabularBase:
         elif self.task_mode == "regression":
             self._ensemble = RegressorEnsemble(estimators=ensemble_list)
 
+    # move components of the ensemble to store (load into memory if store is None)
+    def _relocate_components(self, store):
+
+        for _, pipeline in self._ensemble.estimators:
+            for _name, _component in vars(pipeline).items():
+                if isinstance(_component, StoredComponent):
+                    setattr(
+                        pipeline,
+                        _name,
+                        _component.load(mmap=False)
+                        if store is None
+                        else _component.copy_to(store),
+                    )
+
+    # fit the ensemble on full data of the reader, pipelines are fitted by chunks
+    # if all their stages allow, otherwise full data are read only if projected
+    # to fit in memory
+    # row_bytes: memory of one row of data, measured on the search sample
+    def _fit_reader(self, reader, features, response, row_bytes):
+
+        # one pass over the response, number of rows and labels for classification
+        n_rows, _labels = 0, []
+        for _chunk in reader.chunks(columns=response):
+            n_rows += len(_chunk)
+            if self.task_mode == "classification":
+                _labels.append(_chunk.drop_duplicates())
+        # whether every chunk has all labels
+        _chunk_classes = True
+        if _labels:
+            _n_labels = [len(_item) for _item in _labels]
+            _labels = pd.concat(_labels).drop_duplicates().reset_index(drop=True)
+            _chunk_classes = min(_n_labels) == len(_labels)
+        else:
+            _labels = None
+
+        _blockers = {
+            _name: pipeline.stream_blockers(chunk_classes=_chunk_classes)
+            for _name, pipeline in self._ensemble.estimators
+        }
+        if not any(_blockers.values()):
+
+            def _chunks():
+                for _chunk in reader.chunks(columns=features + response):
+                    yield _chunk[features], _chunk[response]
+
+            _classes = None if _labels is None else np.unique(_labels.values)
+            for _, pipeline in self._ensemble.estimators:
+                pipeline.fit_chunks(
+                    _chunks,
+                    n_rows=n_rows,
+                    classes=_classes,
+                    chunk_classes=_chunk_classes,
+                )
+
+            # pipelines are fitted, ensemble only needs labels of the response
+            self._ensemble.fit(None, _labels)
+            return
+
+        # refuse before reading full data that does not fit in memory
+        _memory, _available = row_bytes * n_rows, available_memory()
+        if _available is not None and _memory > _available:
+            raise MemoryError(
+                "Full data of {} rows need about {:.2f} GB memory, only {:.2f} GB "
+                "available. Stages of pipelines can not be fitted by chunks: {}. "
+                "Use components supporting partial_fit or less data.".format(
+                    n_rows,
+                    _memory / 1024 ** 3,
+                    _available / 1024 ** 3,
+                    {_name: item for _name, item in _blockers.items() if item},
+                )
+            )
+
+        # read features and response separately, avoid copies of full data
+        self._ensemble.fit(
+            reader.read(columns=features), reader.read(columns=response)
+        )
+
+    # arguments of sampling rows used in search
+    # n_rows: number of rows in data, if known
+    def _search_rows(self, n_rows=None):
+
+        if self.search_sample is None:
+            return {}
+        if isinstance(self.search_sample, float) and 0 < self.search_sample < 1:
+            return {"frac": self.search_sample}
+        if self.search_sample <= 0:
+            raise ValueError(
+                "search_sample must be positive, get {}.".format(self.search_sample)
+            )
+
+        return {
+            "n": int(self.search_sample)
+            if n_rows is None
+            else min(int(self.search_sample), n_rows)
+        }
+
     def fit(self, X, y):
 
         if self.ignore_warning:  # ignore all warnings to generate clearer outputs
@@ -1008,6 +1145,17 @@ class AutoTabularBase:
                 )
             )
 
+        # data reader of the data file, y is the response column name(s)
+        # only a sample of rows is read for search, full data are read at the end
+        _reader = None
+        if isinstance(X, DataReader):
+            _reader, _response = X, ([y] if isinstance(y, str) else list(y))
+            _data = _reader.sample(seed=self.seed, **self._search_rows())
+            # memory of one row, to project the memory of full data
+            _row_bytes = _data.memory_usage(deep=True).sum() / max(len(_data), 1)
+            X, y = _data.drop(columns=_response), _data[_response]
+            del _data
+
         # make sure _X is a dataframe
         if isinstance(X, pd.DataFrame):
             pass
@@ -1030,6 +1178,21 @@ class AutoTabularBase:
             _X.reset_index(drop=True, inplace=True)
             _y.reset_index(drop=True, inplace=True)
 
+        # full data are used to fit the final ensemble
+        _X_full, _y_full = _X, _y
+        if _reader is None and self.search_sample is not None:
+            _rows = self._search_rows(len(_X))
+            _n = _rows["n"] if "n" in _rows else int(round(_rows["frac"] * len(_X)))
+            _position = np.sort(
+                np.random.RandomState(self.seed).permutation(len(_X))[:_n]
+            )
+            _X, _y = _X.iloc[_position], _y.iloc[_position]
+            if self.reset_index:
+                _X, _y = _X.reset_index(drop=True), _y.reset_index(drop=True)
+
+        # if search only uses a sample of rows, pipelines are refitted on full data
+        self._refit = _reader is not None or len(_X) < len(_X_full)
+
         (
             encoder,
             imputer,
@@ -1111,7 +1274,15 @@ class AutoTabularBase:
             #     Example: self.search_algo_settings = {'optimizer': nevergrad.optimizers.NGOpt}."
             # )
 
+        # store of fitted components of all trials, manifest keyed by trial id
+        self._model_store = os.path.abspath(
+            os.path.join(self.temp_directory, self.model_name, "model_store")
+        )
+
         # set trainable
+        # with_parameters puts the data in ray object store once, all trials
+        # on the node get (zero-copy, read-only) views of the numerical data
+        # instead of their own serialized copies
         trainer = tune.with_parameters(
             TabularObjective,
             _X=_X,
@@ -1123,6 +1294,7 @@ class AutoTabularBase:
             feature_selection=feature_selection,
             models=models,
             model_name=self.model_name,
+            model_store=self._model_store,
             task_mode=self.task_mode,
             objective=self.objective,
             validation=self.validation,
@@ -1131,6 +1303,10 @@ class AutoTabularBase:
             reset_index=self.reset_index,
             timeout=self.timeout / 100,
             _iter=self._iter,
+            cache_size=self.cache_size,
+            trial_mode=self.trial_mode,
+            n_fidelity=self.n_fidelity,
+            save_preprocessed=self.save_preprocessed,
             seed=self.seed,
         )
 
@@ -1242,16 +1418,31 @@ class AutoTabularBase:
         # select optimal settings and create the ensemble of pipeline
         self._fit_ensemble(analysis_df.trial_id, analysis_df.config)
 
-        # make sure the ensemble is fitted
-        # usually, most of the methods are already fitted
-        self._ensemble.fit(_X, _y)
+        # search used a sample of rows, fit the ensemble on full data
+        if _reader is not None:
+            self._fit_reader(_reader, list(_X.columns), _response, _row_bytes)
+        else:
+            if self._refit:
+                _X, _y = _X_full, _y_full
+
+            # make sure the ensemble is fitted
+            # usually, most of the methods are already fitted
+            self._ensemble.fit(_X, _y)
 
         # if need to save the ensemble
+        # components used by the ensemble are copied to store next to the model,
+        # the saved ensemble only keeps references to the components
         if self.save:
+            self._relocate_components(
+                ModelStore(os.path.abspath(self.model_name + "_store"))
+            )
             save_methods(self.model_name, [self._ensemble])
 
         # whether to retain temp files
         if self.delete_temp_after_terminate:
+            # components in temp store need to be loaded before removal
+            if not self.save:
+                self._relocate_components(None)
             shutil.rmtree(self.temp_directory)
 
         self._fitted = True
@@ -38,7 +38,12 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import time
 import warnings
+import copy
+import hashlib
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable
 from inspect import getfullargspec
 import scipy
@@ -52,8 +57,10 @@ from ray import tune
 from sklearn.utils._testing import ignore_warnings
 from sklearn.exceptions import ConvergenceWarning
 
+from My_AutoML._base import no_processing
+from My_AutoML._utils._base import has_method
 from My_AutoML._utils._data import formatting
-from My_AutoML._utils._file import save_methods
+from My_AutoML._utils._file import ModelStore, StoredComponent, save_data
 from My_AutoML._utils._data import train_test_split
 
 
@@ -80,6 +87,7 @@ class Pipeline:
         self.model = model
 
         self._fitted = False  # whether the pipeline is fitted
+        self._plan = None  # inference plan is compiled at first prediction
 
     def fit(self, X, y=None):
 
@@ -127,39 +135,168 @@ class Pipeline:
 
         return self
 
+    # preprocessing stages in fitting order and the method transforming data
+    # balancing is not applied when transforming data
+    _fit_stages = [
+        ("encoder", "refit"),
+        ("imputer", "transform"),
+        ("balancing", None),
+        ("scaling", "transform"),
+        ("feature_selection", "transform"),
+    ]
+
+    # transform data by fitted stages before stage stop, all stages if None
+    def _preprocess(self, X, stop=None):
+
+        for _name, _method in self._fit_stages:
+            if _name == stop:
+                break
+            _component = getattr(self, _name)
+            if _component is not None and _method is not None:
+                X = getattr(_component, _method)(X)
+
+        if scipy.sparse.issparse(X):  # check if returns sparse matrix
+            X = X.toarray()
+
+        return X
+
+    # stages can not be fitted by chunks of data, fitted stages are skipped
+    # unfitted stages must be no processing or support partial_fit, model must
+    # support partial_fit, or iterative_fit fitting every call on its own data
+    # (e.g. forests, boosting continues on the data of previous calls)
+    # classifiers refit classes on every iterative_fit call, so members fitted on
+    # chunks lacking a class can not be combined
+    # chunk_classes: whether every chunk has all classes of the response
+    def stream_blockers(self, chunk_classes=True):
+
+        _blockers = []
+        for _name, _ in self._fit_stages:
+            _component = getattr(self, _name)
+            if not (
+                _component is None
+                or _component._fitted
+                or isinstance(_component, no_processing)
+                or has_method(_component, "partial_fit")
+            ):
+                _blockers.append(_name)
+        if self.model is None or not (
+            self.model._fitted
+            or has_method(self.model, "partial_fit")
+            or (
+                getattr(self.model, "_chunked_iterative_fit", False)
+                and (chunk_classes or not has_method(self.model, "predict_proba"))
+            )
+        ):
+            _blockers.append("model")
+
+        return _blockers
+
+    def fit_chunks(self, chunks, n_rows=None, classes=None, chunk_classes=True):
+
+        """
+        Fit the pipeline by chunks of data, every unfitted stage takes one pass
+        over the chunks, only one chunk is in memory at a time
+
+        Parameters
+        ----------
+        chunks: function returning a new iterator of (X, y) chunks for every pass
+
+        n_rows: number of rows in all chunks, default = None
+        required if model is fitted by iterative_fit, iterations of the model are
+        spread over the chunks by number of rows
+
+        classes: all classes of response, default = None
+        passed to partial_fit of classifiers requiring classes
+
+        chunk_classes: whether every chunk has all classes of response, default = True
+        classifiers are not fitted by iterative_fit if False
+        """
+
+        _blockers = self.stream_blockers(chunk_classes=chunk_classes)
+        if _blockers:
+            raise ValueError(
+                "Stages {} can not be fitted by chunks of data.".format(_blockers)
+            )
+
+        for _name, _ in self._fit_stages:
+            _component = getattr(self, _name)
+            if _component is None or _component._fitted:
+                continue
+            if isinstance(_component, no_processing):
+                _component.fit(None)
+                continue
+            for _X, _y in chunks():
+                _component.partial_fit(self._preprocess(_X, stop=_name), _y)
+
+        if not self.model._fitted and has_method(self.model, "partial_fit"):
+            _kwargs = (
+                {"classes": classes}
+                if classes is not None
+                and "classes" in getfullargspec(self.model.partial_fit).args
+                else {}
+            )
+            for _X, _y in chunks():
+                self.model.partial_fit(self._preprocess(_X), _y, **_kwargs)
+            self.model._fitted = True
+        elif not self.model._fitted:
+            if n_rows is None:
+                raise ValueError("n_rows is required to fit model by iterative_fit.")
+            # trees/iterations added on every chunk are proportional to its rows
+            _rows, _n_iter = 0, 0
+            for _X, _y in chunks():
+                _rows += len(_X)
+                if (
+                    classes is not None
+                    and has_method(self.model, "predict_proba")
+                    and len(np.unique(np.asarray(_y))) < len(classes)
+                ):
+                    raise ValueError(
+                        "Every chunk must have all classes to fit by iterative_fit."
+                    )
+                _step = int(round(self.model.max_iter * _rows / n_rows)) - _n_iter
+                if _step > 0:
+                    self.model.iterative_fit(self._preprocess(_X), _y, n_iter=_step)
+                    _n_iter += _step
+                if self.model._fitted:  # early stopped or reached max_iter
+                    break
+
+        self._fitted = True
+
+        return self
+
     def predict(self, X):
 
         if not self._fitted:
             raise ValueError("Pipeline is not fitted!")
 
-        if self.encoder is not None:
-            X = self.encoder.refit(X)
-        if self.imputer is not None:
-            X = self.imputer.fill(X)
-        # no need for balancing
-        if self.scaling is not None:
-            X = self.scaling.transform(X)
-        if self.feature_selection is not None:
-            X = self.feature_selection.transform(X)
-
-        return self.model.predict(X)
+        # stages run in the compiled plan, intermediate results are not copied
+        return self.compile().run(X, "predict")[0]
 
     def predict_proba(self, X):
 
         if not self._fitted:
             raise ValueError("Pipeline is not fitted!")
 
-        if self.encoder is not None:
-            X = self.encoder.refit(X)
-        if self.imputer is not None:
-            X = self.imputer.fill(X)
-        # no need for balancing
-        if self.scaling is not None:
-            X = self.scaling.transform(X)
-        if self.feature_selection is not None:
-            X = self.feature_selection.transform(X)
+        return self.compile().run(X, "predict_proba")[0]
 
-        return self.model.predict_proba(X)
+    def compile(self):
+
+        # compiled inference plan, rebuilt when stages change
+        _components = tuple(
+            getattr(self, stage) for stage, _ in InferencePlan._stages
+        ) + (self.model,)
+        if (
+            getattr(self, "_plan", None) is None
+            or len(self._plan_components) != len(_components)
+            or any(
+                _old is not _new
+                for _old, _new in zip(self._plan_components, _components)
+            )
+        ):
+            self._plan = InferencePlan(self)
+            self._plan_components = _components
+
+        return self._plan
 
 
 class ClassifierEnsemble(formatting):
@@ -224,6 +361,7 @@ class ClassifierEnsemble(formatting):
             if not item[1]._fitted:
                 item[1].fit(X, y)
 
+        self._plan = None  # inference plan is compiled at first prediction
         self._fitted = True
 
         return self
@@ -233,11 +371,28 @@ class ClassifierEnsemble(formatting):
         if not self._fitted:
             raise ValueError("Ensemble is not fitted!")
 
+        # shared preprocessing of pipelines only run once in the plan
+        return self.compile().predict(X)
+
+    def compile(self):
+
+        # compiled inference plan, rebuilt when estimators change
+        if getattr(self, "_plan", None) is None:
+            self._plan = InferencePlan(self)
+
+        return self._plan
+
+    # method of pipelines used for prediction
+    def _member_method(self):
+
+        return "predict" if self.voting == "hard" else "predict_proba"
+
+    # combine predictions of all pipelines
+    def _vote(self, preds):
+
         if self.voting == "hard":
             # calculate predictions for all pipelines
-            pred_list = np.asarray(
-                [pipeline.predict(X) for (name, pipeline) in self.estimators]
-            ).T
+            pred_list = np.asarray(preds).T
             pred = np.apply_along_axis(
                 lambda x: np.argmax(np.bincount(x, weights=self.weights)),
                 axis=1,
@@ -245,9 +400,7 @@ class ClassifierEnsemble(formatting):
             )
         elif self.voting == "soft":
             # calculate probabilities for all pipelines
-            prob_list = np.asarray(
-                [pipeline.predict_proba(X) for (name, pipeline) in self.estimators]
-            )
+            prob_list = np.asarray(preds)
             pred = np.argmax(
                 np.average(prob_list, axis=0, weights=self.weights), axis=1
             )
@@ -321,6 +474,7 @@ class RegressorEnsemble(formatting):
             if not item[1]._fitted:
                 item[1].fit(X, y)
 
+        self._plan = None  # inference plan is compiled at first prediction
         self._fitted = True
 
         return self
@@ -330,10 +484,26 @@ class RegressorEnsemble(formatting):
         if not self._fitted:
             raise ValueError("Ensemble is not fitted!")
 
-        # calculate predictions for all pipelines
-        pred_list = np.asarray(
-            [pipeline.predict(X) for (name, pipeline) in self.estimators]
-        ).T
+        # shared preprocessing of pipelines only run once in the plan
+        return self.compile().predict(X)
+
+    def compile(self):
+
+        # compiled inference plan, rebuilt when estimators change
+        if getattr(self, "_plan", None) is None:
+            self._plan = InferencePlan(self)
+
+        return self._plan
+
+    # method of pipelines used for prediction
+    def _member_method(self):
+
+        return "predict"
+
+    # combine predictions of all pipelines
+    def _vote(self, preds):
+
+        pred_list = np.asarray(preds).T
 
         # if weights not included, not use weights
         if "weights" in getfullargspec(self.voting).args:
@@ -345,6 +515,313 @@ class RegressorEnsemble(formatting):
             return self.voting(pred_list, axis=1)
 
 
+class InferencePlan:
+
+    """
+    Compiled inference plan of a Pipeline or an ensemble of Pipelines
+
+    preprocessing stages are organized as a tree, pipelines sharing the same
+    fitted stages (same object, or same artifact in model store) share the
+    nodes, so shared preprocessing only runs once for all ensemble members
+
+    the input data is never modified, intermediate results copied from the
+    input and only used by one node are owned by the node, and transformed
+    without copy (deep_copy=False)
+
+    Parameters
+    ----------
+    estimator: fitted Pipeline, ClassifierEnsemble or RegressorEnsemble
+    """
+
+    # preprocessing stages used in inference and the method called
+    _stages = [
+        ("encoder", "refit"),
+        ("imputer", "transform"),
+        ("scaling", "transform"),
+        ("feature_selection", "transform"),
+    ]
+    # stages always returning a copy of the data (encoder copies in refit)
+    _copy_stages = ["encoder"]
+
+    def __init__(self, estimator):
+        self.estimator = estimator
+
+        if isinstance(estimator, Pipeline):
+            pipelines = [estimator]
+        else:
+            pipelines = [pipeline for (name, pipeline) in estimator.estimators]
+
+        # node key: (parent node key, stage, component key)
+        # dict keeps insertion order, so parents always run before children
+        self._nodes = OrderedDict()
+        self._members = []  # (last node key, model) of every pipeline
+        for pipeline in pipelines:
+            _key = None
+            for stage, method in self._stages:
+                component = getattr(pipeline, stage)
+                if component is None:
+                    continue
+                _parent, _key = _key, (_key, stage, self._component_key(component))
+                if _key not in self._nodes:
+                    self._nodes[_key] = (_parent, stage, method, component)
+            self._members.append((_key, pipeline.model))
+
+        # nodes being the only user of the output of parent, the input data
+        # (parent None) is never owned
+        _consumers = Counter(_parent for (_parent, _, _, _) in self._nodes.values())
+        _consumers.update(_key for (_key, _) in self._members)
+        self._single = {
+            _key
+            for _key, (_parent, _, _, _) in self._nodes.items()
+            if _parent is not None and _consumers[_parent] == 1
+        }
+
+        self.latency_ = {}  # per stage latency (seconds) of last run
+
+    @staticmethod
+    def _component_key(component):
+
+        # fitted components in model store are identified by artifact key
+        if isinstance(component, StoredComponent):
+            return vars(component)["_key"]
+
+        return id(component)
+
+    # transform X by the component, owned X is transformed without copy
+    # return transformed data and whether it is a copy of X
+    def _transform(self, stage, component, method, X, owned=False):
+
+        # components in model store are transformed by the loaded object
+        if isinstance(component, StoredComponent):
+            component = component.load()
+
+        _deep_copy = getattr(component, "deep_copy", False)
+        if owned and _deep_copy:
+            component.deep_copy = False
+        try:
+            _output = getattr(component, method)(X)
+        finally:
+            if owned and _deep_copy:
+                component.deep_copy = True
+
+        return _output, owned or _deep_copy or stage in self._copy_stages
+
+    @property
+    def n_stages(self):
+
+        return len(self._nodes)
+
+    def run(self, X, method="predict"):
+
+        """
+        Parameters
+        ----------
+        X: features to predict
+
+        method: method of models to call, default = "predict"
+
+        return list of outputs of all pipelines
+        """
+
+        self.latency_ = {stage: 0.0 for stage, _ in self._stages}
+        self.latency_["model"] = 0.0
+
+        # run all preprocessing nodes once
+        _outputs = {None: X}
+        _copies = set()  # nodes with outputs not sharing the input data
+        for _key, (_parent, stage, _method, component) in self._nodes.items():
+            _start = time.perf_counter()
+            # the only user of a copy owns it, and releases it after transformed
+            _owned = _key in self._single and _parent in _copies
+            _input = _outputs.pop(_parent) if _owned else _outputs[_parent]
+            _outputs[_key], _copied = self._transform(
+                stage, component, _method, _input, _owned
+            )
+            if _copied:
+                _copies.add(_key)
+            self.latency_[stage] += time.perf_counter() - _start
+
+        preds = []
+        for _key, model in self._members:
+            _start = time.perf_counter()
+            preds.append(getattr(model, method)(_outputs[_key]))
+            self.latency_["model"] += time.perf_counter() - _start
+
+        return preds
+
+    def predict(self, X):
+
+        if isinstance(self.estimator, Pipeline):
+            if not self.estimator._fitted:
+                raise ValueError("Pipeline is not fitted!")
+            return self.run(X, "predict")[0]
+
+        return self.estimator._vote(self.run(X, self.estimator._member_method()))
+
+    def predict_batch(self, requests):
+
+        """
+        Parameters
+        ----------
+        requests: list of features (dataframe, series as one row or dict as one row)
+
+        all requests are predicted in one run, return list of predictions of requests
+        """
+
+        _requests = [
+            request.to_frame().T
+            if isinstance(request, pd.Series)
+            else pd.DataFrame([request])
+            if isinstance(request, dict)
+            else request
+            for request in requests
+        ]
+        _sizes = np.cumsum([len(request) for request in _requests])[:-1]
+
+        preds = self.predict(pd.concat(_requests, ignore_index=True))
+
+        if isinstance(preds, (pd.DataFrame, pd.Series)):
+            _bounds = zip(np.r_[0, _sizes], np.r_[_sizes, len(preds)])
+            return [preds.iloc[start:end] for start, end in _bounds]
+
+        return np.split(np.asarray(preds), _sizes)
+
+
+# hash the settings/data into a fixed length string
+# used as content-addressed key for the preprocessing cache
+def hash_config(*items):
+
+    _hash = hashlib.md5()
+
+    for item in items:
+        if isinstance(item, (pd.DataFrame, pd.Series)):
+            # hash values, index and column names of the data
+            _hash.update(pd.util.hash_pandas_object(item, index=True).values.tobytes())
+            _hash.update(
+                str(
+                    list(item.columns) if isinstance(item, pd.DataFrame) else item.name
+                ).encode()
+            )
+        else:
+            _hash.update(json.dumps(item, sort_keys=True, default=str).encode())
+
+    return _hash.hexdigest()
+
+
+# get approximate memory (in bytes) of the cached data
+def _get_size(item):
+
+    if isinstance(item, (tuple, list)):
+        return sum(_get_size(_item) for _item in item)
+    elif isinstance(item, (pd.DataFrame, pd.Series)):
+        return int(np.sum(item.memory_usage(index=True)))
+    elif isinstance(item, np.ndarray):
+        return item.nbytes
+    elif scipy.sparse.issparse(item):
+        return item.data.nbytes + item.indices.nbytes + item.indptr.nbytes
+    else:
+        return 0
+
+
+# copy of the data (tuple of arrays/dataframes), None items are kept
+def _copy_data(data):
+
+    return tuple(None if item is None else item.copy() for item in data)
+
+
+class PreprocessingCache:
+
+    """
+    Least recently used (LRU) cache of fitted preprocessing stages, shared by
+    the trials running in the same worker
+
+    cached values are not copied in get/put, they are shared with the trials,
+    trials must not modify them in place (copy before writing)
+
+    Parameters
+    ----------
+    max_size: maximum memory (in MB) of the cached data, default = 1024
+    when exceeded, least recently used results will be evicted
+    if 0, nothing will be cached
+    """
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+
+        self._cache = OrderedDict()  # key -> (size, value)
+        self._size = 0  # memory of cached data in bytes
+
+        # record cache efficiency
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+
+        return len(self._cache)
+
+    def __contains__(self, key):
+
+        return key in self._cache
+
+    def resize(self, max_size):
+
+        self.max_size = max_size
+        self._evict()
+
+        return self
+
+    def get(self, key):
+
+        if key not in self._cache:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        # mark as most recently used
+        self._cache.move_to_end(key)
+
+        return self._cache[key][1]
+
+    def put(self, key, value):
+
+        _size = _get_size(value)
+
+        # not able to cache if the result itself exceeds the limit
+        if _size > self.max_size * 1024 ** 2:
+            return self
+
+        if key in self._cache:
+            self._size -= self._cache.pop(key)[0]
+
+        self._cache[key] = (_size, value)
+        self._size += _size
+        self._evict()
+
+        return self
+
+    def clear(self):
+
+        self._cache.clear()
+        self._size = 0
+
+        return self
+
+    # evict least recently used results until memory under limit
+    def _evict(self):
+
+        while self._cache and self._size > self.max_size * 1024 ** 2:
+            _size, _ = self._cache.popitem(last=False)[1]
+            self._size -= _size
+
+
+# background writer of preprocessed data, one thread to avoid competing for disk
+_SAVING_EXECUTOR = ThreadPoolExecutor(max_workers=1)
+
+# preprocessing cache of current worker
+# with reuse_actors, trials assigned to same worker share the cache
+_PREPROCESSING_CACHE = PreprocessingCache()
+
+
 class TabularObjective(tune.Trainable):
     def setup(
         self,
@@ -358,6 +835,7 @@ class TabularObjective(tune.Trainable):
         feature_selection=None,
         models=None,
         model_name="model",
+        model_store=None,
         task_mode="classification",
         objective="accuracy",
         validation=True,
@@ -366,6 +844,10 @@ class TabularObjective(tune.Trainable):
         reset_index=True,
         timeout=36,
         _iter=1,
+        save_preprocessed=False,
+        trial_mode="one_shot",
+        n_fidelity=4,
+        cache_size=1024,
         seed=1,
     ):
         # assign hyperparameter arguments
@@ -380,6 +862,7 @@ class TabularObjective(tune.Trainable):
         self._X = _X
         self._y = _y
         self.model_name = model_name
+        self.model_store = model_store
         self.task_mode = task_mode
         self.objective = objective
         self.validation = validation
@@ -388,9 +871,51 @@ class TabularObjective(tune.Trainable):
         self.reset_index = reset_index
         self.timeout = timeout
         self._iter = _iter
+        self.save_preprocessed = save_preprocessed
+        self.trial_mode = trial_mode
+        self.n_fidelity = n_fidelity
+        self.cache_size = cache_size
         self.seed = seed
 
+        # check trial mode
+        if self.trial_mode not in ["one_shot", "multi_fidelity"]:
+            raise ValueError(
+                "trial_mode must be either 'one_shot' or 'multi_fidelity', get {}.".format(
+                    self.trial_mode
+                )
+            )
+
+        # check saving format of preprocessed data
+        if self.save_preprocessed not in [False, True, "npy", "parquet", "feather"]:
+            raise ValueError(
+                'save_preprocessed must be one of [False, True, "npy", "parquet", "feather"], get {}.'.format(
+                    self.save_preprocessed
+                )
+            )
+        self._saving = []  # unfinished writing of preprocessed data
+
+        # store of fitted components, default in the trial directory
+        self._store = ModelStore(
+            self.model_store
+            if self.model_store is not None
+            else os.path.abspath(self.model_name)
+        )
+
+        # initialize preprocessing cache
+        self._cache = _PREPROCESSING_CACHE.resize(self.cache_size)
+
         if isinstance(self._X, pd.DataFrame):
+            # data fingerprint and split settings identify the start of pipeline
+            self._data_key = hash_config(
+                self._X,
+                self._y,
+                self.task_mode,
+                self.validation,
+                self.valid_size,
+                self.reset_index,
+                self.seed,
+            )
+
             self.dict2config(config)
 
     def step(self):
@@ -425,6 +950,13 @@ class TabularObjective(tune.Trainable):
 
         return self.status_dict
 
+    def cleanup(self):
+
+        # make sure all preprocessed data are written
+        for _saving in self._saving:
+            _saving.result()
+        self._saving = []
+
     def reset_config(self, new_config):
 
         self.dict2config(new_config)
@@ -550,6 +1082,11 @@ class TabularObjective(tune.Trainable):
             **self._model_hyper
         )  # call the model using passed parameters
 
+        # new configuration, reset the training status
+        self._preprocessed = None  # preprocessed train/test sets
+        self._fidelity_iter = 0  # number of fidelity steps performed
+        self._fully_fitted = False  # whether model trained on full budget
+
         # obj_tmp_directory = self.temp_directory  # + "/iter_" + str(self._iter + 1)
         # if not os.path.isdir(obj_tmp_directory):
         #     os.makedirs(obj_tmp_directory)
@@ -596,6 +1133,236 @@ class TabularObjective(tune.Trainable):
         with open(checkpoint_path, "r") as inp_f:
             self.status_dict = json.load(inp_f)
 
+    # preprocessing stages of the pipeline
+    # X_test/y_test are only transformed when validation is used
+    def _encode(self, X_train, y_train, X_test=None, y_test=None):
+
+        X_train = self.enc.fit(X_train)
+        if X_test is not None:
+            X_test = self.enc.refit(X_test)
+
+        return X_train, y_train, X_test, y_test
+
+    def _impute(self, X_train, y_train, X_test=None, y_test=None):
+
+        X_train = self.imp.fill(X_train)
+        # test set imputed by the state learned on train set
+        if X_test is not None:
+            X_test = self.imp.transform(X_test)
+
+        return X_train, y_train, X_test, y_test
+
+    def _balance(self, X_train, y_train, X_test=None, y_test=None):
+
+        X_train, y_train = self.blc.fit_transform(X_train, y_train)
+        # make sure the classes are integers (belongs to certain classes)
+        if self.validation and self.task_mode == "classification":
+            y_train = y_train.astype(int)
+            y_test = y_test.astype(int)
+
+        return X_train, y_train, X_test, y_test
+
+    def _scale(self, X_train, y_train, X_test=None, y_test=None):
+
+        self.scl.fit(X_train, y_train)
+        X_train = self.scl.transform(X_train)
+        if X_test is not None:
+            X_test = self.scl.transform(X_test)
+
+        return X_train, y_train, X_test, y_test
+
+    def _select_feature(self, X_train, y_train, X_test=None, y_test=None):
+
+        self.fts.fit(X_train, y_train)
+        X_train = self.fts.transform(X_train)
+        if X_test is not None:
+            X_test = self.fts.transform(X_test)
+
+        return X_train, y_train, X_test, y_test
+
+    # run the preprocessing stages in order
+    # every stage is keyed by the data and all stage settings up to the stage,
+    # so the trials sharing a pipeline prefix reuse the fitted methods and
+    # transformed data from the cache instead of refitting
+    def _preprocess(self, X_train, y_train, X_test=None, y_test=None):
+
+        # (stage name, method name, hyperparameters, fitted attribute, stage function)
+        stages = [
+            ("encoding", self._encoder, self._encoder_hyper, "enc", self._encode),
+            ("imputation", self._imputer, self._imputer_hyper, "imp", self._impute),
+            (
+                "balancing",
+                self._balancing,
+                self._balancing_hyper,
+                "blc",
+                self._balance,
+            ),
+            ("scaling", self._scaling, self._scaling_hyper, "scl", self._scale),
+            (
+                "feature selection",
+                self._feature_selection,
+                self._feature_selection_hyper,
+                "fts",
+                self._select_feature,
+            ),
+        ]
+
+        data = (X_train, y_train, X_test, y_test)
+        _key = self._data_key
+        # data shared with the cache are read only, copied (once) only when a
+        # stage needs to be fitted on them, cache hits need no copy
+        _shared = False
+        for stage, method, hyperparameter, attr, stage_func in stages:
+            _key = hash_config(_key, stage, method, hyperparameter)
+
+            cached = self._cache.get(_key) if self.cache_size > 0 else None
+            if cached is not None:
+                # use fitted method from cache, attributes set by the trial
+                # are not written to the cached method
+                fitted_method, data = cached
+                setattr(self, attr, copy.copy(fitted_method))
+                _shared = True
+            else:
+                # stages may modify the input in place
+                data = stage_func(*(_copy_data(data) if _shared else data))
+                if self.cache_size > 0:
+                    self._cache.put(_key, (copy.copy(getattr(self, attr)), data))
+                    _shared = True
+
+            # record the progress of the trial
+            if self.full_status:
+                with open("objective_process.txt", "w") as f:
+                    f.write("{} finished.".format(stage.capitalize()))
+
+        return data
+
+    # split (if validation) and preprocess the data
+    # return order: X_train, y_train, X_test, y_test
+    # if no validation, the performance is evaluated on train set
+    def _get_preprocessed(self):
+
+        if self.validation:
+            # only perform train_test_split when validation
+            # train test split so the performance of model selection and
+            # hyperparameter optimization can be evaluated
+            X_train, X_test, y_train, y_test = train_test_split(
+                self._X, self._y, test_perc=self.valid_size, seed=self.seed
+            )
+
+            if self.reset_index:
+                # reset index to avoid indexing order error
+                X_train.reset_index(drop=True, inplace=True)
+                X_test.reset_index(drop=True, inplace=True)
+                y_train.reset_index(drop=True, inplace=True)
+                y_test.reset_index(drop=True, inplace=True)
+
+            # the split sets are already new copies owned by the trial,
+            # no need to copy again before preprocessing
+            # encoding, imputation, balancing, scaling and feature selection
+            (
+                _X_train_obj,
+                _y_train_obj,
+                _X_test_obj,
+                _y_test_obj,
+            ) = self._preprocess(X_train, y_train, X_test, y_test)
+
+            if scipy.sparse.issparse(_X_train_obj):  # check if returns sparse matrix
+                _X_train_obj = _X_train_obj.toarray()
+            if scipy.sparse.issparse(_X_test_obj):
+                _X_test_obj = _X_test_obj.toarray()
+
+            # store the preprocessed train/test datasets
+            if self.save_preprocessed:
+                self._save_preprocessed(
+                    _X_train_obj, _y_train_obj, "train_preprocessed"
+                )
+                self._save_preprocessed(_X_test_obj, _y_test_obj, "test_preprocessed")
+        else:
+            # self._X is shared by all trials (read-only view from ray object store),
+            # the encoder returns a new dataframe, which is the only copy of
+            # the features owned by the trial, later stages work on the copy
+            # so no copy of the full dataset is needed here
+            _y_obj = self._y.copy()
+
+            # encoding, imputation, balancing, scaling and feature selection
+            _X_obj, _y_obj, _, _ = self._preprocess(self._X, _y_obj)
+
+            if scipy.sparse.issparse(_X_obj):  # check if returns sparse matrix
+                _X_obj = _X_obj.toarray()
+
+            # store the preprocessed train datasets
+            if self.save_preprocessed:
+                self._save_preprocessed(_X_obj, _y_obj, "train_preprocessed")
+
+            # without validation, evaluate on the train set
+            _X_train_obj, _y_train_obj = _X_obj, _y_obj
+            _X_test_obj, _y_test_obj = _X_obj, _y_obj
+
+        return _X_train_obj, _y_train_obj, _X_test_obj, _y_test_obj
+
+    # write preprocessed data in the background (off the critical path of trial)
+    def _save_preprocessed(self, X, y, file_name):
+
+        if not isinstance(X, (np.ndarray, pd.DataFrame)):
+            raise TypeError("Only accept numpy array or pandas dataframe!")
+
+        _format = "npy" if self.save_preprocessed is True else self.save_preprocessed
+        # working directory changes when actor is reused by next trial,
+        # use absolute path to write to current trial directory
+        file_name = os.path.abspath(file_name)
+
+        def _save():
+            if isinstance(X, np.ndarray):  # in case numpy array is returned
+                data = pd.concat(
+                    [pd.DataFrame(X), y.reset_index(drop=True)],
+                    axis=1,
+                    ignore_index=True,
+                )
+            else:
+                data = pd.concat([X, y], axis=1)
+            return save_data(data, file_name, format=_format)
+
+        self._saving.append(_SAVING_EXECUTOR.submit(_save))
+
+    # fit the model on current fidelity
+    # one_shot: fit the model on the full train set once
+    # multi_fidelity: if the model supports iterative_fit, continue training
+    # with doubled iterations; otherwise, refit on doubled number of rows
+    # (1 / 2^(n_fidelity - 1) of train set at first step, full train set at last)
+    def _fit_model(self, X, y):
+
+        self._fidelity_iter += 1
+
+        if self.trial_mode == "one_shot":
+            self.mol.fit(X, y.values.ravel())
+            self._fully_fitted = True
+        elif has_method(self.mol, "iterative_fit"):
+            self.mol.iterative_fit(X, y.values.ravel(), n_iter=2 ** self._fidelity_iter)
+            self._fully_fitted = self.mol._fitted
+        else:
+            n = len(y)
+            _n_rows = int(n * 2 ** (self._fidelity_iter - self.n_fidelity))
+            # rows of lower fidelity are always included in higher fidelity
+            _index = np.random.RandomState(self.seed).permutation(n)[: max(_n_rows, 1)]
+            # make sure all classes are included, otherwise use full train set
+            if self.task_mode == "classification" and len(
+                np.unique(y.values[_index])
+            ) < len(np.unique(y.values)):
+                _index = np.arange(n)
+
+            # refit the model on more rows
+            self.mol = self.models[self._model](**self._model_hyper)
+            if len(_index) < n:
+                self.mol.fit(
+                    X.iloc[_index] if isinstance(X, pd.DataFrame) else X[_index],
+                    y.values[_index].ravel(),
+                )
+            else:
+                self.mol.fit(X, y.values.ravel())
+            self._fully_fitted = len(_index) >= n
+
+        return self
+
     # # wrapped timeout decorator
     # def wrap_timeout(f):
     #     def wrapper(*args):
@@ -681,311 +1448,105 @@ class TabularObjective(tune.Trainable):
                     )
                 )
 
-        if self.validation:
-            # only perform train_test_split when validation
-            # train test split so the performance of model selection and
-            # hyperparameter optimization can be evaluated
-            X_train, X_test, y_train, y_test = train_test_split(
-                self._X, self._y, test_perc=self.valid_size, seed=self.seed
-            )
-
-            if self.reset_index:
-                # reset index to avoid indexing order error
-                X_train.reset_index(drop=True, inplace=True)
-                X_test.reset_index(drop=True, inplace=True)
-                y_train.reset_index(drop=True, inplace=True)
-                y_test.reset_index(drop=True, inplace=True)
-
-            _X_train_obj, _X_test_obj = X_train.copy(), X_test.copy()
-            _y_train_obj, _y_test_obj = y_train.copy(), y_test.copy()
-
-            # encoding
-            _X_train_obj = self.enc.fit(_X_train_obj)
-            _X_test_obj = self.enc.refit(_X_test_obj)
-            # with open(obj_tmp_directory + "/objective_process.txt", "w") as f:
-            with open("objective_process.txt", "w") as f:
-                f.write("Encoding finished, in imputation process.")
-
-            # imputer
-            _X_train_obj = self.imp.fill(_X_train_obj)
-            _X_test_obj = self.imp.fill(_X_test_obj)
-            # with open(obj_tmp_directory + "/objective_process.txt", "w") as f:
-            with open("objective_process.txt", "w") as f:
-                f.write("Imputation finished, in scaling process.")
-
-            # balancing
-            _X_train_obj, _y_train_obj = self.blc.fit_transform(
-                _X_train_obj, _y_train_obj
-            )
-            # with open(obj_tmp_directory + "/objective_process.txt", "w") as f:
-            with open("objective_process.txt", "w") as f:
-                f.write("Balancing finished, in scaling process.")
-            # make sure the classes are integers (belongs to certain classes)
-            if self.task_mode == "classification":
-                _y_train_obj = _y_train_obj.astype(int)
-                _y_test_obj = _y_test_obj.astype(int)
-
-            # scaling
-            self.scl.fit(_X_train_obj, _y_train_obj)
-            _X_train_obj = self.scl.transform(_X_train_obj)
-            _X_test_obj = self.scl.transform(_X_test_obj)
-            # with open(obj_tmp_directory + "/objective_process.txt", "w") as f:
-            with open("objective_process.txt", "w") as f:
-                f.write("Scaling finished, in feature selection process.")
-
-            # feature selection
-            self.fts.fit(_X_train_obj, _y_train_obj)
-            _X_train_obj = self.fts.transform(_X_train_obj)
-            _X_test_obj = self.fts.transform(_X_test_obj)
-            # with open(obj_tmp_directory + "/objective_process.txt", "w") as f:
-            with open("objective_process.txt", "w") as f:
-                f.write(
-                    "Feature selection finished, in {} model.".format(self.task_mode)
-                )
-
-            # fit model
-            if scipy.sparse.issparse(_X_train_obj):  # check if returns sparse matrix
-                _X_train_obj = _X_train_obj.toarray()
-            if scipy.sparse.issparse(_X_test_obj):
-                _X_test_obj = _X_test_obj.toarray()
-
-            # store the preprocessed train/test datasets
-            if isinstance(_X_train_obj, np.ndarray):  # in case numpy array is returned
-                pd.concat(
-                    [pd.DataFrame(_X_train_obj), _y_train_obj],
-                    axis=1,
-                    ignore_index=True,
-                ).to_csv("train_preprocessed.csv", index=False)
-            elif isinstance(_X_train_obj, pd.DataFrame):
-                pd.concat([_X_train_obj, _y_train_obj], axis=1).to_csv(
-                    "train_preprocessed.csv", index=False
-                )
-            else:
-                raise TypeError("Only accept numpy array or pandas dataframe!")
+        # preprocessing is only performed once for every configuration,
+        # following steps (multi-fidelity) continue on the preprocessed data
+        if self._preprocessed is None:
+            self._preprocessed = self._get_preprocessed()
 
-            if isinstance(_X_test_obj, np.ndarray):
-                pd.concat(
-                    [pd.DataFrame(_X_test_obj), _y_test_obj],
-                    axis=1,
-                    ignore_index=True,
-                ).to_csv("test_preprocessed.csv", index=False)
-            elif isinstance(_X_test_obj, pd.DataFrame):
-                pd.concat([_X_test_obj, _y_test_obj], axis=1).to_csv(
-                    "test_preprocessed.csv", index=False
-                )
-            else:
-                raise TypeError("Only accept numpy array or pandas dataframe!")
+        _X_train_obj, _y_train_obj, _X_test_obj, _y_test_obj = self._preprocessed
 
-            self.mol.fit(_X_train_obj, _y_train_obj.values.ravel())
+        # fit model on current fidelity
+        self._fit_model(_X_train_obj, _y_train_obj)
+        if os.path.exists("objective_process.txt"):
             os.remove("objective_process.txt")
 
-            y_pred = self.mol.predict(_X_test_obj)
-            if self.objective in [
-                "R2",
-                "accuracy",
-                "precision",
-                "auc",
-                "hinge",
-                "f1",
-            ]:
-                # special treatment for ["R2", "accuracy", "precision", "auc", "hinge", "f1"]
-                # larger the better, since to minimize, add negative sign
-                _loss = -_obj(_y_test_obj.values, y_pred)
-            else:
-                _loss = _obj(_y_test_obj.values, y_pred)
-
-            # save the fitted model objects
-            save_methods(
-                self.model_name,
-                [self.enc, self.imp, self.blc, self.scl, self.fts, self.mol],
-            )
-
-            with open("testing_objective.txt", "w") as f:
-                f.write("Loss from objective function is: {:.6f}\n".format(_loss))
-                f.write("Loss is calculate using {}.".format(self.objective))
-            self._iter += 1
-
-            # since we tries to minimize the objective function, take negative accuracy here
-            if self.full_status:
-                # tune.report(
-                #     encoder=_encoder,
-                #     encoder_hyperparameter=_encoder_hyper,
-                #     imputer=_imputer,
-                #     imputer_hyperparameter=_imputer_hyper,
-                #     balancing=_balancing,
-                #     balancing_hyperparameter=_balancing_hyper,
-                #     scaling=_scaling,
-                #     scaling_hyperparameter=_scaling_hyper,
-                #     feature_selection=_feature_selection,
-                #     feature_selection_hyperparameter=_feature_selection_hyper,
-                #     model=_model,
-                #     model_hyperparameter=_model_hyper,
-                #     fitted_model=_model,
-                #     training_status="fitted",
-                #     loss=_loss,
-                # )
-                # only for possible checks
-                return {
-                    "encoder": self._encoder,
-                    "encoder_hyperparameter": self._encoder_hyper,
-                    "imputer": self._imputer,
-                    "imputer_hyperparameter": self._imputer_hyper,
-                    "balancing": self._balancing,
-                    "balancing_hyperparameter": self._balancing_hyper,
-                    "scaling": self._scaling,
-                    "scaling_hyperparameter": self._scaling_hyper,
-                    "feature_selection": self._feature_selection,
-                    "feature_selection_hyperparameter": self._feature_selection_hyper,
-                    "model": self._model,
-                    "model_hyperparameter": self._model_hyper,
-                    "fitted_model": self._model,
-                    "training_status": "fitted",
-                    "loss": _loss,
-                }
-            else:
-                # tune.report(
-                #     fitted_model=_model,
-                #     training_status="fitted",
-                #     loss=_loss,
-                # )
-                # only for possible checks
-                return {
-                    "fitted_model": self._model,
-                    "training_status": "fitted",
-                    "loss": _loss,
-                }
+        y_pred = self.mol.predict(_X_test_obj)
+        if self.objective in [
+            "R2",
+            "accuracy",
+            "precision",
+            "auc",
+            "hinge",
+            "f1",
+        ]:
+            # special treatment for ["R2", "accuracy", "precision", "auc", "hinge", "f1"]
+            # larger the better, since to minimize, add negative sign
+            _loss = -_obj(_y_test_obj.values, y_pred)
         else:
-            _X_obj = self._X.copy()
-            _y_obj = self._y.copy()
-
-            # encoding
-            _X_obj = self.enc.fit(_X_obj)
-            # with open(obj_tmp_directory + "/objective_process.txt", "w") as f:
-            with open("objective_process.txt", "w") as f:
-                f.write("Encoding finished, in imputation process.")
-
-            # imputer
-            _X_obj = self.imp.fill(_X_obj)
-            # with open(obj_tmp_directory + "/objective_process.txt", "w") as f:
-            with open("objective_process.txt", "w") as f:
-                f.write("Imputation finished, in scaling process.")
-
-            # balancing
-            _X_obj, _y_obj = self.blc.fit_transform(_X_obj, _y_obj)
-            # with open(obj_tmp_directory + "/objective_process.txt", "w") as f:
-            with open("objective_process.txt", "w") as f:
-                f.write("Balancing finished, in feature selection process.")
-
-            # scaling
-            self.scl.fit(_X_obj, _y_obj)
-            _X_obj = self.scl.transform(_X_obj)
-            # with open(obj_tmp_directory + "/objective_process.txt", "w") as f:
-            with open("objective_process.txt", "w") as f:
-                f.write("Scaling finished, in balancing process.")
-
-            # feature selection
-            self.fts.fit(_X_obj, _y_obj)
-            _X_obj = self.fts.transform(_X_obj)
-            # with open(obj_tmp_directory + "/objective_process.txt", "w") as f:
-            with open("objective_process.txt", "w") as f:
-                f.write(
-                    "Feature selection finished, in {} model.".format(self.task_mode)
-                )
-
-            # fit model
-            if scipy.sparse.issparse(_X_obj):  # check if returns sparse matrix
-                _X_obj = _X_obj.toarray()
-
-            # store the preprocessed train/test datasets
-            if isinstance(_X_obj, np.ndarray):  # in case numpy array is returned
-                pd.concat(
-                    [pd.DataFrame(_X_obj), _y_obj],
-                    axis=1,
-                    ignore_index=True,
-                ).to_csv("train_preprocessed.csv", index=False)
-            elif isinstance(_X_obj, pd.DataFrame):
-                pd.concat([_X_obj, _y_obj], axis=1).to_csv(
-                    "train_preprocessed.csv", index=False
-                )
-            else:
-                raise TypeError("Only accept numpy array or pandas dataframe!")
-
-            self.mol.fit(_X_obj, _y_obj.values.ravel())
-            os.remove("objective_process.txt")
-
-            y_pred = self.mol.predict(_X_obj)
-
-            if self.objective in [
-                "R2",
-                "accuracy",
-                "precision",
-                "auc",
-                "hinge",
-                "f1",
-            ]:
-                # special treatment for ["R2", "accuracy", "precision", "auc", "hinge", "f1"]
-                # larger the better, since to minimize, add negative sign
-                _loss = -_obj(_y_obj.values, y_pred)
-            else:
-                _loss = _obj(_y_obj.values, y_pred)
-
-            # save the fitted model objects
-            save_methods(
-                self.model_name,
-                [self.enc, self.imp, self.blc, self.scl, self.fts, self.mol],
-            )
-
-            # with open(obj_tmp_directory + "/testing_objective.txt", "w") as f:
-            with open("testing_objective.txt", "w") as f:
-                f.write("Loss from objective function is: {:.6f}\n".format(_loss))
-                f.write("Loss is calculate using {}.".format(self.objective))
-            self._iter += 1
+            _loss = _obj(_y_test_obj.values, y_pred)
+
+        # save the fitted model objects, one artifact per component
+        self._store.save(
+            self.trial_id,
+            {
+                "encoder": self.enc,
+                "imputer": self.imp,
+                "balancing": self.blc,
+                "scaling": self.scl,
+                "feature_selection": self.fts,
+                "model": self.mol,
+            },
+        )
 
-            if self.full_status:
-                # tune.report(
-                #     encoder=_encoder,
-                #     encoder_hyperparameter=_encoder_hyper,
-                #     imputer=_imputer,
-                #     imputer_hyperparameter=_imputer_hyper,
-                #     balancing=_balancing,
-                #     balancing_hyperparameter=_balancing_hyper,
-                #     scaling=_scaling,
-                #     scaling_hyperparameter=_scaling_hyper,
-                #     feature_selection=_feature_selection,
-                #     feature_selection_hyperparameter=_feature_selection_hyper,
-                #     model=_model,
-                #     model_hyperparameter=_model_hyper,
-                #     fitted_model=_model,
-                #     training_status="fitted",
-                #     loss=_loss,
-                # )
-                # only for possible checks
-                return {
-                    "encoder": self._encoder,
-                    "encoder_hyperparameter": self._encoder_hyper,
-                    "imputer": self._imputer,
-                    "imputer_hyperparameter": self._imputer_hyper,
-                    "balancing": self._balancing,
-                    "balancing_hyperparameter": self._balancing_hyper,
-                    "scaling": self._scaling,
-                    "scaling_hyperparameter": self._scaling_hyper,
-                    "feature_selection": self._feature_selection,
-                    "feature_selection_hyperparameter": self._feature_selection_hyper,
-                    "model": self._model,
-                    "model_hyperparameter": self._model_hyper,
-                    "fitted_model": self._model,
-                    "training_status": "fitted",
-                    "loss": _loss,
-                }
-            else:
-                # tune.report(
-                #     fitted_model=_model,
-                #     training_status="fitted",
-                #     loss=_loss,
-                # )
-                # only for possible checks
-                return {
-                    "fitted_model": self._model,
-                    "training_status": "fitted",
-                    "loss": _loss,
-                }
+        # with open(obj_tmp_directory + "/testing_objective.txt", "w") as f:
+        with open("testing_objective.txt", "w") as f:
+            f.write("Loss from objective function is: {:.6f}\n".format(_loss))
+            f.write("Loss is calculate using {}.".format(self.objective))
+        self._iter += 1
+
+        # one-shot trial is finished after the first step,
+        # multi-fidelity trial is finished when the model is fully trained
+        # the done status will terminate the trial in ray.tune
+        _done = self._fully_fitted
+
+        # since we tries to minimize the objective function, take negative accuracy here
+        if self.full_status:
+            # tune.report(
+            #     encoder=_encoder,
+            #     encoder_hyperparameter=_encoder_hyper,
+            #     imputer=_imputer,
+            #     imputer_hyperparameter=_imputer_hyper,
+            #     balancing=_balancing,
+            #     balancing_hyperparameter=_balancing_hyper,
+            #     scaling=_scaling,
+            #     scaling_hyperparameter=_scaling_hyper,
+            #     feature_selection=_feature_selection,
+            #     feature_selection_hyperparameter=_feature_selection_hyper,
+            #     model=_model,
+            #     model_hyperparameter=_model_hyper,
+            #     fitted_model=_model,
+            #     training_status="fitted",
+            #     loss=_loss,
+            # )
+            # only for possible checks
+            return {
+                "encoder": self._encoder,
+                "encoder_hyperparameter": self._encoder_hyper,
+                "imputer": self._imputer,
+                "imputer_hyperparameter": self._imputer_hyper,
+                "balancing": self._balancing,
+                "balancing_hyperparameter": self._balancing_hyper,
+                "scaling": self._scaling,
+                "scaling_hyperparameter": self._scaling_hyper,
+                "feature_selection": self._feature_selection,
+                "feature_selection_hyperparameter": self._feature_selection_hyper,
+                "model": self._model,
+                "model_hyperparameter": self._model_hyper,
+                "fitted_model": self._model,
+                "training_status": "fitted",
+                "loss": _loss,
+                "done": _done,
+            }
+        else:
+            # tune.report(
+            #     fitted_model=_model,
+            #     training_status="fitted",
+            #     loss=_loss,
+            # )
+            # only for possible checks
+            return {
+                "fitted_model": self._model,
+                "training_status": "fitted",
+                "loss": _loss,
+                "done": _done,
+            }
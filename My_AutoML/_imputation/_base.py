@@ -39,6 +39,7 @@ SOFTWARE.
 """
 
 import numpy as np
+import scipy.linalg
 
 from My_AutoML._utils import nan_cov
 
@@ -57,41 +58,63 @@ class SimpleImputer:
     'median': fill columns with nan values using median of non nan values
     'most frequent': fill columns with nan values using most frequent of non nan values
     constant: fill columns with nan values using predefined values
+
+    deep_copy: whether to transform on a copy of the data, default = True
     """
 
-    def __init__(self, method="mean"):
+    def __init__(self, method="mean", deep_copy=True):
         self.method = method
+        self.deep_copy = deep_copy
 
         self._fitted = False  # whether the imputer has been fitted
 
-    def fill(self, X):
+    def fit(self, X, y=None):
+
+        # fill values of every column
+        self._values = {}
+        for _column in list(X.columns):
+            try:
+                self._values[_column] = self._get_value(X[_column])
+            except (TypeError, ValueError, IndexError):
+                # value not available (e.g. mean of categorical column),
+                # only raise when the column need to be filled
+                if X[_column].isnull().values.any():
+                    raise
+
+        self._fitted = True
+
+        return self
+
+    def transform(self, X):
 
-        _X = X.copy(deep=True)
+        _X = X.copy(deep=self.deep_copy)
 
         if _X.isnull().values.any():
             features = list(X.columns)
             for _column in features:
                 if X[_column].isnull().values.any():
-                    _X[_column] = self._fill(_X[_column])
-
-        self._fitted = True
+                    _X[_column] = _X[_column].fillna(self._values[_column])
 
         return _X
 
-    def _fill(self, X):
+    def fill(self, X):
+
+        self.fit(X)
+
+        return self.transform(X)
+
+    def _get_value(self, X):
 
         if self.method == "mean":
-            X = X.fillna(np.nanmean(X))
+            return np.nanmean(X)
         elif self.method == "zero":
-            X = X.fillna(0)
+            return 0
         elif self.method == "median":
-            X = X.fillna(np.nanmedian(X))
+            return np.nanmedian(X)
         elif self.method == "most frequent":
-            X = X.fillna(X.value_counts().index[0])
+            return X.value_counts().index[0]
         else:
-            X = X.fillna(self.method)
-
-        return X
+            return self.method
 
 
 class DummyImputer:
@@ -117,127 +140,181 @@ class DummyImputer:
     'median': fill columns with nan values using median of non nan values
     'most frequent': fill columns with nan values using most frequent of non nan values
     constant: fill columns with nan values using predefined values
+
+    deep_copy: whether to transform on a copy of the data, default = True
     """
 
-    def __init__(self, force=False, threshold=0.1, method="zero"):
+    def __init__(self, force=False, threshold=0.1, method="zero", deep_copy=True):
         self.force = force
         self.threshold = threshold
         self.method = method
+        self.deep_copy = deep_copy
 
         self._fitted = False  # whether the imputer has been fitted
 
-    def fill(self, X, y):
+    def fit(self, X, y):
 
-        _X = X.copy(deep=True)
+        # fill values of columns not creating dummy variables
+        # transforms the copy made in transform, no need to copy again
+        self._imputer = SimpleImputer(method=self.method, deep_copy=False).fit(X)
 
-        if _X.isnull().values.any():
-            _X = self._fill(_X, y)
+        # columns creating dummy variables
+        self._dummy = []
+        for _column in list(X.columns):
+            if X[_column].isnull().values.any():
+                _mean_nan = y[X[_column].isnull()].mean()
+                _mean_non_nan = y[~X[_column].isnull()].mean()
+                if abs(_mean_nan / _mean_non_nan - 1) >= self.threshold:
+                    self._dummy.append(_column)
 
         self._fitted = True
 
-        return _X
+        return self
 
-    def _fill(self, X, y):
+    def transform(self, X):
 
-        features = list(X.columns)
+        _X = X.copy(deep=self.deep_copy)
 
-        for _column in features:
-            if X[_column].isnull().values.any():
-                _mean_nan = y[X[_column].isnull()].mean()
-                _mean_non_nan = y[~X[_column].isnull()].mean()
-                if abs(_mean_nan / _mean_non_nan - 1) >= self.threshold:
-                    X[_column + "_nan"] = X[_column].isnull().astype(int)
-                    X[_column] = X[_column].fillna(0)
-                else:
-                    if self.method == "mean":
-                        X[_column] = X[_column].fillna(np.nanmean(X[_column]))
-                    elif self.method == "zero":
-                        X[_column] = X[_column].fillna(0)
-                    elif self.method == "median":
-                        X[_column] = X[_column].fillna(np.nanmedian(X[_column]))
-                    elif self.method == "most frequent":
-                        X[_column] = X[_column].fillna(
-                            X[_column].value_counts().index[0]
-                        )
-                    else:
-                        X[_column] = X[_column].fillna(self.method)
-
-        return X
+        # dummy columns are always created, so the features are consistent
+        for _column in self._dummy:
+            _X[_column + "_nan"] = _X[_column].isnull().astype(int)
+            _X[_column] = _X[_column].fillna(0)
+
+        return self._imputer.transform(_X)
+
+    def fill(self, X, y):
+
+        self.fit(X, y)
+
+        return self.transform(X)
 
 
 class JointImputer:
 
     """
     Impute the missing values assume a joint distribution, default as multivariate Gaussian distribution
+
+    for x = (x_{mis}, x_{obs})^{T} with \mu = (\mu_{mis}, \mu_{obs}).T and \Sigma = ((Sigma_{mis, mis},
+    Sigma_{mis, obs}), (Sigma_{obs, Sigma}, Sigma_{obs, obs})),
+    Conditional distribution x_{mis}|x_{obs} = a is N(\bar(\mu), \bar(\Sigma))
+    where \bar(\mu) = \mu_{mis} + \Sigma_{mis, obs}\Sigma_{obs, obs}^{-1}(a - \mu_{obs})
+    and \bar(\Sigma) = \Sigma_{mis, mis} - \Sigma_{mis, obs}\Sigma_{obs, obs}^{-1}\Sigma_{obs, mis}
+
+    mean and covariance are estimated once in fit, rows sharing the same missing pattern
+    share the conditional distribution, so only one (Cholesky) solve is needed per pattern
+
+    Parameters
+    ----------
+    kernel: joint distribution assumed, default = "normal"
+
+    seed: random seed, default = 1
+
+    deep_copy: whether to transform on a copy of the data, default = True
     """
 
-    def __init__(self, kernel="normal"):
+    def __init__(self, kernel="normal", seed=1, deep_copy=True):
         self.kernel = kernel
+        self.seed = seed
+        self.deep_copy = deep_copy
 
         self._fitted = False  # whether the imputer has been fitted
 
-    def fill(self, X):
+    def fit(self, X, y=None):
 
-        _X = X.copy(deep=True)
+        if self.kernel not in ["normal"]:
+            raise ValueError(
+                'Only support kernel ["normal"], get {}.'.format(self.kernel)
+            )
 
-        if _X.isnull().values.any():
-            _X = self._fill(_X)
+        _X = np.asarray(X, dtype=float)
+
+        # estimate mean and covariance of the joint distribution
+        # covariance uses pairwise-complete observations
+        self._mean = np.nanmean(_X, axis=0)
+        self._cov = nan_cov(_X, pairwise=True)
 
         self._fitted = True
 
+        return self
+
+    def transform(self, X):
+
+        _X = X.copy(deep=self.deep_copy)
+
+        _values = _X.values.astype(float)
+        _mask = np.isnan(_values)
+        _rows = np.where(_mask.any(axis=1))[0]  # rows with missing values
+
+        if len(_rows) == 0:
+            return _X
+
+        np.random.seed(self.seed)
+
+        # group rows by missing pattern
+        _patterns, _group = np.unique(_mask[_rows], axis=0, return_inverse=True)
+        _group = _group.reshape(-1)
+        for _idx, _pattern in enumerate(_patterns):
+            _group_rows = _rows[_group == _idx]
+            _values[np.ix_(_group_rows, _pattern)] = self._fill_pattern(
+                _values[_group_rows], _pattern
+            )
+
+        # only columns with missing values are updated
+        for _column in np.where(_mask.any(axis=0))[0]:
+            _X[_X.columns[_column]] = _values[:, _column]
+
         return _X
 
-    def _fill(self, X):
+    def fill(self, X):
 
-        rows = list(X.index)
-        for _row in rows:
-            if X.loc[_row, :].isnull().values.any():
-                X.loc[_row, :] = self._fill_row(_row, X)
+        self.fit(X)
 
-        return X
+        return self.transform(X)
 
-    def _fill_row(self, row_index, X):
+    def _fill_pattern(self, X, pattern):
 
         """
-        for x = (x_{mis}, x_{obs})^{T} with \mu = (\mu_{mis}, \mu_{obs}).T and \Sigma = ((Sigma_{mis, mis},
-        Sigma_{mis, obs}), (Sigma_{obs, Sigma}, Sigma_{obs, obs})),
-        Conditional distribution x_{mis}|x_{obs} = a is N(\bar(\mu), \bar(\Sigma))
-        where \bar(\mu) = \mu_{mis} + \Sigma_{mis, obs}\Sigma_{obs, obs}^{-1}(a - \mu_{obs})
-        and \bar(\Sigma) = \Sigma_{mis, mis} - \Sigma_{mis, obs}\Sigma_{obs, obs}^{-1}\Sigma_{obs, mis}
+        sample missing values of all rows with the same missing pattern
 
         in coding, 1 = mis, 2 = obs for simpilicity
         """
 
-        _mis_column = np.argwhere(X.loc[row_index, :].isnull().values).T[0]
-        _obs_column = [i for i in range(len(list(X.columns)))]
-        for item in _mis_column:
-            _obs_column.remove(item)
-
-        _mu_1 = np.nanmean(X.iloc[:, _mis_column], axis=0).T.reshape(
-            len(_mis_column), 1
-        )
-        _mu_2 = np.nanmean(X.iloc[:, _obs_column], axis=0).T.reshape(
-            len(_obs_column), 1
-        )
+        _mis_column = np.where(pattern)[0]
+        _obs_column = np.where(~pattern)[0]
 
-        _sigma_11 = nan_cov(X.iloc[:, _mis_column].values)
-        _sigma_22 = nan_cov(X.iloc[:, _obs_column].values)
-        _sigma_12 = nan_cov(
-            X.iloc[:, _mis_column].values, y=X.iloc[:, _obs_column].values
-        )
-        _sigma_21 = nan_cov(
-            X.iloc[:, _obs_column].values, y=X.iloc[:, _mis_column].values
-        )
+        _mu_1 = self._mean[_mis_column]
+        _sigma_11 = self._cov[np.ix_(_mis_column, _mis_column)]
 
-        _a = X.loc[row_index, ~X.loc[row_index, :].isnull()].values.T.reshape(
-            len(_obs_column), 1
-        )
-        _mu = _mu_1 + _sigma_12 @ np.linalg.inv(_sigma_22) @ (_a - _mu_2)
-        _mu = _mu[0]  # multivariate_normal only accept 1 dimension mean
-        _sigma = _sigma_11 - _sigma_12 @ np.linalg.inv(_sigma_22) @ _sigma_21
-
-        X.loc[row_index, X.loc[row_index, :].isnull()] = np.random.multivariate_normal(
-            mean=_mu, cov=_sigma, size=(X.loc[row_index, :].isnull().values.sum(), 1)
+        if len(_obs_column) == 0:  # all missing, use marginal distribution
+            _mu = np.tile(_mu_1, (len(X), 1))
+            _sigma = _sigma_11
+        else:
+            _mu_2 = self._mean[_obs_column]
+            _sigma_22 = self._cov[np.ix_(_obs_column, _obs_column)]
+            _sigma_12 = self._cov[np.ix_(_mis_column, _obs_column)]
+
+            # _coef = \Sigma_{obs, obs}^{-1}\Sigma_{obs, mis}, solved by Cholesky
+            # factorization, add small ridge in case of singular covariance
+            _ridge = 1e-8 * max(np.trace(_sigma_22) / len(_obs_column), 1e-8)
+            try:
+                _factor = scipy.linalg.cho_factor(
+                    _sigma_22 + _ridge * np.eye(len(_obs_column))
+                )
+                _coef = scipy.linalg.cho_solve(_factor, _sigma_12.T)
+            # pairwise covariance may not be positive definite, use least squares
+            except np.linalg.LinAlgError:
+                _coef = np.linalg.lstsq(_sigma_22, _sigma_12.T, rcond=None)[0]
+
+            # conditional mean of all rows in one matrix product
+            _mu = _mu_1 + (X[:, _obs_column] - _mu_2) @ _coef
+            _sigma = _sigma_11 - _sigma_12 @ _coef
+
+        # draw from conditional distribution, all rows share the covariance
+        _noise = np.random.multivariate_normal(
+            mean=np.zeros(len(_mis_column)),
+            cov=_sigma,
+            size=len(X),
+            check_valid="ignore",
         )
 
-        return X.loc[row_index, :]
+        return _mu + _noise
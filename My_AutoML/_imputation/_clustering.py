@@ -38,16 +38,411 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import copy
 import numpy as np
 import pandas as pd
 import warnings
 from functools import partial
 import multiprocessing
-from multiprocessing import Pool
+from multiprocessing import Pool, shared_memory
 
 from My_AutoML._utils import formatting
 from My_AutoML._scaling import MinMaxScale
 
+# state of the worker process in SharedPool
+# the imputer and the shared data are attached once at worker initialization
+_WORKER = {}
+
+
+def _init_shared_worker(imputer, specs):
+
+    _WORKER["imputer"] = imputer
+    _WORKER["shm"] = []  # keep reference to the shared memory
+    _WORKER["data"] = {}
+    for name, (kind, shm_name, shape, dtype, index, columns) in specs.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _WORKER["shm"].append(shm)
+        array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        _WORKER["data"][name] = (
+            pd.DataFrame(array, index=index, columns=columns, copy=False)
+            if kind == "frame"
+            else array
+        )
+
+
+def _shared_task(method, state, copy_data, args, item):
+
+    imputer = _WORKER["imputer"]
+    # only small states (e.g. centroids) are sent with every task
+    imputer.__dict__.update(state)
+    # shared data except the working dataset are attributes of the imputer
+    for name, data in _WORKER["data"].items():
+        if name != "data":
+            setattr(imputer, name, data)
+
+    data = _WORKER["data"]["data"]
+
+    return getattr(imputer, method)(
+        data.copy() if copy_data else data, *args, item
+    )
+
+
+class SharedPool:
+
+    """
+    Long-lived worker pool for the clustering imputers
+
+    numerical dataframes/arrays are copied to shared memory once, the workers
+    attach to them and keep a copy of the imputer (without the shared data) at
+    initialization, so every task only carries small arguments (index ranges,
+    current centroids) instead of the pickled dataset
+
+    Parameters
+    ----------
+    threads: number of worker processes
+
+    imputer: imputer calling the methods
+
+    data: dataframes/arrays to share, dict of {name: data}
+    "data" is the working dataset passed as first argument of the methods,
+    others are set as attributes of the imputer in workers
+    """
+
+    def __init__(self, threads, imputer, data):
+        self.threads = threads
+
+        self._shm = {}
+        self._views = {}  # views of shared memory in main process
+        specs = {}
+        _imputer = copy.copy(imputer)
+        for name, item in data.items():
+            # empty data are not shared
+            if item is None or len(item) == 0:
+                continue
+
+            kind = "frame" if isinstance(item, pd.DataFrame) else "array"
+            values = np.ascontiguousarray(
+                item.values.astype(float) if kind == "frame" else item
+            )
+            shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            view = np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)
+            view[:] = values
+
+            self._shm[name] = shm
+            self._views[name] = view
+            specs[name] = (
+                kind,
+                shm.name,
+                values.shape,
+                values.dtype,
+                item.index if kind == "frame" else None,
+                item.columns if kind == "frame" else None,
+            )
+            # shared data not pickled with the imputer
+            _imputer.__dict__.pop(name, None)
+
+        self.pool = Pool(
+            processes=self.threads,
+            initializer=_init_shared_worker,
+            initargs=(_imputer, specs),
+        )
+
+    def map(self, method, iterable, *args, state={}, copy_data=False):
+
+        """
+        Parameters
+        ----------
+        method: name of the imputer method, called as method(data, *args, item)
+
+        iterable: items (e.g. index ranges) distributed to workers
+
+        state: imputer attributes updated before calling the method, default = {}
+
+        copy_data: whether the method works on a copy of data, default = False
+        set True if the method modifies the data
+        """
+
+        return self.pool.map(
+            partial(_shared_task, method, state, copy_data, args), iterable
+        )
+
+    def update(self, name, values, column=None):
+
+        # write updated values to shared memory, visible to all workers
+        if column is None:
+            self._views[name][:] = np.asarray(values, dtype=self._views[name].dtype)
+        else:
+            self._views[name][:, column] = np.asarray(
+                values, dtype=self._views[name].dtype
+            )
+
+    def close(self):
+
+        self.pool.close()
+        self.pool.join()
+        for shm in self._shm.values():
+            shm.close()
+            shm.unlink()
+        self._shm = {}
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        if exc_type is not None:
+            self.pool.terminate()
+        self.close()
+
+
+# split n rows to batches of batch_size, one batch if batch_size is None
+def _batches(n, batch_size=None):
+
+    batch_size = n if batch_size is None else max(int(batch_size), 1)
+
+    for start in range(0, n, batch_size):
+        yield slice(start, min(start + batch_size, n))
+
+
+def nan_distance(X, centroids, distance="l2", dtype=np.float64, batch_size=None):
+
+    """
+    NaN-aware distance between every row and every centroid, missing values
+    (in rows or centroids) are ignored, same as np.nansum
+
+    Parameters
+    ----------
+    X: rows, array of shape (n, p)
+
+    centroids: centroids, array of shape (k, p)
+
+    distance: 'l1' or 'l2' Euclidean distance, default = 'l2'
+
+    dtype: dtype of the calculation, default = np.float64
+    np.float32 halves the memory for large datasets
+
+    batch_size: number of rows calculated at once, default = None
+    if None, all rows in one batch
+
+    Returns
+    -------
+    distance matrix of shape (n, k)
+    """
+
+    X = np.asarray(X, dtype=dtype)
+    centroids = np.asarray(centroids, dtype=dtype)
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+
+    n = X.shape[0]
+    result = np.empty((n, len(centroids)), dtype=dtype)
+
+    if distance == "l2":
+        # squared distance expansion with missing masks
+        # sum_j m_ij * mc_kj * (x_ij - c_kj) ** 2
+        # = (m * x ** 2) @ mc.T + m @ (mc * c ** 2).T - 2 * x @ c.T
+        c_mask = (~np.isnan(centroids)).astype(dtype)
+        _centroids = np.nan_to_num(centroids)
+        for batch in _batches(n, batch_size):
+            mask = (~np.isnan(X[batch])).astype(dtype)
+            _X = np.nan_to_num(X[batch])
+            squared = (
+                (_X**2) @ c_mask.T + mask @ (_centroids**2).T - 2 * _X @ _centroids.T
+            )
+            # round-off may give small negative values
+            result[batch] = np.sqrt(np.maximum(squared, 0))
+    elif distance == "l1":
+        for batch in _batches(n, batch_size):
+            result[batch] = np.nansum(
+                np.abs(X[batch, None, :] - centroids[None, :, :]), axis=2, dtype=dtype
+            )
+    else:
+        raise ValueError(
+            "Only support distance ['l1', 'l2'], get {}.".format(distance)
+        )
+
+    return result
+
+
+def category_dissimilarity(
+    X, centroids, X_counts=None, centroids_counts=None, batch_size=None
+):
+
+    """
+    Dissimilarity between every row and every centroid on categorical codes
+
+    Parameters
+    ----------
+    X: category codes of rows, array of shape (n, p)
+
+    centroids: category codes of centroids, array of shape (k, p)
+
+    X_counts: number of observations of the category of every row element,
+    array of shape (n, p), default = None
+    0 for missing/unknown categories
+    if None, use simple dissimilarity (number of different categories)
+
+    centroids_counts: number of observations of the category of every centroid
+    element, array of shape (k, p), default = None
+
+    batch_size: number of rows calculated at once, default = None
+    if None, all rows in one batch
+
+    Returns
+    -------
+    dissimilarity matrix of shape (n, k)
+    """
+
+    X = np.asarray(X, dtype=float)
+    centroids = np.asarray(centroids, dtype=float)
+
+    n = X.shape[0]
+    result = np.empty((n, len(centroids)))
+
+    # weighted dissimilarity, weights are
+    # (count_row + count_centroid) / (count_row * count_centroid)
+    # 0 for missing categories in rows
+    if X_counts is not None:
+        X_counts = np.asarray(X_counts, dtype=float)
+        centroids_counts = np.asarray(centroids_counts, dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            _inverse = np.where(X_counts > 0, 1 / X_counts, 0)
+            _c_inverse = 1 / centroids_counts
+
+    for batch in _batches(n, batch_size):
+        # code-equality, missing codes are always different
+        different = X[batch, None, :] != centroids[None, :, :]
+        if X_counts is None:
+            result[batch] = different.sum(axis=2)
+        else:
+            # (r + c) / (r * c) = 1 / c + 1 / r when r > 0
+            weight = np.where(
+                X_counts[batch, None, :] > 0,
+                _inverse[batch, None, :] + _c_inverse[None, :, :],
+                0,
+            )
+            result[batch] = np.nansum(weight * different, axis=2)
+
+    return result
+
+
+class NeighborIndex:
+
+    """
+    Similarity index of rows for neighbor search, rows are centered (PCC) and
+    normalized once, so similarities of a batch of queries to all indexed rows
+    are one matrix product, same as Pearson_Correlation_Coefficient/
+    Cosine_based_similarity of AAI_kNN (missing values ignored, rows of zero
+    norm have similarity 1)
+
+    Parameters
+    ----------
+    data: indexed rows, dataframe or array of shape (n, p)
+
+    similarity: how to calculate similarity among rows, default = 'PCC'
+    support ['PCC', 'COS']
+
+    batch_size: number of queries calculated at once, default = None
+    if None, queries are batched so the similarity matrix of a batch has at most
+    2 ** 24 elements (128 MB)
+    """
+
+    # elements of similarity matrix of a batch when batch_size is None
+    _batch_elements = 2**24
+
+    def __init__(self, data, similarity="PCC", batch_size=None):
+        self.similarity = similarity
+        self.batch_size = batch_size
+
+        if isinstance(data, pd.DataFrame):
+            self.index = np.asarray(data.index)
+            self.columns = list(data.columns)
+            data = data.values
+        else:
+            self.index = np.arange(len(data))
+            self.columns = None
+
+        self.data = np.asarray(data, dtype=float)
+        self._normalized, self._zero = self._normalize(self.data)
+
+    def _normalize(self, X):
+
+        X = np.array(X, dtype=float).reshape(-1, self.data.shape[1])
+
+        if self.similarity == "PCC":
+            with warnings.catch_warnings():
+                # all missing rows get nan mean
+                warnings.simplefilter("ignore", category=RuntimeWarning)
+                X = X - np.nanmean(X, axis=1, keepdims=True)
+        elif self.similarity != "COS":
+            raise ValueError(
+                "Only support similarity ['PCC', 'COS'], get {}.".format(
+                    self.similarity
+                )
+            )
+
+        # missing values have no contribution
+        X = np.nan_to_num(X)
+        norm = np.sqrt(np.sum(X**2, axis=1))
+        zero = norm == 0
+        X[~zero] /= norm[~zero, None]
+
+        return X, zero
+
+    def query(self, X, k, candidates=None):
+
+        """
+        Parameters
+        ----------
+        X: query rows, array of shape (m, p)
+
+        k: number of neighbors
+
+        candidates: boolean mask of indexed rows to search, default = None
+        if None, search all indexed rows
+
+        Returns
+        -------
+        positions of the k most similar rows in indexed rows (ascending
+        similarity) and the similarities, both of shape (m, k)
+        """
+
+        candidates = (
+            np.arange(len(self.data))
+            if candidates is None
+            else np.where(np.asarray(candidates))[0]
+        )
+        _X, _zero = self._normalize(X)
+
+        _k = min(k, len(candidates))
+        positions = np.empty((len(_X), _k), dtype=int)
+        similarity = np.empty(positions.shape)
+        if _k == 0:
+            return positions, similarity
+
+        batch_size = (
+            max(self._batch_elements // len(candidates), 1)
+            if self.batch_size is None
+            else self.batch_size
+        )
+        _normalized = self._normalized[candidates]
+        _candidates_zero = self._zero[candidates]
+        for batch in _batches(len(_X), batch_size):
+            _similarity = _X[batch] @ _normalized.T
+            # special case of denominator being 0
+            _similarity[_zero[batch], :] = 1
+            _similarity[:, _candidates_zero] = 1
+
+            # k largest similarity, only the k selected are sorted
+            order = np.argpartition(_similarity, -_k, axis=1)[:, -_k:]
+            _k_similarity = np.take_along_axis(_similarity, order, axis=1)
+            _sort = np.argsort(_k_similarity, axis=1)
+            positions[batch] = candidates[np.take_along_axis(order, _sort, axis=1)]
+            similarity[batch] = np.take_along_axis(_k_similarity, _sort, axis=1)
+
+        return positions, similarity
+
 
 class AAI_kNN(formatting, MinMaxScale):
 
@@ -148,94 +543,57 @@ class AAI_kNN(formatting, MinMaxScale):
         else:
             return numerator / denominator
 
-    # get column values from k nearest neighbors
-    def _get_k_neighbors(self, test, train, column):
+    # get column values from k nearest neighbors of a batch of rows
+    # neighbor_index: NeighborIndex of the reference rows
+    # candidates: boolean mask of reference rows to search, default = None
+    def _get_k_neighbors(self, test, neighbor_index, column, candidates=None):
 
-        similarity_list = []
-
-        for index in list(train.index):
-            # get similarity between test and all rows in train
-            if self.similarity == "PCC":
-                similarity_list.append(
-                    self.Pearson_Correlation_Coefficient(
-                        test.values, train.loc[index].values
-                    )
-                )
-            elif self.similarity == "COS":
-                similarity_list.append(
-                    self.Cosine_based_similarity(test.values, train.loc[index].values)
-                )
-
-        # get index of k largest similarity in list
-        k_order = np.argsort(similarity_list)[-self.k :]
-        # convert similarity list order to data index
-        k_index = [list(train.index)[i] for i in k_order]
-
-        # get k largest similarity
-        k_similarity = [similarity_list[_index] for _index in k_order]
+        # get similarity between all test rows and reference rows at once
+        positions, k_similarity = neighbor_index.query(
+            np.asarray(test, dtype=float), self.k, candidates=candidates
+        )
 
-        # get the k largest values in the list
-        k_values = [train.loc[_index, column] for _index in k_index]
+        # get the column values of k most similar rows
+        k_values = neighbor_index.data[:, neighbor_index.columns.index(column)][
+            positions
+        ]
 
-        return k_values, k_index, k_similarity
+        return k_values, neighbor_index.index[positions], k_similarity
 
     # AutAI imputation
-    def _AAI_impute(self, X, index, column):
-
-        _X = X.copy(deep=self.deep_copy)
-
-        # (index, column) gives a location of missing value
-        # the goal is to find and impute relatively important data
-
-        # get indexes where column values are not missing
-        U_a = list(_X.loc[~_X[column].isnull()].index.astype(int))
-
-        # find union of columns where both non_missing (each from above)
-        # and missing rows have data
-        T_s = []  # ultimate union of features
-        loc_non_missing_column = set(_X.columns[~_X.loc[index, :].isnull()])
-
-        for _index in U_a:
-            # get all intersection from U_a rows
-            non_missing_columns = set(_X.columns[~_X.loc[_index, :].isnull()])
-            intersection_columns = loc_non_missing_column.intersection(
-                non_missing_columns
+    # every missing value is imputed by the row mean and the similarity weighted
+    # deviations of k neighbors (non-missing in the column) from their row means
+    # neighbor_index: NeighborIndex of X, row_mean: row means of X
+    def _AAI_impute(self, X, neighbor_index, row_mean):
+
+        _values = X.values.astype(float)
+        _mask = np.isnan(_values)
+
+        for _idx, _column in enumerate(X.columns):
+            _missing = _mask[:, _idx]
+            # no missing or no reference rows in the column
+            if not _missing.any() or _missing.all():
+                continue
+
+            # get kNN column values and similarity of all missing rows at once
+            positions, k_similarity = neighbor_index.query(
+                _values[_missing], self.k, candidates=~_missing
             )
+            k_values = X.values[:, _idx][positions]
 
-            if not T_s:  # if empty
-                T_s = intersection_columns
-            else:
-                T_s = T_s.union(intersection_columns)
-
-        T_s = list(T_s)  # convert to list
-
-        # range (U_a, T_s) considered important data
-
-        # use kNN with weight of similarity for imputation
-        for _column in T_s:
-            for _index in list(set(X[X[_column].isnull()].index) & set(U_a)):
-                # get kNN column values, index, and similarity
-                k_values, k_index, k_similarity = self._get_k_neighbors(
-                    _X.loc[_index, :], _X.loc[~_X[_column].isnull()], _column
-                )
-
-                # normalize k_similarity
-                k_similarity = [item / sum(k_similarity) for item in k_similarity]
-
-                # get kNN row mean
-                k_means = [np.nanmean(_X.loc[_index, :]) for _index in k_index]
+            # normalize k_similarity
+            k_similarity = k_similarity / np.sum(k_similarity, axis=1, keepdims=True)
 
-                # calculate impute value
-                _impute = np.nanmean(_X.loc[index, :])
-                for i in range(self.k):
-                    _impute += k_similarity[i] * (k_values[i] - k_means[i])
-
-                _X.loc[_index, _column] = _impute
+            # calculate impute value
+            _values[_missing, _idx] = row_mean[_missing] + np.sum(
+                k_similarity * (k_values - row_mean[positions]), axis=1
+            )
 
-        return _X
+        return pd.DataFrame(_values, index=X.index, columns=X.columns)
 
     # pool tasks on the index chunks
     # every pool task works on part of the chunks
+    # neighbor indexes (and AutAI completion) are built once in _fill
     def Pool_task(self, X, index_list):
 
         _X = X.copy(deep=self.deep_copy)
@@ -249,42 +607,52 @@ class AAI_kNN(formatting, MinMaxScale):
             self.k = min(self.k, len(_X) - len(missing))
 
             if missing.empty:  # if no missing found in the column, skip
-                pass
+                continue
+
+            # use kNN imputation for all missing rows of the column at once
+            # if fitted, use imputed train set for imputation
+            if self._fitted:
+                k_values, _, _ = self._get_k_neighbors(
+                    missing.values, self._index, _column
+                )
             else:
-                for _index in list(missing.index):
-                    # if need AutAI, perform AutAI imputation first
-                    # if fitted, no need for AutAI, directly run kNN imputation
-                    if self.AutAI and not self._fitted:
-                        if self.AutAI_tmp:
-                            _X_tmp = self._AAI_impute(_X, _index, _column)
-                            # get non-missing (determined by _column) rows
-                            non_missing = _X_tmp.loc[~_X_tmp[_column].isnull()]
-                        else:
-                            _X = self._AAI_impute(_X, _index, _column)
-                            # get non-missing (determined by _column) rows
-                            non_missing = _X.loc[~_X[_column].isnull()]
-                    elif not self._fitted:
-                        # get non-missing (determined by _column) rows
-                        non_missing = _X.loc[~_X[_column].isnull()]
-
-                    # use kNN imputation for (_index, _column)
-                    # if fitted, use imputed dataset for imputation
-                    if not self._fitted:
-                        k_values, _, _ = self._get_k_neighbors(
-                            _X.loc[_index, :], non_missing, _column
-                        )
-                        _X.loc[_index, _column] = np.mean(k_values)
-                    else:
-                        k_values, _, _ = self._get_k_neighbors(
-                            _X.loc[_index, :], self.train, _column
-                        )
-                        _X.loc[_index, _column] = np.mean(k_values)
+                # neighbors from non-missing (determined by _column) rows
+                U_a = _X[_column].notnull()
+                k_values, _, _ = self._get_k_neighbors(
+                    missing.values, self._fit_index, _column, candidates=U_a
+                )
+                # permanent AutAI imputation, preserve the imputation
+                # of rows non-missing in _column
+                if self.AutAI and not self.AutAI_tmp:
+                    _X.loc[U_a] = _X.loc[U_a].fillna(self._X_AAI.loc[U_a])
+            _X.loc[missing.index, _column] = np.mean(k_values, axis=1)
 
         # return only the working part
         return _X.loc[index_list, :]
 
+    def fit(self, X, y=None):
+
+        self.fill(X)
+
+        return self
+
+    def transform(self, X):
+
+        if not self._fitted:
+            raise ValueError("Imputer is not fitted!")
+
+        return self._transform(X)
+
     def fill(self, X):
 
+        # fit on X from scratch
+        self._fitted = False
+        self.train = pd.DataFrame()
+
+        return self._transform(X)
+
+    def _transform(self, X):
+
         # make sure input is a dataframe
         if not isinstance(X, pd.DataFrame):
             try:
@@ -302,7 +670,8 @@ class AAI_kNN(formatting, MinMaxScale):
             multiprocessing.cpu_count() if self.threads == -1 else int(self.threads)
         )
 
-        if _X[self.columns].isnull().values.any():
+        # always run on train set, the state is learned in _fill
+        if not self._fitted or _X[self.columns].isnull().values.any():
             _X = self._fill(_X)
         else:
             warnings.warn("No missing values found, no change.")
@@ -314,41 +683,70 @@ class AAI_kNN(formatting, MinMaxScale):
         _X = X.copy(deep=self.deep_copy)
 
         # convert categorical to numerical
-        formatter = formatting(columns=self.columns, inplace=True)
-        formatter.fit(_X)
+        # codes of categories are learned on train set and reused for later
+        # imputation, so codes match the train set and fitted states
+        if not self._fitted:
+            self._formatter = formatting(columns=self.columns, inplace=True)
+            self._formatter.fit(_X)
+        else:
+            self._formatter.recode(_X)
 
         # if scaling, use MinMaxScale to scale the features
         if self.scaling:
-            scaling = MinMaxScale()
-            _X = scaling.fit_transform(_X)
+            # scaling learned on train set is used for later imputation
+            if not self._fitted:
+                self._scaling = MinMaxScale().fit(_X)
+            _X = self._scaling.transform(_X)
 
         # kNN imputation
 
+        # neighbor index of the dataset, built once for all pool tasks
+        # AutAI completes the data once, neighbors of missing rows are searched
+        # on the completed data
+        _X_AAI = None
+        if not self._fitted:
+            self._fit_index = NeighborIndex(_X, self.similarity)
+            if self.AutAI:
+                with warnings.catch_warnings():
+                    # all missing rows get nan mean
+                    warnings.simplefilter("ignore", category=RuntimeWarning)
+                    row_mean = np.nanmean(_X.values.astype(float), axis=1)
+                _X_AAI = self._AAI_impute(_X, self._fit_index, row_mean)
+                self._fit_index = NeighborIndex(_X_AAI, self.similarity)
+
         # parallelized pool workflow
-        pool = Pool(processes=self.threads)
-        # divide indexes to evenly sized chunks
-        divide_index = np.array_split(list(_X.index), self.threads)
+        # the dataset is shared with workers once, tasks only carry index chunks
+        # neighbor indexes are sent to the workers once at initialization
+        with SharedPool(
+            self.threads, self, {"data": _X, "train": self.train, "_X_AAI": _X_AAI}
+        ) as pool:
+            # divide indexes to evenly sized chunks
+            divide_index = np.array_split(list(_X.index), self.threads)
 
-        # parallelized work
-        pool_data = pool.map(partial(self.Pool_task, _X), divide_index)
-        pool.close()
-        pool.join()
+            # parallelized work, every chunk imputes on its own copy
+            pool_data = pool.map(
+                "Pool_task", divide_index, state={"k": self.k}, copy_data=True
+            )
 
         # concat the chunks of the datset
-        _X = pd.concat(pool_data).sort_index()
+        _X = pd.concat(pool_data).sort_index().astype(_X.dtypes.to_dict())
 
         # convert self._fitted and store self.train
         self._fitted = True
         # only when empty need to store
         # stored train is imputed, formatted, scaled dataset
-        self.train = _X.copy() if self.train.empty else self.train
+        if self.train.empty:
+            self.train = _X.copy()
+            # neighbor index of train set, reused for later imputation
+            self._index = NeighborIndex(self.train, self.similarity)
+        self._fit_index = None  # only used in fit
 
         # if scaling, scale back
         if self.scaling:
-            _X = scaling.inverse_transform(_X)
+            _X = self._scaling.inverse_transform(_X)
 
         # convert numerical back to categorical
-        formatter.refit(_X)
+        self._formatter.refit(_X)
 
         return _X
 
@@ -420,6 +818,12 @@ class CMI(formatting, MinMaxScale):
     if -1, use all threads
 
     deep_copy: whether to use deep copy, default = False
+
+    dtype: dtype of the distance calculation, default = np.float64
+    np.float32 halves the memory for large datasets
+
+    batch_size: number of rows assigned to groups at once, default = None
+    if None, assign the whole chunk of every worker at once
     """
 
     def __init__(
@@ -431,6 +835,8 @@ class CMI(formatting, MinMaxScale):
         seed=1,
         threads=-1,
         deep_copy=False,
+        dtype=np.float64,
+        batch_size=None,
     ):
         self.k = k
         self.distance = distance
@@ -439,20 +845,25 @@ class CMI(formatting, MinMaxScale):
         self.seed = seed
         self.threads = threads
         self.deep_copy = deep_copy
+        self.dtype = dtype
+        self.batch_size = batch_size
 
         np.random.seed(seed=self.seed)
 
         self._fitted = False  # whether fitted on train set
         self.train = pd.DataFrame()  # store the imputed train set
 
-    # calculate distance between row and k group mean
+    # calculate distance between rows and k group means
     # 'l1' or 'l2' Euclidean distance
-    def _distance(self, row, k):
-
-        if self.distance == "l2":
-            return np.sqrt(np.nansum((row - self.k_means[k]) ** 2))
-        elif self.distance == "l1":
-            return np.nansum(np.abs(row - self.k_means[k]))
+    def _distance(self, rows):
+
+        return nan_distance(
+            rows,
+            np.asarray(self.k_means, dtype=float),
+            distance=self.distance,
+            dtype=self.dtype,
+            batch_size=self.batch_size,
+        )
 
     # get the Gaussian kernel values
     def _kernel(self, row1, row2):
@@ -476,18 +887,18 @@ class CMI(formatting, MinMaxScale):
     # get group assign for the chunk of data (by index_list)
     def _get_group_assign(self, data, index_list):
 
-        result = []
-        for _index in index_list:
-            # get distance between row and every k groups
-            distance = [self._distance(data.loc[_index, :], _k) for _k in range(self.k)]
-            # assign the row to closest range group
-            result.append(np.argsort(distance)[0])
+        # get distance between rows and every k groups
+        distance = self._distance(data.loc[index_list, :].values)
 
-        return result
+        # assign the rows to closest range group
+        return list(np.argmin(distance, axis=1))
 
     # assign clustering groups according to Euclidean distance
     # only support numerical features
-    def _k_means_clustering(self, X):
+    # pool: SharedPool sharing the dataset and group assignment with workers
+    # return the group assignment of X, group assignment of train set is stored
+    # in group_assign_train when fitted and not changed by later transforms
+    def _k_means_clustering(self, X, pool):
 
         _X = X.copy(deep=self.deep_copy)
 
@@ -507,14 +918,12 @@ class CMI(formatting, MinMaxScale):
 
             # initialize k groups
             self.group_assign = np.random.randint(0, high=self.k, size=n)
+            pool.update("group_assign", self.group_assign)
             # initialize k means
             self.k_means = np.empty([self.k, p])
 
             # parallelized k means calculation
-            pool = Pool(processes=min(int(self.k), self.threads))
-            self.k_means = pool.map(partial(self._get_k_means, _X), list(range(self.k)))
-            pool.close()
-            pool.join()
+            self.k_means = pool.map("_get_k_means", list(range(self.k)))
 
             # if group empty, raise warning and set new k
             self.k_means = [item for item in self.k_means if item.all()]
@@ -528,24 +937,19 @@ class CMI(formatting, MinMaxScale):
                 previous_group_assign = self.group_assign.copy()
 
                 # assign each observation to new group based on k_means
-                pool = Pool(processes=self.threads)
                 divide_index = np.array_split(list(_X.index), self.threads)
                 self.group_assign = pool.map(
-                    partial(self._get_group_assign, _X), divide_index
+                    "_get_group_assign",
+                    divide_index,
+                    state={"k_means": self.k_means, "k": self.k},
                 )
                 # flatten 2d list to 1d
                 self.group_assign = np.array(np.concatenate(self.group_assign).flat)
-                pool.close()
-                pool.join()
+                pool.update("group_assign", self.group_assign)
 
                 # calculate the new k_means
                 # parallelized k means calculation
-                pool = Pool(processes=min(int(self.k), self.threads))
-                self.k_means = pool.map(
-                    partial(self._get_k_means, _X), list(range(self.k))
-                )
-                pool.close()
-                pool.join()
+                self.k_means = pool.map("_get_k_means", list(range(self.k)))
 
                 # if group empty, raise warning and set new k
                 self.k_means = [item for item in self.k_means if item.all()]
@@ -559,68 +963,124 @@ class CMI(formatting, MinMaxScale):
                     <= self.delta
                 ):
                     break
-        else:
-            # copy the train group assignment
+
+            # store the train group assignment, used as reference in transform
             self.group_assign_train = self.group_assign.copy()
 
-            self.group_assign = np.zeros(
-                n
-            )  # re-initialize the group_assign (n may change)
+            return self.group_assign
+        else:
             # assign each observation to new group based on k_means
-            pool = Pool(processes=self.threads)
+            # train group assignment is kept unchanged
             divide_index = np.array_split(list(_X.index), self.threads)
-            self.group_assign = pool.map(
-                partial(self._get_group_assign, _X), divide_index
+            group_assign = pool.map(
+                "_get_group_assign",
+                divide_index,
+                state={"k_means": self.k_means, "k": self.k},
             )
             # flatten 2d list to 1d
-            self.group_assign = np.array(np.concatenate(self.group_assign).flat)
-            pool.close()
-            pool.join()
+            return np.array(np.concatenate(group_assign).flat)
 
     # pool tasks on the column chunks
     # every pool task works on part of the chunks
+    # X is shared by workers, only return the imputed values
     def Pool_task(self, X, _column, non_missing_index, n, index_list):
 
-        _X = X.copy(deep=self.deep_copy)
+        # use train set for reference if fitted
+        _train = self.train if self._fitted else X
 
+        imputation = []
         # find missing indexes belongs to _k group
         for _index in index_list:
-            if not self._fitted:
-                # get the kernel values
-                kernel = np.array(
-                    [
-                        self._kernel(
-                            _X.loc[_index, _X.columns != _column],
-                            _X.loc[__index, _X.columns != _column],
-                        )
-                        for __index in non_missing_index
-                    ]
+            # get the kernel values
+            kernel = np.array(
+                [
+                    self._kernel(
+                        X.loc[_index, X.columns != _column],
+                        _train.loc[__index, _train.columns != _column],
+                    )
+                    for __index in non_missing_index
+                ]
+            )
+            # impute the missing_values
+            imputation.append(
+                np.sum(_train.loc[non_missing_index, _column] * kernel)
+                / (np.sum(kernel) + n ** (-2))
+            )
+
+        # return group data
+        return pd.Series(imputation, index=index_list, name=_column, dtype=float)
+
+    # imputation on formatted, scaled datasets
+    def _impute(self, X, pool):
+
+        _X = X.copy(deep=self.deep_copy)
+
+        # assign observations to self.k groups
+        # get group assignment of _X and self.k_means
+        # if already fitted (working on test data now), get
+        # k_means from train dataset and the group assignment
+        # for train dataset
+        group_assign = self._k_means_clustering(_X, pool)
+
+        for _column in self.columns:
+            for _k in range(self.k):
+                group_index = np.where(group_assign == _k)[0]
+                n = len(group_index)  # number of observations in the group
+                # get the missing/non-missing indexes
+                missing_index = list(
+                    set(_X[_X[_column].isnull()].index) & set(group_index)
                 )
-                # impute the missing_values
-                _X.loc[_index, _column] = np.sum(
-                    _X.loc[non_missing_index, _column] * kernel
-                ) / (np.sum(kernel) + n ** (-2))
-            else:
-                # get the kernel values
-                kernel = np.array(
-                    [
-                        self._kernel(
-                            _X.loc[_index, _X.columns != _column],
-                            self.train.loc[__index, self.train.columns != _column],
-                        )
-                        for __index in non_missing_index
-                    ]
+                if not self._fitted:  # if not fitted, use _X
+                    non_missing_index = list(
+                        set(_X[~_X[_column].isnull()].index) & set(group_index)
+                    )
+                else:  # if fitted, use self.train
+                    # after imputation, there should be no missing in train
+                    # so take all of them
+                    non_missing_index = np.where(self.group_assign_train == _k)[0]
+
+                # parallelize imputation
+                divide_missing_index = np.array_split(missing_index, self.threads)
+                imputation = pool.map(
+                    "Pool_task",
+                    divide_missing_index,
+                    _column,
+                    non_missing_index,
+                    n,
+                    state={"bandwidth": self.bandwidth, "_fitted": self._fitted},
                 )
-                # impute the missing_values
-                _X.loc[_index, _column] = np.sum(
-                    self.train.loc[non_missing_index, _column] * kernel
-                ) / (np.sum(kernel) + n ** (-2))
 
-        # return group data
-        return _X.loc[index_list, _column]
+                imputation = pd.concat(imputation).sort_index()
+                _X.loc[missing_index, _column] = imputation
+
+            # imputed column visible to workers
+            pool.update("data", _X[_column].values, column=self.columns.index(_column))
+
+        return _X
+
+    def fit(self, X, y=None):
+
+        self.fill(X)
+
+        return self
+
+    def transform(self, X):
+
+        if not self._fitted:
+            raise ValueError("Imputer is not fitted!")
+
+        return self._transform(X)
 
     def fill(self, X):
 
+        # fit on X from scratch
+        self._fitted = False
+        self.train = pd.DataFrame()
+
+        return self._transform(X)
+
+    def _transform(self, X):
+
         # make sure input is a dataframe
         if not isinstance(X, pd.DataFrame):
             try:
@@ -638,7 +1098,8 @@ class CMI(formatting, MinMaxScale):
             multiprocessing.cpu_count() if self.threads == -1 else int(self.threads)
         )
 
-        if _X[self.columns].isnull().values.any():
+        # always run on train set, the state is learned in _fill
+        if not self._fitted or _X[self.columns].isnull().values.any():
             _X = self._fill(_X)
         else:
             warnings.warn("No missing values found, no change.")
@@ -650,51 +1111,33 @@ class CMI(formatting, MinMaxScale):
         _X = X.copy(deep=self.deep_copy)
 
         # convert categorical to numerical
-        formatter = formatting(columns=self.columns, inplace=True)
-        formatter.fit(_X)
+        # codes of categories are learned on train set and reused for later
+        # imputation, so codes match the train set and fitted states
+        if not self._fitted:
+            self._formatter = formatting(columns=self.columns, inplace=True)
+            self._formatter.fit(_X)
+        else:
+            self._formatter.recode(_X)
 
         # if scaling, use MinMaxScale to scale the features
         if self.scaling:
-            scaling = MinMaxScale()
-            _X = scaling.fit_transform(_X)
-
-        # imputation on formatted, scaled datasets
-        # assign observations to self.k groups
-        # get self.group_assign and self.k_means
-        # if already fitted (working on test data now), get
-        # k_means from train dataset and the group assignment
-        # for train dataset
-        self._k_means_clustering(_X)
-
-        for _column in self.columns:
-            for _k in range(self.k):
-                group_index = np.where(self.group_assign == _k)[0]
-                n = len(group_index)  # number of observations in the group
-                # get the missing/non-missing indexes
-                missing_index = list(
-                    set(_X[_X[_column].isnull()].index) & set(group_index)
-                )
-                if not self._fitted:  # if not fitted, use _X
-                    non_missing_index = list(
-                        set(_X[~_X[_column].isnull()].index) & set(group_index)
-                    )
-                else:  # if fitted, use self.train
-                    # after imputation, there should be no missing in train
-                    # so take all of them
-                    non_missing_index = np.where(self.group_assign_train == _k)[0]
-
-                # parallelize imputation
-                divide_missing_index = np.array_split(missing_index, self.threads)
-                pool = Pool(self.threads)
-                imputation = pool.map(
-                    partial(self.Pool_task, _X, _column, non_missing_index, n),
-                    divide_missing_index,
-                )
-                pool.close()
-                pool.join()
-
-                imputation = pd.concat(imputation).sort_index()
-                _X.loc[missing_index, _column] = imputation
+            # scaling learned on train set is used for later imputation
+            if not self._fitted:
+                self._scaling = MinMaxScale().fit(_X)
+            _X = self._scaling.transform(_X)
+
+        # one pool for the whole imputation, workers share the dataset,
+        # the train set and the group assignment
+        with SharedPool(
+            self.threads,
+            self,
+            {
+                "data": _X,
+                "train": self.train,
+                "group_assign": np.zeros(len(_X), dtype=int),
+            },
+        ) as pool:
+            _X = self._impute(_X, pool)
 
         # convert self._fitted and store self.train
         self._fitted = True
@@ -704,10 +1147,10 @@ class CMI(formatting, MinMaxScale):
 
         # if scaling, scale back
         if self.scaling:
-            _X = scaling.inverse_transform(_X)
+            _X = self._scaling.inverse_transform(_X)
 
         # convert numerical back to categorical
-        formatter.refit(_X)
+        self._formatter.refit(_X)
 
         return _X
 
@@ -741,6 +1184,12 @@ class k_Prototype_NN(formatting, MinMaxScale):
 
     deep_copy: whether to use deep copy, default = False
 
+    dtype: dtype of the distance calculation, default = np.float64
+    np.float32 halves the memory for large datasets
+
+    batch_size: number of rows assigned to groups at once, default = None
+    if None, assign the whole chunk of every worker at once
+
     ----
     [1] Madhuri, R., Murty, M.R., Murthy, J.V.R., Reddy, P.P. and Satapathy,
     S.C., 2014. Cluster analysis on different data sets using K-modes and
@@ -758,6 +1207,8 @@ class k_Prototype_NN(formatting, MinMaxScale):
         numerics=["int16", "int32", "int64", "float16", "float32", "float64"],
         threads=-1,
         deep_copy=False,
+        dtype=np.float64,
+        batch_size=None,
         seed=1,
     ):
         self.k = k
@@ -767,6 +1218,8 @@ class k_Prototype_NN(formatting, MinMaxScale):
         self.numerics = numerics
         self.threads = threads
         self.deep_copy = deep_copy
+        self.dtype = dtype
+        self.batch_size = batch_size
         self.seed = seed
 
         np.random.seed(self.seed)
@@ -774,84 +1227,61 @@ class k_Prototype_NN(formatting, MinMaxScale):
         self._fitted = False  # check whether fitted on train data
         self.models = {}  # save fit models
 
-    # calculate distance between row and k group mean
+    # calculate distance between rows and k group means
     # 'l1' or 'l2' Euclidean distance
-    def _distance(self, row, k_centroids):
-
-        # if not defining np.float64, may get float and
-        # raise Error not able of iterating
-        if self.distance == "l2":
-            return np.sqrt(
-                np.nansum((row - k_centroids) ** 2, axis=1, dtype=np.float64)
-            )
-        elif self.distance == "l1":
-            return np.nansum(np.abs(row - k_centroids), axis=1, dtype=np.float64)
-
-    # calculate dissimilarity difference between row
-    # and k group
-    def _dissimilarity(self, row, k_centroids):
+    def _distance(self, rows, k_centroids):
+
+        return nan_distance(
+            rows.values,
+            k_centroids.values.astype(float),
+            distance=self.distance,
+            dtype=self.dtype,
+            batch_size=self.batch_size,
+        )
 
-        k, p = k_centroids.shape
+    # calculate dissimilarity difference between rows
+    # and k groups
+    def _dissimilarity(self, rows, k_centroids):
 
         # simple dissimilarity, number of different categories
         if self.dissimilarity == "simple":
-            return np.sum((row.values != k_centroids.values).astype(int), axis=1)
+            return category_dissimilarity(
+                rows.values, k_centroids.values, batch_size=self.batch_size
+            )
         # weighted dissimilarity, weighted based on number of unique categories
         elif self.dissimilarity == "weighted":
-            # set difference between row and k_centroids
-            different_matrix = (row.values != k_centroids.values).astype(int)
-
-            # initialize number counts
-            row_count = np.empty(p)
-            centroids_count = np.empty([k, p])
-
-            for idx, _column in enumerate(list(k_centroids.columns)):
-                # get the category
-                cate = row[_column]
-                # find the corresponding count
-                # if get missing value, count as 0
-                row_count[idx] = (
-                    self.categorical_table[_column][cate] if not cate else 0
-                )
-                for _k in range(k):
-                    # get the category
-                    cate = k_centroids.loc[_k, _column]
-                    # find the corresponding count
-                    centroids_count[_k, idx] = self.categorical_table[_column][cate]
-
-            # calculate the weights based on number of categories
-            weight = np.empty([k, p])
-            # in case get denominator of 0
-            for _p in range(p):
-                for _k in range(k):
-                    weight[_k, _p] = (
-                        (row_count[_p] + centroids_count[_k, _p])
-                        / (row_count[_p] * centroids_count[_k, _p])
-                        if row_count[_p] != 0
-                        else 0
-                    )
+            # find the corresponding count of the categories
+            # if get missing value, count as 0
+            rows_count = rows.apply(
+                lambda column: column.map(self.categorical_table[column.name])
+            ).fillna(0)
+            centroids_count = k_centroids.apply(
+                lambda column: column.map(self.categorical_table[column.name])
+            )
 
-            return np.nansum(np.multiply(weight, different_matrix), axis=1)
+            return category_dissimilarity(
+                rows.values,
+                k_centroids.values,
+                rows_count.values,
+                centroids_count.values,
+                batch_size=self.batch_size,
+            )
 
     # calculate the measurement for given index
     def _get_group_assign(
         self, data, numerical_columns, categorical_columns, index_list
     ):
 
-        group_assign = []
-
-        for _index in index_list:
-            measurement = self._distance(
-                data.loc[_index, numerical_columns], self.k_centroids[numerical_columns]
-            ) + self._dissimilarity(
-                data.loc[_index, categorical_columns],
-                self.k_centroids[categorical_columns],
-            )
-
-            # assign the observations to closest centroids
-            group_assign.append(np.argsort(measurement)[0])
+        measurement = self._distance(
+            data.loc[index_list, numerical_columns],
+            self.k_centroids[numerical_columns],
+        ) + self._dissimilarity(
+            data.loc[index_list, categorical_columns],
+            self.k_centroids[categorical_columns],
+        )
 
-        return group_assign
+        # assign the observations to closest centroids
+        return list(np.argmin(measurement, axis=1))
 
     # calculate the k_centroids for group k
     def _get_k_centroids(self, data, numerical_columns, categorical_columns, k):
@@ -890,7 +1320,10 @@ class k_Prototype_NN(formatting, MinMaxScale):
     # numerical/categorical datasets
     # numerical columns will use k_means with distance
     # categorical columns will use k_modes with dissimilarity
-    def _k_prototypes_clustering(self, X, numerical_columns, categorical_columns):
+    # pool: SharedPool sharing the dataset and group assignment with workers
+    def _k_prototypes_clustering(
+        self, X, numerical_columns, categorical_columns, pool
+    ):
 
         _X = X.copy(deep=self.deep_copy)
 
@@ -929,41 +1362,35 @@ class k_Prototype_NN(formatting, MinMaxScale):
                 # observations among all centroids
 
                 # parallelized calculation for group assignment
-                pool = Pool(processes=self.threads)
                 divide_list = np.array_split(list(_X.index), self.threads)
                 self.group_assign = pool.map(
-                    partial(
-                        self._get_group_assign,
-                        _X,
-                        numerical_columns,
-                        categorical_columns,
-                    ),
+                    "_get_group_assign",
                     divide_list,
+                    numerical_columns,
+                    categorical_columns,
+                    state={
+                        "k_centroids": self.k_centroids,
+                        "categorical_table": self.categorical_table,
+                        "k": self.k,
+                    },
                 )
                 # flatten 2d list to 1d
                 self.group_assign = np.array(np.concatenate(self.group_assign).flat)
-                pool.close()
-                pool.join()
+                pool.update("group_assign", self.group_assign)
 
                 # save k_centroids for comparison
                 previous_k_centroids = self.k_centroids.copy()
 
                 # recalculate the k_centroids
                 # calculate the new k_means
-                pool = Pool(processes=min(int(self.k), self.threads))
                 self.k_centroids = pool.map(
-                    partial(
-                        self._get_k_centroids,
-                        _X,
-                        numerical_columns,
-                        categorical_columns,
-                    ),
+                    "_get_k_centroids",
                     list(range(self.k)),
+                    numerical_columns,
+                    categorical_columns,
                 )
                 # concat the k centroids to one dataframe
                 self.k_centroids = pd.concat(self.k_centroids).sort_index()
-                pool.close()
-                pool.join()
 
                 # if get empty cluster, sort index and renew k
                 self.k_centroids.dropna(inplace=True)
@@ -979,38 +1406,65 @@ class k_Prototype_NN(formatting, MinMaxScale):
         # if fitted, use the trained k_centroids assigning groups
         else:
             # parallelized calculation for group assignment
-            pool = Pool(processes=self.threads)
             divide_list = np.array_split(list(_X.index), self.threads)
             self.group_assign = pool.map(
-                partial(
-                    self._get_group_assign, _X, numerical_columns, categorical_columns
-                ),
+                "_get_group_assign",
                 divide_list,
+                numerical_columns,
+                categorical_columns,
+                state={
+                    "k_centroids": self.k_centroids,
+                    "categorical_table": self.categorical_table,
+                    "k": self.k,
+                },
             )
             # flatten 2d list to 1d
             self.group_assign = np.array(np.concatenate(self.group_assign).flat)
-            pool.close()
-            pool.join()
+            pool.update("group_assign", self.group_assign)
 
     # impute on cluster k
     def _kNN_impute(self, data, k):
 
         from sklearn.impute import KNNImputer
 
+        _index = np.where(self.group_assign == k)[0]
+
         # use 1-NN imputer with clustered groups
         # on train dataset, fit the models
-        if k not in self.models.keys():
+        _new = k not in self.models.keys()
+        if _new:
             self.models[k] = KNNImputer(n_neighbors=1)
-            self.models[k].fit(data.loc[np.where(self.group_assign == k)[0], :])
+            self.models[k].fit(data.loc[_index, :])
         # impute the missing values
-        data.loc[np.where(self.group_assign == k)[0], :] = self.models[k].transform(
-            data.loc[np.where(self.group_assign == k)[0], :]
-        )
+        if len(_index) > 0:
+            data.loc[_index, :] = self.models[k].transform(data.loc[_index, :])
+
+        # return the newly fitted model, models fitted in workers are not kept
+        return data.loc[_index, :], self.models[k] if _new else None
+
+    def fit(self, X, y=None):
+
+        self.fill(X)
+
+        return self
 
-        return data.loc[np.where(self.group_assign == k)[0], :]
+    def transform(self, X):
+
+        if not self._fitted:
+            raise ValueError("Imputer is not fitted!")
+
+        return self._transform(X)
 
     def fill(self, X):
 
+        # fit on X from scratch
+        self._fitted = False
+        self.models = {}
+
+        return self._transform(X)
+
+    def _transform(self, X):
+
         # make sure input is a dataframe
         if not isinstance(X, pd.DataFrame):
             try:
@@ -1028,7 +1482,8 @@ class k_Prototype_NN(formatting, MinMaxScale):
             multiprocessing.cpu_count() if self.threads == -1 else int(self.threads)
         )
 
-        if _X[self.columns].isnull().values.any():
+        # always run on train set, the state is learned in _fill
+        if not self._fitted or _X[self.columns].isnull().values.any():
             _X = self._fill(_X)
         else:
             warnings.warn("No missing values found, no change.")
@@ -1049,36 +1504,58 @@ class k_Prototype_NN(formatting, MinMaxScale):
         # format columns
         # convert categorical to numerical,
         # but no numerical manipulation
-        formatter = formatting(columns=list(_X.columns), inplace=True)
-        formatter.fit(_X)
+        # codes of categories are learned on train set and reused for later
+        # imputation, so codes match the train set and fitted states
+        if not self._fitted:
+            self._formatter = formatting(columns=list(_X.columns), inplace=True)
+            self._formatter.fit(_X)
+        else:
+            self._formatter.recode(_X)
 
         # if scaling, scaling the numerical columns
         if self.scaling:
-            scaling = MinMaxScale()
-            _X = scaling.fit_transform(_X)
-
-        # imputation procedure
-        # assign observations to clustering groups using
-        # k_Prototypes clustering
-        self._k_prototypes_clustering(_X, numeric_columns, categorical_columns)
-
-        # use the clustered groups to impute
-        # parallelized the imputation process according to clusters
-        pool = Pool(processes=min(int(self.k), self.threads))
-        pool_data = pool.map(partial(self._kNN_impute, _X), list(range(self.k)))
+            # scaling learned on train set is used for later imputation
+            if not self._fitted:
+                self._scaling = MinMaxScale().fit(_X)
+            _X = self._scaling.transform(_X)
+
+        # one pool for clustering and imputation, workers share the dataset
+        # and the group assignment
+        with SharedPool(
+            self.threads,
+            self,
+            {"data": _X, "group_assign": np.zeros(len(_X), dtype=int)},
+        ) as pool:
+            # imputation procedure
+            # assign observations to clustering groups using
+            # k_Prototypes clustering
+            self._k_prototypes_clustering(
+                _X, numeric_columns, categorical_columns, pool
+            )
+
+            # use the clustered groups to impute
+            # parallelized the imputation process according to clusters
+            # every cluster imputes on its own copy
+            # fitted models are sent to workers once at pool initialization,
+            # tasks only carry the cluster number
+            pool_data, models = zip(
+                *pool.map("_kNN_impute", list(range(self.k)), copy_data=True)
+            )
+        # models fitted on train set are used for later imputation
+        if not self.models:
+            self.models = dict(enumerate(models))
+
         # concat pool_data and order according to index
-        _X = pd.concat(pool_data).sort_index()
-        pool.close()
-        pool.join()
+        _X = pd.concat(pool_data).sort_index().astype(_X.dtypes.to_dict())
 
         # set fitted to true
         self._fitted = True
 
         # if scaling, scale back
         if self.scaling:
-            _X = scaling.inverse_transform(_X)
+            _X = self._scaling.inverse_transform(_X)
 
         # make sure column types retains
-        formatter.refit(_X)
+        self._formatter.refit(_X)
 
         return _X
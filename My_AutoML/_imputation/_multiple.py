@@ -41,6 +41,7 @@ SOFTWARE.
 import numpy as np
 import pandas as pd
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 
 from My_AutoML._utils import random_index, random_list
 from ._base import SimpleImputer
@@ -51,79 +52,158 @@ class ExpectationMaximization:
     """
     Use Expectation Maximization (EM) to impute missing data[1]
 
-    [1] Impyute.imputation.cs.em
+    features are assumed to follow a multivariate normal distribution, the E step imputes
+    missing values by conditional expectation given the observed values, the M step updates
+    mean and covariance; rows are grouped by missing patterns so every pattern only needs
+    one matrix inversion in each iteration
+
+    [1] Dempster, A.P., Laird, N.M. and Rubin, D.B., 1977. Maximum likelihood from incomplete
+    data via the EM algorithm. Journal of the Royal Statistical Society: Series B
+    (Methodological), 39(1), pp.1-22.
 
     Parameters
     ----------
-    iterations: maximum number of iterations for single imputation, default = 50
+    iterations: maximum number of iterations, default = 50
 
-    threshold: threshold to early stop iterations, default = 0.01
-    only early stop when iterations < self.iterations and change in the imputation < self.threshold
+    threshold: threshold to early stop iterations, default = 1e-4
+    stop when relative change of observed log-likelihood < self.threshold
 
     seed: random seed, default = 1
     """
 
-    def __init__(self, iterations=50, threshold=0.01, seed=1):
+    def __init__(self, iterations=50, threshold=1e-4, seed=1):
         self.iterations = iterations
         self.threshold = threshold
         self.seed = seed
 
         self._fitted = False  # whether the imputer has been fitted
 
+    def fit(self, X, y=None):
+
+        self.fill(X)
+
+        return self
+
+    def transform(self, X):
+
+        _X = X.copy(deep=True)
+
+        _values = _X[self._features].values.astype(float)
+        _mask = np.isnan(_values)
+        if not _mask.any():
+            return _X
+
+        # conditional expectation given observed values
+        _values, _, _ = self._E_step(_values, _mask, self._mu, self._sigma)
+
+        # only columns with missing values are updated
+        for _column in np.where(_mask.any(axis=0))[0]:
+            _X[self._features[_column]] = _values[:, _column]
+
+        return _X
+
     def fill(self, X):
 
         self.iterations = int(self.iterations)
         self.threshold = float(self.threshold)
 
         _X = X.copy(deep=True)
-        n = _X.shape[0]
 
-        if _X.isnull().values.any():
-            _X = self._fill(_X)
+        # only numerical features are modeled
+        self._features = list(_X.select_dtypes(include=np.number).columns)
+        for _column in list(_X.columns):
+            if _column not in self._features and _X[_column].isnull().values.any():
+                raise ValueError(
+                    "ExpectationMaximization can only handle numerical filling, run encoding first!"
+                )
+
+        _values = _X[self._features].values.astype(float)
+        _mask = np.isnan(_values)
+
+        # initial estimates from observed values
+        self._mu = np.nan_to_num(np.nanmean(_values, axis=0))
+        self._sigma = np.diag(np.nan_to_num(np.nanvar(_values, axis=0)))
+        self.loglikelihood = []  # observed log-likelihood of iterations
+
+        if _mask.any():
+            _values = self._fill(_values, _mask)
+            for _column in np.where(_mask.any(axis=0))[0]:
+                _X[self._features[_column]] = _values[:, _column]
+        else:
+            self._sigma = np.cov(_values, rowvar=False, bias=True).reshape(
+                len(self._features), len(self._features)
+            )
 
         self._fitted = True
 
         return _X
 
-    def _fill(self, X):
+    def _fill(self, X, mask):
 
-        features = list(X.columns)
-        np.random.seed(self.seed)
+        n = X.shape[0]
 
-        _missing_feature = []  # features contains missing values
-        _missing_vector = []  # vector with missing values, to mark the missing index
-        # create _missing_table with _missing_feature
-        # missing index will be 1, existed index will be 0
+        for _ in range(self.iterations):
+            # E step, expected values and covariance correction of missing values
+            _X, _correction, _loglikelihood = self._E_step(
+                X, mask, self._mu, self._sigma
+            )
 
-        for _column in features:
-            if X[_column].isnull().values.any():
-                _missing_feature.append(_column)
-                _missing_vector.append(
-                    X[_column].loc[X[_column].isnull()].index.astype(int)
-                )
+            # M step, update mean and covariance
+            self._mu = _X.mean(axis=0)
+            _centered = _X - self._mu
+            self._sigma = (_centered.T @ _centered + _correction) / n
+
+            self.loglikelihood.append(_loglikelihood)
+            if (
+                len(self.loglikelihood) >= 2
+                and np.abs(self.loglikelihood[-1] - self.loglikelihood[-2])
+                <= self.threshold * np.abs(self.loglikelihood[-2])
+            ):
+                break
 
-        _missing_vector = np.array(_missing_vector).T
-        self._missing_table = pd.DataFrame(_missing_vector, columns=_missing_feature)
+        # impute by the final estimates
+        _X, _, _ = self._E_step(X, mask, self._mu, self._sigma)
 
-        for _column in list(self._missing_table.columns):
-            for _index in self._missing_table[_column]:
-                X.loc[_index, _column] = self._EM_iter(X, _index, _column)
+        return _X
 
-        return X
+    # impute missing values by conditional expectation
+    # return imputed values, sum of conditional covariance and observed log-likelihood
+    def _E_step(self, X, mask, mu, sigma):
+
+        _X = np.where(mask, 0, X)
+        _correction = np.zeros(sigma.shape)
+        _loglikelihood = 0
+
+        # group rows by missing patterns
+        _patterns, _inverse = np.unique(mask, axis=0, return_inverse=True)
+        _inverse = _inverse.reshape(-1)
+        for _idx, _pattern in enumerate(_patterns):
+            _rows = np.where(_inverse == _idx)[0]
+            _missing, _observed = np.where(_pattern)[0], np.where(~_pattern)[0]
+
+            _sigma_oo = sigma[np.ix_(_observed, _observed)]
+            _residual = _X[np.ix_(_rows, _observed)] - mu[_observed]
+            # pseudo-inverse in case of singular covariance
+            _inv = np.linalg.pinv(_sigma_oo, hermitian=True)
+
+            if len(_observed) > 0:
+                _, _logdet = np.linalg.slogdet(_sigma_oo)
+                _loglikelihood -= 0.5 * (
+                    len(_rows) * (len(_observed) * np.log(2 * np.pi) + _logdet)
+                    + np.sum((_residual @ _inv) * _residual)
+                )
 
-    def _EM_iter(self, X, index, column):
+            if len(_missing) == 0:
+                continue
 
-        _mark = 1
-        for _ in range(self.iterations):
-            _mu = np.nanmean(X.loc[:, column])
-            _std = np.nanstd(X.loc[:, column])
-            _tmp = np.random.normal(loc=_mu, scale=_std)
-            _delta = np.abs(_tmp - _mark) / _mark
-            if _delta < self.threshold and self.iterations > 10:
-                return _tmp
-            X.loc[index, column] = _tmp
-            _mark = _tmp
-        return _tmp
+            _sigma_mo = sigma[np.ix_(_missing, _observed)]
+            _coef = _sigma_mo @ _inv
+            _X[np.ix_(_rows, _missing)] = mu[_missing] + _residual @ _coef.T
+            _correction[np.ix_(_missing, _missing)] += len(_rows) * (
+                sigma[np.ix_(_missing, _missing)] - _coef @ _sigma_mo.T
+            )
+
+        return _X, _correction, _loglikelihood
 
 
 class KNNImputer:
@@ -164,6 +244,27 @@ class KNNImputer:
 
         self._fitted = False  # whether the imputer has been fitted
 
+    def fit(self, X, y=None):
+
+        self.fill(X)
+
+        return self
+
+    def transform(self, X):
+
+        _X = X.copy(deep=True)
+        _missing = _X.isnull()
+
+        # initial filling, then predict by fitted models in the same order
+        _X = self._imputer.transform(_X)
+        for _column, (_subfeature, fit_model) in self._models.items():
+            if _missing[_column].values.any():
+                _X.loc[_missing[_column], _column] = fit_model.predict(
+                    _X.loc[_missing[_column], _subfeature]
+                )
+
+        return _X
+
     def fill(self, X):
 
         features = list(X.columns)
@@ -172,6 +273,11 @@ class KNNImputer:
                 raise ValueError("KNN Imputation not supported for categorical data!")
 
         _X = X.copy(deep=True)
+
+        # initial filling for missing values
+        self._imputer = SimpleImputer(method=self.method).fit(_X)
+        self._models = {}  # fitted models of features with missing values
+
         if _X.isnull().values.any():
             _X = self._fill(_X)
         else:
@@ -199,14 +305,10 @@ class KNNImputer:
                     X[_column].loc[X[_column].isnull()].index.astype(int)
                 )
 
-        self._missing_vector = np.array(self._missing_vector).T
-        self._missing_table = pd.DataFrame(
-            self._missing_vector, columns=self._missing_feature
-        )
+        # features may have different number of missing values
+        self._missing_table = dict(zip(self._missing_feature, self._missing_vector))
 
-        X = SimpleImputer(method=self.method).fill(
-            X
-        )  # initial filling for missing values
+        X = self._imputer.transform(X)  # initial filling for missing values
 
         random_features = random_list(
             self._missing_feature, self.seed
@@ -281,6 +383,7 @@ class KNNImputer:
             X.loc[X[_column].isnull(), _column] = fit_model.predict(
                 X.loc[X[_column].isnull(), _subfeature]
             )
+            self._models[_column] = (_subfeature, fit_model)
 
         return X
 
@@ -296,133 +399,214 @@ class MissForestImputer:
     Parameters
     ----------
     threshold: threshold to terminate iterations, default = 0
-    At default, if difference between iterations increases, the iteration stops
+    iteration stops when difference between iterations is not larger than threshold,
+    if difference between iterations increases, the iteration stops and the
+    imputation of previous iteration is used
 
     method: initial imputation method for missing values, default = 'mean'
+    categorical features are initially imputed by most frequent values
 
     uni_class: column with unique classes less than uni_class will be considered as categorical, default = 31
+    categorical features are imputed by random forest classifiers
+
+    max_iter: maximum number of iterations, default = 10
+
+    n_estimators: number of trees in every random forest, default = 100
+
+    n_jobs: number of jobs to train every random forest, default = 1
+    if -1, use all threads
+
+    seed: random seed, default = 1
     """
 
-    def __init__(self, threshold=0, method="mean", uni_class=31):
+    def __init__(
+        self,
+        threshold=0,
+        method="mean",
+        uni_class=31,
+        max_iter=10,
+        n_estimators=100,
+        n_jobs=1,
+        seed=1,
+    ):
         self.threshold = threshold
         self.method = method
         self.uni_class = uni_class
+        self.max_iter = max_iter
+        self.n_estimators = n_estimators
+        self.n_jobs = n_jobs
+        self.seed = seed
 
         self._fitted = False  # whether the imputer has been fitted
 
-    def _RFImputer(self, X):
+    def _get_model(self, categorical):
 
-        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
 
-        _delta = []  # criteria of termination
+        model = RandomForestClassifier if categorical else RandomForestRegressor
 
-        while True:
-            for _column in list(self._missing_table.columns):
-                X_old = X.copy(deep=True)
-                _subfeature = list(X_old.columns)
-                _subfeature.remove(str(_column))
-                _missing_index = self._missing_table[_column].tolist()
-                RegModel = RandomForestRegressor()
-                RegModel.fit(
-                    X.loc[~X.index.astype(int).isin(_missing_index), _subfeature],
-                    X.loc[~X.index.astype(int).isin(_missing_index), _column],
-                )
-                _tmp_column = RegModel.predict(
-                    X.loc[X.index.astype(int).isin(_missing_index), _subfeature]
+        return model(
+            n_estimators=int(self.n_estimators),
+            n_jobs=self.n_jobs,
+            random_state=self.seed,
+        )
+
+    def _RFImputer(self, X, mask):
+
+        """
+        Parameters
+        ----------
+        X: initially imputed values, numpy array
+
+        mask: missing mask of X, numpy array
+        """
+
+        # per-column masks and features, not changed over iterations
+        _columns = {}
+        for _column in self._order:
+            _columns[_column] = (
+                np.where(~mask[:, _column])[0],  # observed rows
+                np.where(mask[:, _column])[0],  # missing rows
+                np.delete(np.arange(X.shape[1]), _column),  # features
+            )
+
+        _delta = []  # criteria of termination
+        _models = {}
+
+        for _ in range(int(self.max_iter)):
+            X_old = X.copy()
+            _models_old = _models.copy()
+
+            for _column in self._order:
+                _observed, _missing, _subfeature = _columns[_column]
+                RegModel = self._get_model(self._categorical[_column])
+                RegModel.fit(X[np.ix_(_observed, _subfeature)], X[_observed, _column])
+                X[_missing, _column] = RegModel.predict(
+                    X[np.ix_(_missing, _subfeature)]
                 )
-                X.loc[X.index.astype(int).isin(_missing_index), _column] = _tmp_column
-                _delta.append(self._delta_cal(X, X_old))
-                if len(_delta) >= 2 and _delta[-1] > _delta[-2]:
-                    break
+                _models[_column] = RegModel
+
+            _delta.append(self._delta_cal(X, X_old, mask))
+            # if difference increases, use imputation of previous iteration
             if len(_delta) >= 2 and _delta[-1] > _delta[-2]:
+                X, _models = X_old, _models_old
+                break
+            if _delta[-1] <= self.threshold:
                 break
 
+        # models of features in order of imputation
+        self._models = {
+            self._features[_column]: _models[_column] for _column in self._order
+        }
+
         return X
 
     # calcualte the difference between data newly imputed and before imputation
-    def _delta_cal(self, X_new, X_old):
+    def _delta_cal(self, X_new, X_old, mask):
 
-        if (X_new.shape[0] != X_old.shape[0]) or (X_new.shape[1] != X_old.shape[1]):
+        if X_new.shape != X_old.shape:
             raise ValueError("New and old data must have same size, get different!")
 
-        _numerical_features = []
-        _categorical_features = []
-        for _column in list(self._missing_table.columns):
-            if len(X_old[_column].unique()) <= self.uni_class:
-                _categorical_features.append(_column)
-            else:
-                _numerical_features.append(_column)
-
-        _N_nume = 0
-        _N_deno = 0
-        _F_nume = 0
-        _F_deno = 0
-
-        if len(_numerical_features) > 0:
-            for _column in _numerical_features:
-                _N_nume += ((X_new[_column] - X_old[_column]) ** 2).sum()
-                _N_deno += (X_new[_column] ** 2).sum()
-
-        if len(_categorical_features) > 0:
-            for _column in _categorical_features:
-                _F_nume += (X_new[_column] != X_old[_column]).astype(int).sum()
-                _F_deno += len(self._missing_table[_column])
-
-        if len(_numerical_features) > 0 and len(_categorical_features) > 0:
-            return _N_nume / _N_deno + _F_nume / _F_deno
-        elif len(_numerical_features) > 0:
-            return _N_nume / _N_deno
-        elif len(_categorical_features) > 0:
-            return _F_nume / _F_deno
+        _numerical = ~self._categorical & mask.any(axis=0)
+        _categorical = self._categorical & mask.any(axis=0)
 
-    def fill(self, X):
+        _delta = 0
+        if _numerical.any():
+            _delta += np.sum(
+                (X_new[:, _numerical] - X_old[:, _numerical]) ** 2
+            ) / np.sum(X_new[:, _numerical] ** 2)
+        if _categorical.any():
+            _delta += np.sum(
+                X_new[:, _categorical] != X_old[:, _categorical]
+            ) / np.sum(mask[:, _categorical])
+
+        return _delta
+
+    def fit(self, X, y=None):
+
+        self.fill(X)
+
+        return self
+
+    def transform(self, X):
 
         _X = X.copy(deep=True)
-        if _X.isnull().values.any():
-            _X = self._fill(_X)
-        else:
-            warnings.warn("No nan values found, no change.")
 
-        self._fitted = True
+        _values = _X[self._features].values.astype(float)
+        _mask = np.isnan(_values)
+        if not _mask.any():
+            return _X
+
+        # initial filling, then predict by fitted models in the same order
+        _values = np.where(_mask, self._initial, _values)
+        for _feature, RegModel in self._models.items():
+            _column = self._features.index(_feature)
+            _missing = np.where(_mask[:, _column])[0]
+            if len(_missing) > 0:
+                _values[_missing, _column] = RegModel.predict(
+                    np.delete(_values[_missing], _column, axis=1)
+                )
+
+        # only columns with missing values are updated
+        for _column in np.where(_mask.any(axis=0))[0]:
+            _X[self._features[_column]] = _values[:, _column]
 
         return _X
 
-    def _fill(self, X):
+    def fill(self, X):
 
-        features = list(X.columns)
+        _X = X.copy(deep=True)
 
-        for _column in features:
-            if (X[_column].dtype == object) or (str(X[_column].dtype) == "category"):
+        for _column in list(_X.columns):
+            if (_X[_column].dtype == object) or (str(_X[_column].dtype) == "category"):
                 raise ValueError(
-                    "MICE can only handle numerical filling, run encoding first!"
+                    "MissForest can only handle numerical filling, run encoding first!"
                 )
 
-        _missing_feature = []  # features contains missing values
-        _missing_vector = []  # vector with missing values, to mark the missing index
-        # create _missing_table with _missing_feature
-        # missing index will be 1, existed index will be 0
-        _missing_count = []  # counts for missing values
+        self._features = list(_X.columns)
+        _values = _X.values.astype(float)
+        _mask = np.isnan(_values)
 
-        for _column in features:
-            if X[_column].isnull().values.any():
-                _missing_feature.append(_column)
-                _missing_vector.append(X.loc[X[_column].isnull()].index.astype(int))
-                _missing_count.append(X[_column].isnull().astype(int).sum())
+        # columns with few unique values are categorical
+        self._categorical = np.array(
+            [_X[_column].nunique() <= self.uni_class for _column in self._features]
+        )
 
-        # reorder the missing features by missing counts increasing
-        _order = np.array(_missing_count).argsort().tolist()
-        _missing_count = np.array(_missing_count)[_order].tolist()
-        _missing_feature = np.array(_missing_feature)[_order].tolist()
-        _missing_vector = np.array(_missing_vector)[_order].T.tolist()
+        # initial filling values, most frequent for categorical features
+        _imputer = SimpleImputer(method=self.method).fit(_X)
+        _frequent = SimpleImputer(method="most frequent").fit(
+            _X.loc[:, self._categorical]
+        )
+        self._initial = np.array(
+            [
+                _frequent._values.get(_column, np.nan)
+                if _categorical
+                else _imputer._values.get(_column, np.nan)
+                for _column, _categorical in zip(self._features, self._categorical)
+            ],
+            dtype=float,
+        )
 
-        self._missing_table = pd.DataFrame(_missing_vector, columns=_missing_feature)
+        self._models = {}  # fitted models of features with missing values
+        if _mask.any():
+            # impute features by missing counts increasing
+            _count = _mask.sum(axis=0)
+            self._order = [
+                _column
+                for _column in np.argsort(_count, kind="stable")
+                if _count[_column] > 0
+            ]
+
+            _values = np.where(_mask, self._initial, _values)
+            _values = self._RFImputer(_values, _mask)
+            for _column in self._order:
+                _X[self._features[_column]] = _values[:, _column]
+        else:
+            warnings.warn("No nan values found, no change.")
 
-        X = SimpleImputer(method=self.method).fill(
-            X
-        )  # initial filling for missing values
-        X = self._RFImputer(X)
+        self._fitted = True
 
-        return X
+        return _X
 
 
 class MICE:
@@ -432,13 +616,18 @@ class MICE:
     using single imputation to initialize the imputation step, and iteratively build regression/
     classification model to impute features with missing values [1]
 
+    linear regressions are solved from the sufficient statistics (X^T X), statistics of rows
+    without missing values are computed once, only rows with imputed values are updated in
+    every cycle; LassoCV selects the penalty in the first cycle, later cycles warm start the
+    Lasso/LogisticRegression of the feature
+
     [1] Azur, M.J., Stuart, E.A., Frangakis, C. and Leaf, P.J., 2011. Multiple imputation by
     chained equations: what is it and how does it work?. International journal of methods in
     psychiatric research, 20(1), pp.40-49.
 
     Parameters
     ----------
-    cycle: how many runs of regression/imputation to build the complete data, default = 10
+    cycle: maximum runs of regression/imputation to build the complete data, default = 10
 
     method: the method to initially fill nan values, default = 'mean'
     supproted methods ['mean', 'zero', 'median', 'most frequent', constant]
@@ -448,97 +637,282 @@ class MICE:
     'most frequent': fill columns with nan values using most frequent of non nan values
     constant: fill columns with nan values using predefined values
 
+    tol: convergence criterion, default = 1e-3
+    stop when the largest change of imputed values in a cycle (relative to standard
+    deviation of the feature) is smaller than tol
+
+    n_imputations: number of imputations, default = 1
+    if larger than 1, every imputation is an independent chain drawing imputed values
+    with residual noise, the mean of imputations is returned and all imputations are
+    stored in imputations
+
+    n_jobs: number of imputations run in parallel, default = 1
+
     seed: random seed, default = 1
-    every random draw from the minority class will increase the random seed by 1
+    every imputation chain will increase the random seed by 1
     """
 
-    def __init__(self, cycle=10, method="mean", seed=1):
+    def __init__(
+        self, cycle=10, method="mean", tol=1e-3, n_imputations=1, n_jobs=1, seed=1
+    ):
         self.method = method
         self.cycle = cycle
+        self.tol = tol
+        self.n_imputations = n_imputations
+        self.n_jobs = n_jobs
         self.seed = seed
 
         self._fitted = False  # whether the imputer has been fitted
 
+    def fit(self, X, y=None):
+
+        self.fill(X)
+
+        return self
+
+    def transform(self, X):
+
+        _X = X.copy(deep=True)
+        _values = _X[self._features].values.astype(float)
+        _mask = np.isnan(_values)
+        if not _mask.any():
+            return _X
+
+        # initial filling, then cycles of prediction by fitted models
+        _values = np.where(_mask, self._initial, _values)
+        _columns = [
+            _column for _column in self._order if _mask[:, _column].any()
+        ]
+        for _ in range(self._n_cycle):
+            for _column in _columns:
+                _missing = np.where(_mask[:, _column])[0]
+                # mean of predictions of all imputations
+                _values[_missing, _column] = self._pool(
+                    [
+                        self._predict(model, _values[_missing], _column)
+                        for model in self._models[self._features[_column]]
+                    ],
+                    _column,
+                )
+
+        # only columns with missing values are updated
+        for _column in np.where(_mask.any(axis=0))[0]:
+            _X[self._features[_column]] = _values[:, _column]
+
+        return _X
+
     def fill(self, X):
 
         self.cycle = int(self.cycle)
 
         _X = X.copy(deep=True)
 
-        if _X.isnull().values.any():
-            _X = self._fill(_X)
-        else:
+        for _column in list(_X.columns):
+            if (_X[_column].dtype == object) or (str(_X[_column].dtype) == "category"):
+                raise ValueError(
+                    "MICE can only handle numerical filling, run encoding first!"
+                )
+
+        self._features = list(_X.columns)
+        self._models = {}  # fitted models of features with missing values
+        self._n_cycle = 0  # number of cycles run
+
+        # initial filling for missing values
+        self._imputer = SimpleImputer(method=self.method).fit(_X)
+        self._initial = np.array(
+            [self._imputer._values.get(_column, np.nan) for _column in self._features],
+            dtype=float,
+        )
+
+        _values = _X.values.astype(float)
+        _mask = np.isnan(_values)
+        if not _mask.any():
             warnings.warn("No nan values found, no change.")
+            self._order, self._classes = [], {}
+            self._fitted = True
+            return _X
+
+        self._setup(_values, _mask)
+        _values = np.where(_mask, self._initial, _values)
+
+        # independent imputation chains
+        _seeds = [self.seed + _idx for _idx in range(int(self.n_imputations))]
+        if len(_seeds) == 1:
+            _results = [self._chain(_values, _seeds[0], stochastic=False)]
+        else:
+            with ThreadPoolExecutor(max_workers=max(int(self.n_jobs), 1)) as executor:
+                _results = list(
+                    executor.map(
+                        lambda seed: self._chain(_values, seed, stochastic=True),
+                        _seeds,
+                    )
+                )
+
+        for _column in self._order:
+            self._models[self._features[_column]] = [
+                models[_column] for (_, models, _) in _results
+            ]
+        self._n_cycle = max(n_cycle for (_, _, n_cycle) in _results)
+
+        # pool the imputations
+        self.imputations = [values for (values, _, _) in _results]
+        for _column in self._order:
+            _X[self._features[_column]] = self._pool(
+                [values[:, _column] for values in self.imputations], _column
+            )
 
         self._fitted = True
 
         return _X
 
-    def _fill(self, X):
+    # masks, features and statistics not changed over cycles
+    def _setup(self, values, mask):
 
-        features = list(X.columns)
+        n, p = values.shape
 
-        for _column in features:
-            if (X[_column].dtype == object) or (str(X[_column].dtype) == "category"):
-                raise ValueError(
-                    "MICE can only handle numerical filling, run encoding first!"
-                )
+        # the order to regress on missing features
+        self._order = random_list(list(np.where(mask.any(axis=0))[0]), self.seed)
 
-        self._missing_feature = []  # features contains missing values
-        self._missing_vector = (
-            []
-        )  # vector with missing values, to mark the missing index
-        # create _missing_table with _missing_feature
-        # missing index will be 1, existed index will be 0
+        self._observed = {}  # observed rows of features
+        self._missing = {}  # missing rows of features
+        self._updated = {}  # observed rows of features which have imputed values
+        self._classes = {}  # classes of binary features
+        _incomplete = mask.any(axis=1)
+        for _column in self._order:
+            self._observed[_column] = np.where(~mask[:, _column])[0]
+            self._missing[_column] = np.where(mask[:, _column])[0]
+            self._updated[_column] = np.where(_incomplete & ~mask[:, _column])[0]
+            _classes = np.unique(values[self._observed[_column], _column])
+            if len(_classes) == 2:
+                self._classes[_column] = _classes
 
-        for _column in features:
-            if X[_column].isnull().values.any():
-                self._missing_feature.append(_column)
-                self._missing_vector.append(
-                    X.loc[X[_column].isnull()].index.astype(int)
-                )
+        # standard deviation of features, scale of convergence criterion
+        self._scale = np.nanstd(values, axis=0)
+        self._scale[~(self._scale > 0)] = 1
 
-        self._missing_vector = np.array(self._missing_vector).T
-        self._missing_table = pd.DataFrame(
-            self._missing_vector, columns=self._missing_feature
-        )
+        # linear regression for small number of features, otherwise Lasso
+        self._lasso = p - 1 > 15
 
-        X = SimpleImputer(method=self.method).fill(
-            X
-        )  # initial filling for missing values
+        # rows without missing values never change, compute the statistics once
+        _complete = np.hstack([np.ones((n, 1)), values])[~_incomplete]
+        self._gram = _complete.T @ _complete
 
-        random_features = random_list(
-            self._missing_feature, self.seed
-        )  # the order to regress on missing features
+    # one imputation chain, return imputed values, models and number of cycles
+    def _chain(self, values, seed, stochastic=False):
+
+        # intercept as first column, regressions work on the contiguous array
+        _values = np.ascontiguousarray(
+            np.hstack([np.ones((values.shape[0], 1)), values])
+        )
+        _mask = np.zeros(_values.shape, dtype=bool)
+        for _column in self._order:
+            _mask[self._missing[_column], _column + 1] = True
 
+        rng = np.random.RandomState(seed)
+        models = {}
+        n_cycle = 0
         for _ in range(self.cycle):
-            X = self._cycle_impute(X, random_features)
+            _old = _values[_mask]
+            self._cycle_impute(_values, models, rng, stochastic)
+            n_cycle += 1
+
+            # largest change of imputed values relative to the feature scale
+            _change = np.abs(_values[_mask] - _old) / self._scale[
+                np.where(_mask)[1] - 1
+            ]
+            if _change.max() < self.tol:
+                break
 
-        return X
+        return _values[:, 1:], models, n_cycle
 
-    def _cycle_impute(self, X, random_features):
+    def _cycle_impute(self, X, models, rng, stochastic=False):
 
-        from sklearn.linear_model import LinearRegression, LogisticRegression, LassoCV
+        from sklearn.linear_model import Lasso, LassoCV, LogisticRegression
 
-        features = list(X.columns)
+        for _column in self._order:
+            _observed = self._observed[_column]
+            _missing = self._missing[_column]
+            _subfeature = np.delete(np.arange(X.shape[1]), _column + 1)
 
-        for _column in random_features:
-            _subfeature = features
-            _subfeature.remove(_column)
-            _missing_index = self._missing_table[_column].tolist()
-            X.loc[X.index.astype(int).isin(_missing_index), _column] = np.nan
-            if len(X[_column].unique()) == 2:
-                fit_model = LogisticRegression()
-            elif len(features) <= 15:
-                fit_model = LinearRegression()
+            if _column in self._classes:
+                fit_model = models.get(_column, LogisticRegression(warm_start=True))
+                fit_model.fit(
+                    X[np.ix_(_observed, _subfeature[1:])], X[_observed, _column + 1]
+                )
+                if stochastic:
+                    # draw classes by predicted probabilities
+                    _prob = fit_model.predict_proba(X[np.ix_(_missing, _subfeature[1:])])
+                    _pred = fit_model.classes_[
+                        (rng.uniform(size=len(_missing)) > _prob[:, 0]).astype(int)
+                    ]
+                else:
+                    _pred = fit_model.predict(X[np.ix_(_missing, _subfeature[1:])])
             else:
-                fit_model = LassoCV()
-            fit_model.fit(
-                X.loc[~X[_column].isnull(), _subfeature],
-                X.loc[~X[_column].isnull(), _column],
-            )
-            X.loc[X[_column].isnull(), _column] = fit_model.predict(
-                X.loc[X[_column].isnull(), _subfeature]
-            )
+                if self._lasso:
+                    # select penalty by cross validation once, then warm start
+                    if _column not in models:
+                        _model = LassoCV().fit(
+                            X[np.ix_(_observed, _subfeature[1:])],
+                            X[_observed, _column + 1],
+                        )
+                        models[_column] = Lasso(alpha=_model.alpha_, warm_start=True)
+                    models[_column].fit(
+                        X[np.ix_(_observed, _subfeature[1:])], X[_observed, _column + 1]
+                    )
+                    _coef = np.insert(
+                        models[_column].coef_, 0, models[_column].intercept_
+                    )
+                    fit_model = models[_column]
+                    _residual = (
+                        X[_observed, _column + 1]
+                        - X[np.ix_(_observed, _subfeature)] @ _coef
+                    )
+                    _sigma = np.sqrt(np.mean(_residual**2))
+                else:
+                    # X^T X of observed rows, only rows with imputed values updated
+                    _updated = X[self._updated[_column]]
+                    _gram = self._gram + _updated.T @ _updated
+                    _coef = np.linalg.lstsq(
+                        _gram[np.ix_(_subfeature, _subfeature)],
+                        _gram[_subfeature, _column + 1],
+                        rcond=None,
+                    )[0]
+                    # store the coefficients (intercept first) as the model
+                    fit_model = _coef
+                    # residual sum of squares from the statistics
+                    _rss = (
+                        _gram[_column + 1, _column + 1]
+                        - _coef @ _gram[_subfeature, _column + 1]
+                    )
+                    _sigma = np.sqrt(
+                        max(_rss, 0) / max(len(_observed) - len(_subfeature), 1)
+                    )
+
+                _pred = X[np.ix_(_missing, _subfeature)] @ _coef
+                if stochastic:
+                    # draw with residual noise
+                    _pred = _pred + rng.normal(scale=_sigma, size=len(_missing))
+
+            X[_missing, _column + 1] = _pred
+            if not self._lasso or _column in self._classes:
+                models[_column] = fit_model
 
         return X
+
+    # predict missing values of the feature by fitted model
+    def _predict(self, model, X, column):
+
+        if isinstance(model, np.ndarray):
+            return model[0] + np.delete(X, column, axis=1) @ model[1:]
+
+        return model.predict(np.delete(X, column, axis=1))
+
+    # pool the imputations, binary features use majority vote
+    def _pool(self, imputations, column):
+
+        _mean = np.mean(imputations, axis=0)
+        if column in self._classes:
+            _classes = self._classes[column]
+            return np.where(_mean >= np.mean(_classes), _classes[1], _classes[0])
+
+        return _mean
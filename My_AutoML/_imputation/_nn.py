@@ -196,6 +196,17 @@ class GAIN_tf(formatting, MinMaxScale):
 
         return D_pro
 
+    def fit(self, X, y=None):
+
+        self.fill(X)
+
+        return self
+
+    def transform(self, X):
+
+        # tensorflow session is not kept, the networks are trained on X
+        return self.fill(X)
+
     def fill(self, X):
 
         _X = X.copy(deep=True)
@@ -507,8 +518,28 @@ class GAIN_torch(formatting, MinMaxScale):
 
         return _G_loss, _D_loss
 
+    def fit(self, X, y=None):
+
+        self.fill(X)
+
+        return self
+
+    def transform(self, X):
+
+        if not self._fitted:
+            raise ValueError("Imputer is not fitted!")
+
+        return self._transform(X)
+
     def fill(self, X):
 
+        # train the networks on X from scratch
+        self._fitted = False
+
+        return self._transform(X)
+
+    def _transform(self, X):
+
         # make sure input is a dataframe
         if not isinstance(X, pd.DataFrame):
             try:
@@ -518,7 +549,8 @@ class GAIN_torch(formatting, MinMaxScale):
 
         _X = X.copy(deep=self.deep_copy)
 
-        if _X.isnull().values.any():
+        # always run on train set, the networks are trained in _fill
+        if not self._fitted or _X.isnull().values.any():
             _X = self._fill(_X)
         else:
             warnings.warn("No missing values found, no change.")
@@ -540,9 +572,11 @@ class GAIN_torch(formatting, MinMaxScale):
         formatter.fit(_X)
 
         # if scaling, use MinMaxScale to scale the features
+        # scaling learned on train set is used for later imputation
         if self.scaling:
-            scaling = MinMaxScale()
-            _X = scaling.fit_transform(_X)
+            if not self._fitted:
+                self._scaling = MinMaxScale().fit(_X)
+            _X = self._scaling.transform(_X)
 
         # GAIN imputation
 
@@ -674,7 +708,7 @@ class GAIN_torch(formatting, MinMaxScale):
 
         # if scaling, scale back
         if self.scaling:
-            _X = scaling.inverse_transform(_X)
+            _X = self._scaling.inverse_transform(_X)
 
         # convert numerical back to categorical
         formatter.refit(_X)
@@ -786,6 +820,17 @@ class GAIN(GAIN_tf, GAIN_torch):
                 "No tensorflow or torch installed. This method is not supported."
             )
 
+    def fit(self, X, y=None):
+
+        self.model.fit(X)
+        self._fitted = True
+
+        return self
+
+    def transform(self, X):
+
+        return self.model.transform(X)
+
     def fill(self, X):
 
         self._fitted = True
@@ -191,6 +191,11 @@ class DecisionTreeClassifier(sklearn.tree.DecisionTreeClassifier):
 
 
 class ExtraTreesClassifier:
+
+    # trees added by iterative_fit are only fitted on data of the call,
+    # so the forest can be fitted by chunks of data
+    _chunked_iterative_fit = True
+
     def __init__(
         self,
         criterion="gini",
@@ -223,13 +228,16 @@ class ExtraTreesClassifier:
 
         return MAX_ITER
 
-    def _fit_iteration(self, X, y, n_iter=2):
+    # add n_iter trees/iterations to the fitted estimator (warm start, earlier
+    # ones are kept), fully fitted when reaching max_iter
+    def iterative_fit(self, X, y, n_iter=2):
 
         if self.estimator is None:
             from sklearn.ensemble import ExtraTreesClassifier
 
             self.estimator = ExtraTreesClassifier(
-                n_estimators=n_iter,
+                n_estimators=min(n_iter, self.max_iter),
+                warm_start=True,
                 criterion=self.criterion,
                 max_depth=self.max_depth,
                 max_leaf_nodes=self.max_leaf_nodes,
@@ -246,25 +254,31 @@ class ExtraTreesClassifier:
                 self.estimator.n_estimators, self.max_iter
             )
 
-        self.estimator.fit(X, y)
-
-        if (
-            self.estimator.n_estimators >= self.max_iter
-            or self.estimator.n_estimators >= len(self.estimator.estimators_)
+        # only fit the new trees
+        if self.estimator.n_estimators > len(
+            getattr(self.estimator, "estimators_", [])
         ):
+            self.estimator.fit(X, y)
+
+        # no early stopping for forests, fully fitted at max_iter
+        if self.estimator.n_estimators >= self.max_iter:
             self._fitted = True
 
         return self
 
     def fit(self, X, y):
 
-        self._fit_iteration(X, y, n_iter=2)
+        # fit from scratch, warm start only in iterative_fit
+        self.estimator = None
+        self._fitted = False
+
+        self.iterative_fit(X, y, n_iter=2)
 
         # accelerate iteration process
         iteration = 2
         while not self._fitted:
             n_iter = int(2 ** iteration / 2)
-            self._fit_iteration(X, y, n_iter=n_iter)
+            self.iterative_fit(X, y, n_iter=n_iter)
             iteration += 1
 
         return self
@@ -340,7 +354,9 @@ class HistGradientBoostingClassifier:
 
         return MAX_ITER
 
-    def _fit_iteration(self, X, y, n_iter=2, sample_weight=None):
+    # add n_iter trees/iterations to the fitted estimator (warm start, earlier
+    # ones are kept), fully fitted when reaching max_iter
+    def iterative_fit(self, X, y, n_iter=2, sample_weight=None):
 
         if self.estimator is None:
             from sklearn.ensemble import HistGradientBoostingClassifier
@@ -379,7 +395,8 @@ class HistGradientBoostingClassifier:
                 scoring=self.scoring,
                 n_iter_no_change=self.n_iter_no_change,
                 validation_fraction=self.validation_fraction,
-                max_iter=n_iter,
+                max_iter=min(n_iter, self.max_iter),
+                warm_start=True,
             )
         else:
             self.estimator.max_iter += n_iter  # add n_iter to each step
@@ -401,13 +418,17 @@ class HistGradientBoostingClassifier:
 
     def fit(self, X, y):
 
-        self._fit_iteration(X, y, n_iter=2)
+        # fit from scratch, warm start only in iterative_fit
+        self.estimator = None
+        self._fitted = False
+
+        self.iterative_fit(X, y, n_iter=2)
 
         # accelerate iteration process
         iteration = 2
         while not self._fitted:
             n_iter = int(2 ** iteration / 2)
-            self._fit_iteration(X, y, n_iter=n_iter)
+            self.iterative_fit(X, y, n_iter=n_iter)
             iteration += 1
 
         return self
@@ -870,6 +891,11 @@ class QDA(sklearn.discriminant_analysis.QuadraticDiscriminantAnalysis):
 
 
 class RandomForestClassifier:
+
+    # trees added by iterative_fit are only fitted on data of the call,
+    # so the forest can be fitted by chunks of data
+    _chunked_iterative_fit = True
+
     def __init__(
         self,
         criterion="gini",
@@ -902,13 +928,16 @@ class RandomForestClassifier:
 
         return MAX_ITER
 
-    def _fit_iteration(self, X, y, n_iter=2):
+    # add n_iter trees/iterations to the fitted estimator (warm start, earlier
+    # ones are kept), fully fitted when reaching max_iter
+    def iterative_fit(self, X, y, n_iter=2):
 
         if self.estimator is None:
             from sklearn.ensemble import RandomForestClassifier
 
             self.estimator = RandomForestClassifier(
-                n_estimators=n_iter,
+                n_estimators=min(n_iter, self.max_iter),
+                warm_start=True,
                 criterion=self.criterion,
                 max_features=self.max_features,
                 max_depth=self.max_depth,
@@ -925,25 +954,31 @@ class RandomForestClassifier:
                 self.estimator.n_estimators, self.max_iter
             )
 
-        self.estimator.fit(X, y)
-
-        if (
-            self.estimator.n_estimators >= self.max_iter
-            or self.estimator.n_estimators > len(self.estimator.estimators_)
+        # only fit the new trees
+        if self.estimator.n_estimators > len(
+            getattr(self.estimator, "estimators_", [])
         ):
+            self.estimator.fit(X, y)
+
+        # no early stopping for forests, fully fitted at max_iter
+        if self.estimator.n_estimators >= self.max_iter:
             self._fitted = True
 
         return self
 
     def fit(self, X, y):
 
-        self._fit_iteration(X, y, n_iter=2)
+        # fit from scratch, warm start only in iterative_fit
+        self.estimator = None
+        self._fitted = False
+
+        self.iterative_fit(X, y, n_iter=2)
 
         # accelerate iteration process
         iteration = 2
         while not self._fitted:
             n_iter = int(2 ** iteration / 2)
-            self._fit_iteration(X, y, n_iter=n_iter)
+            self.iterative_fit(X, y, n_iter=n_iter)
             iteration += 1
 
         return self
@@ -1374,6 +1409,11 @@ class DecisionTreeRegressor(sklearn.tree.DecisionTreeRegressor):
 
 
 class ExtraTreesRegressor:
+
+    # trees added by iterative_fit are only fitted on data of the call,
+    # so the forest can be fitted by chunks of data
+    _chunked_iterative_fit = True
+
     def __init__(
         self,
         criterion="mse",
@@ -1406,13 +1446,16 @@ class ExtraTreesRegressor:
 
         return MAX_ITER
 
-    def _fit_iteration(self, X, y, n_iter=2):
+    # add n_iter trees/iterations to the fitted estimator (warm start, earlier
+    # ones are kept), fully fitted when reaching max_iter
+    def iterative_fit(self, X, y, n_iter=2):
 
         if self.estimator is None:
             from sklearn.ensemble import ExtraTreesRegressor
 
             self.estimator = ExtraTreesRegressor(
-                n_estimators=n_iter,
+                n_estimators=min(n_iter, self.max_iter),
+                warm_start=True,
                 criterion=self.criterion,
                 max_depth=self.max_depth,
                 max_leaf_nodes=self.max_leaf_nodes,
@@ -1429,25 +1472,31 @@ class ExtraTreesRegressor:
                 self.estimator.n_estimators, self.max_iter
             )
 
-        self.estimator.fit(X, y)
-
-        if (
-            self.estimator.n_estimators >= self.max_iter
-            or self.estimator.n_estimators >= len(self.estimator.estimators_)
+        # only fit the new trees
+        if self.estimator.n_estimators > len(
+            getattr(self.estimator, "estimators_", [])
         ):
+            self.estimator.fit(X, y)
+
+        # no early stopping for forests, fully fitted at max_iter
+        if self.estimator.n_estimators >= self.max_iter:
             self._fitted = True
 
         return self
 
     def fit(self, X, y):
 
-        self._fit_iteration(X, y, n_iter=2)
+        # fit from scratch, warm start only in iterative_fit
+        self.estimator = None
+        self._fitted = False
+
+        self.iterative_fit(X, y, n_iter=2)
 
         # accelerate iteration process
         iteration = 2
         while not self._fitted:
             n_iter = int(2 ** iteration / 2)
-            self._fit_iteration(X, y, n_iter=n_iter)
+            self.iterative_fit(X, y, n_iter=n_iter)
             iteration += 1
 
         return self
@@ -1542,7 +1591,9 @@ class HistGradientBoostingRegressor:
 
         return MAX_ITER
 
-    def _fit_iteration(self, X, y, n_iter=2, sample_weight=None):
+    # add n_iter trees/iterations to the fitted estimator (warm start, earlier
+    # ones are kept), fully fitted when reaching max_iter
+    def iterative_fit(self, X, y, n_iter=2, sample_weight=None):
 
         if self.estimator is None:
             from sklearn.ensemble import HistGradientBoostingRegressor
@@ -1581,7 +1632,8 @@ class HistGradientBoostingRegressor:
                 scoring=self.scoring,
                 n_iter_no_change=self.n_iter_no_change,
                 validation_fraction=self.validation_fraction,
-                max_iter=n_iter,
+                max_iter=min(n_iter, self.max_iter),
+                warm_start=True,
             )
         else:
             self.estimator.max_iter += n_iter  # add n_iter to each step
@@ -1603,13 +1655,17 @@ class HistGradientBoostingRegressor:
 
     def fit(self, X, y):
 
-        self._fit_iteration(X, y, n_iter=2)
+        # fit from scratch, warm start only in iterative_fit
+        self.estimator = None
+        self._fitted = False
+
+        self.iterative_fit(X, y, n_iter=2)
 
         # accelerate iteration process
         iteration = 2
         while not self._fitted:
             n_iter = int(2 ** iteration / 2)
-            self._fit_iteration(X, y, n_iter=n_iter)
+            self.iterative_fit(X, y, n_iter=n_iter)
             iteration += 1
 
         return self
@@ -1884,6 +1940,11 @@ class MLPRegressor:
 
 
 class RandomForestRegressor:
+
+    # trees added by iterative_fit are only fitted on data of the call,
+    # so the forest can be fitted by chunks of data
+    _chunked_iterative_fit = True
+
     def __init__(
         self,
         criterion="mse",
@@ -1916,13 +1977,16 @@ class RandomForestRegressor:
 
         return MAX_ITER
 
-    def _fit_iteration(self, X, y, n_iter=2):
+    # add n_iter trees/iterations to the fitted estimator (warm start, earlier
+    # ones are kept), fully fitted when reaching max_iter
+    def iterative_fit(self, X, y, n_iter=2):
 
         if self.estimator is None:
             from sklearn.ensemble import RandomForestRegressor
 
             self.estimator = RandomForestRegressor(
-                n_estimators=n_iter,
+                n_estimators=min(n_iter, self.max_iter),
+                warm_start=True,
                 criterion=self.criterion,
                 max_features=self.max_features,
                 max_depth=self.max_depth,
@@ -1939,25 +2003,31 @@ class RandomForestRegressor:
                 self.estimator.n_estimators, self.max_iter
             )
 
-        self.estimator.fit(X, y)
-
-        if (
-            self.estimator.n_estimators >= self.max_iter
-            or self.estimator.n_estimators > len(self.estimator.estimators_)
+        # only fit the new trees
+        if self.estimator.n_estimators > len(
+            getattr(self.estimator, "estimators_", [])
         ):
+            self.estimator.fit(X, y)
+
+        # no early stopping for forests, fully fitted at max_iter
+        if self.estimator.n_estimators >= self.max_iter:
             self._fitted = True
 
         return self
 
     def fit(self, X, y):
 
-        self._fit_iteration(X, y, n_iter=2)
+        # fit from scratch, warm start only in iterative_fit
+        self.estimator = None
+        self._fitted = False
+
+        self.iterative_fit(X, y, n_iter=2)
 
         # accelerate iteration process
         iteration = 2
         while not self._fitted:
             n_iter = int(2 ** iteration / 2)
-            self._fit_iteration(X, y, n_iter=n_iter)
+            self.iterative_fit(X, y, n_iter=n_iter)
             iteration += 1
 
         return self
@@ -70,74 +70,160 @@ class NoScaling:
         return X
 
 
+# rows of data in every chunk when computing statistics,
+# limits the memory of temporary arrays
+_CHUNK_SIZE = 65536
+
+
+# float values of the data, only copy when required
+# if copy = False and the values are already float of dtype, they are modified in place
+def _float_values(X, dtype=None, copy=True):
+
+    _values = X.values if isinstance(X, (pd.DataFrame, pd.Series)) else np.asarray(X)
+    if dtype is None:
+        dtype = _values.dtype if _values.dtype.kind == "f" else np.float64
+
+    # np.array(copy=False) raises in numpy >= 2 when a cast is required
+    if not copy:
+        return np.asarray(_values, dtype=dtype)
+
+    return np.array(_values, dtype=dtype)
+
+
+# float values of the data by chunks of rows
+def _float_chunks(X, chunk_size=_CHUNK_SIZE):
+
+    for _start in range(0, len(X), chunk_size):
+        if isinstance(X, (pd.DataFrame, pd.Series)):
+            yield _float_values(X.iloc[_start : _start + chunk_size], copy=False)
+        else:
+            yield _float_values(X[_start : _start + chunk_size], copy=False)
+
+
+# get the array to write transformed values in
+# out: preallocated array, values of X are copied into it
+def _output_values(X, dtype=None, copy=True, out=None):
+
+    if out is None:
+        return _float_values(X, dtype=dtype, copy=copy)
+
+    np.copyto(
+        out,
+        X.values if isinstance(X, (pd.DataFrame, pd.Series)) else X,
+        casting="same_kind",
+    )
+
+    return out
+
+
+# wrap the transformed values in the format of X, without copying
+def _as_input(values, X):
+
+    if isinstance(X, pd.DataFrame):
+        return pd.DataFrame(values, index=X.index, columns=X.columns, copy=False)
+    elif isinstance(X, pd.Series):
+        return pd.Series(values, index=X.index, name=X.name, copy=False)
+
+    return values
+
+
 class Standardize:
 
     """
     Standardize the dataset by column (each feature), using _x = (x - mean) / std
 
+    mean and standard variance are accumulated by chunks (Welford/Chan update), so
+    partial_fit can be called on data streamed in chunks
+
     Parameters
     ----------
     with_mean: whether to standardize with mean, default = True
 
     with_std: whether to standardize with standard variance, default = True
+
+    deep_copy: whether to transform on a copy of the data, default = True
+    if False, float data is transformed in place
+
+    dtype: dtype of transformed data, default = None
+    if None, keep float dtype of data (float64 for other dtypes), use 'float32' to save memory
     """
 
-    def __init__(self, with_mean=True, with_std=True, deep_copy=True):
+    def __init__(self, with_mean=True, with_std=True, deep_copy=True, dtype=None):
         self.with_mean = with_mean
         self.with_std = with_std
         self.deep_copy = deep_copy
+        self.dtype = dtype
 
         self._fitted = False  # record whether the model has been fitted
 
+    def _reset(self):
+
+        self._n = 0  # number of non-missing values of every feature
+        self._mean = 0.0  # running mean
+        self._m2 = 0.0  # running sum of squared deviations from mean
+
+    # merge the moments of a chunk to the running moments
+    def _update(self, values):
+
+        _n = np.sum(~np.isnan(values), axis=0)
+        _sum = np.nansum(values, axis=0, dtype=np.float64)
+        _mean = np.divide(_sum, _n, out=np.zeros(len(_sum)), where=_n > 0)
+        _m2 = np.nansum((values - _mean) ** 2, axis=0, dtype=np.float64)
+
+        _total = self._n + _n
+        _weight = np.divide(_n, _total, out=np.zeros(len(_sum)), where=_total > 0)
+        _delta = _mean - self._mean
+        self._mean = self._mean + _delta * _weight
+        self._m2 = self._m2 + _m2 + _delta**2 * self._n * _weight
+        self._n = _total
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self._std = np.sqrt(self._m2 / (self._n - 1))
+
     def fit(self, X, y=None):
 
-        _X = X.copy(deep=self.deep_copy)
+        self._reset()
+        for _values in _float_chunks(X):
+            self._update(_values)
 
-        n, p = _X.shape
-        if self.with_mean == True:
-            self._mean = [0 for _ in range(p)]
-        if self.with_std == True:
-            self._std = [0 for _ in range(p)]
-
-        for i in range(p):
-            _data = _X.iloc[:, i].values
-            n_notnan = n - np.isnan(_data).sum()
-            _x_sum = 0
-            _x_2_sum = 0
-            _x_sum += np.nansum(_data)
-            _x_2_sum += np.nansum(_data**2)
-            if self.with_mean == True:
-                self._mean[i] = _x_sum / n_notnan
-            if self.with_std == True:
-                self._std[i] = np.sqrt(
-                    (_x_2_sum - n_notnan * ((_x_sum / n_notnan) ** 2)) / (n_notnan - 1)
-                )
+        self._fitted = True
+
+        return self
+
+    def partial_fit(self, X, y=None):
+
+        if not hasattr(self, "_n"):
+            self._reset()
+        for _values in _float_chunks(X):
+            self._update(_values)
 
         self._fitted = True
 
         return self
 
-    def transform(self, X):
+    def transform(self, X, out=None):
 
-        _X = X.copy(deep=self.deep_copy)
+        """
+        Parameters
+        ----------
+        X: data to transform
+
+        out: preallocated array to store transformed values, default = None
+        """
+
+        _values = _output_values(X, dtype=self.dtype, copy=self.deep_copy, out=out)
         if self.with_mean:
-            _X -= self._mean
+            np.subtract(_values, self._mean, out=_values, casting="same_kind")
         if self.with_std:
-            _X /= self._std
+            np.divide(_values, self._std, out=_values, casting="same_kind")
 
-        return _X
+        return _as_input(_values, X)
 
     def fit_transform(self, X, y=None):
 
-        _X = X.copy(deep=self.deep_copy)
-
-        self.fit(_X, y)
-
-        self._fitted = True
-
-        _X = self.transform(_X)
+        self.fit(X, y)
 
-        return _X
+        return self.transform(X)
 
     def inverse_transform(self, X):
 
@@ -156,62 +242,91 @@ class Normalize:
     """
     Normalize features with x / x_
 
+    scales are accumulated by chunks, so partial_fit can be called on data streamed
+    in chunks
+
     Parameters
     ----------
     norm: how to select x_, default = 'max'
     supported ['l1', 'l2', 'max']
+
+    deep_copy: whether to transform on a copy of the data, default = True
+    if False, float data is transformed in place
+
+    dtype: dtype of transformed data, default = None
+    if None, keep float dtype of data (float64 for other dtypes), use 'float32' to save memory
     """
 
     def __init__(
         self,
         norm="max",
         deep_copy=True,
+        dtype=None,
     ):
         self.norm = norm
         self.deep_copy = deep_copy
+        self.dtype = dtype
 
         self._fitted = False  # record whether the model has been fitted
 
-    def fit(self, X, y=None):
+    def _reset(self):
+
+        self._scale = 0.0
+
+    # merge the scale of a chunk to the running scale
+    def _update(self, values):
 
         if self.norm not in ["l1", "l2", "max"]:
             raise ValueError("Not recognizing norm method!")
 
-        _X = X.copy(deep=self.deep_copy)
-        n, p = _X.shape
-        self._scale = [0 for _ in range(p)]
-
-        for i in range(p):
-            _data = _X.iloc[:, i].values
-            if self.norm == "max":
-                self._scale[i] = np.max(np.abs(_data))
-            elif self.norm == "l1":
-                self._scale[i] = np.abs(_data).sum()
-            elif self.norm == "l2":
-                self._scale[i] = (_data**2).sum()
+        if self.norm == "max":
+            self._scale = np.maximum(self._scale, np.max(np.abs(values), axis=0))
+        elif self.norm == "l1":
+            self._scale = self._scale + np.abs(values).sum(axis=0, dtype=np.float64)
+        elif self.norm == "l2":
+            self._scale = self._scale + (values**2).sum(axis=0, dtype=np.float64)
+
+    def fit(self, X, y=None):
+
+        self._reset()
+        for _values in _float_chunks(X):
+            self._update(_values)
 
         self._fitted = True
 
         return self
 
-    def transform(self, X):
+    def partial_fit(self, X, y=None):
 
-        _X = X.copy(deep=self.deep_copy)
-        _X /= self._scale
+        if not hasattr(self, "_scale"):
+            self._reset()
+        for _values in _float_chunks(X):
+            self._update(_values)
 
-        return _X
+        self._fitted = True
 
-    def fit_transform(self, X, y=None):
+        return self
 
-        _X = X.copy(deep=self.deep_copy)
+    def transform(self, X, out=None):
 
-        self.fit(_X, y)
+        """
+        Parameters
+        ----------
+        X: data to transform
 
-        self._fitted = True
+        out: preallocated array to store transformed values, default = None
+        """
 
-        _X = self.transform(_X)
+        _values = _output_values(X, dtype=self.dtype, copy=self.deep_copy, out=out)
+        np.divide(_values, self._scale, out=_values, casting="same_kind")
 
-        return _X
+        return _as_input(_values, X)
+
+    def fit_transform(self, X, y=None):
+
+        self.fit(X, y)
+
+        return self.transform(X)
 
     def inverse_transform(self, X):
 
@@ -236,6 +351,12 @@ class RobustScale:
     quantile: (q_min, q_max), default = (25.0, 75.0)
 
     uni_variance: whether to set unit variance for scaled data, default = False
+
+    deep_copy: whether to transform on a copy of the data, default = True
+    if False, float data is transformed in place
+
+    dtype: dtype of transformed data, default = None
+    if None, keep float dtype of data (float64 for other dtypes), use 'float32' to save memory
     """
 
     def __init__(
@@ -245,12 +366,14 @@ class RobustScale:
         quantile=(25.0, 75.0),
         unit_variance=False,
         deep_copy=True,
+        dtype=None,
     ):
         self.with_centering = with_centering
         self.with_scale = with_scale
         self.quantile = quantile
         self.unit_variance = unit_variance
         self.deep_copy = deep_copy
+        self.dtype = dtype
 
         self._fitted = False  # record whether the model has been fitted
 
@@ -266,61 +389,46 @@ class RobustScale:
                 "Quantile not in range, get {0:.1f} and {1:.1f}!".format(q_min, q_max)
             )
 
-        _X = X.copy(deep=self.deep_copy)
-        n, p = _X.shape
-        if self.with_centering == True:
-            self._median = [0 for _ in range(p)]
-        if self.with_scale == True:
-            self._scale = [0 for _ in range(p)]
-
-        for i in range(p):
-            _data = _X.iloc[:, i].values
-            if self.with_centering == True:
-                self._median[i] = np.nanmedian(_data)
-                quantile = np.nanquantile(_data, (q_min / 100, q_max / 100))
-                quantile = np.transpose(quantile)
-                self._scale[i] = quantile[1] - quantile[0]
-                if self.unit_variance == True:
-                    self._scale[i] = self.scale[i] / (
-                        scipy.stats.norm.ppf(q_max / 100.0)
-                        - scipy.stats.norm.ppf(q_min / 100.0)
-                    )
+        # quantiles of all features at once
+        _values = _float_values(X, copy=False)
+        self._median = np.nanmedian(_values, axis=0)
+        quantile = np.nanquantile(_values, (q_min / 100, q_max / 100), axis=0)
+        self._scale = quantile[1] - quantile[0]
+        if self.unit_variance == True:
+            self._scale = self._scale / (
+                scipy.stats.norm.ppf(q_max / 100.0) - scipy.stats.norm.ppf(q_min / 100.0)
+            )
 
-        # handle 0 in scale
-        constant_mask = (
-            self._scale < 10 * np.finfo(np.float64).eps
-        )  # avoid extremely small values
-        for index in [i for i, value in enumerate(constant_mask) if value]:
-            self._scale[
-                index
-            ] = 1.0  # change scale at True index of constant_mask to 1.0
+        # handle 0 in scale, avoid extremely small values
+        self._scale[self._scale < 10 * np.finfo(np.float64).eps] = 1.0
 
         self._fitted = True
 
         return self
 
-    def transform(self, X):
+    def transform(self, X, out=None):
 
-        _X = X.copy(deep=self.deep_copy)
+        """
+        Parameters
+        ----------
+        X: data to transform
 
+        out: preallocated array to store transformed values, default = None
+        """
+
+        _values = _output_values(X, dtype=self.dtype, copy=self.deep_copy, out=out)
         if self.with_centering == True:
-            _X -= self._median
+            np.subtract(_values, self._median, out=_values, casting="same_kind")
         if self.with_scale == True:
-            _X /= self._scale
+            np.divide(_values, self._scale, out=_values, casting="same_kind")
 
-        return _X
+        return _as_input(_values, X)
 
     def fit_transform(self, X, y=None):
 
-        _X = X.copy(deep=self.deep_copy)
-
-        self.fit(_X, y)
-
-        self._fitted = True
-
-        _X = self.transform(_X)
+        self.fit(X, y)
 
-        return _X
+        return self.transform(X)
 
     def inverse_transform(self, X):
 
@@ -339,61 +447,91 @@ class MinMaxScale:
     """
     Use min_max value to scale the feature, x / (x_max - x_min)
 
+    minimum and maximum are accumulated by chunks, so partial_fit can be called on
+    data streamed in chunks
+
     Parameters
     ----------
     feature_range: (feature_min, feature_max) to scale the feature, default = (0, 1)
+
+    deep_copy: whether to transform on a copy of the data, default = True
+    if False, float data is transformed in place
+
+    dtype: dtype of transformed data, default = None
+    if None, keep float dtype of data (float64 for other dtypes), use 'float32' to save memory
     """
 
     def __init__(
         self,
         feature_range=(0, 1),
         deep_copy=True,
+        dtype=None,
     ):
         self.feature_range = feature_range
         self.deep_copy = deep_copy
+        self.dtype = dtype
 
         self._fitted = False  # record whether the model has been fitted
 
+    def _reset(self):
+
+        self._min = np.nan
+        self._max = np.nan
+
+    # merge the minimum/maximum of a chunk, missing values ignored
+    def _update(self, values):
+
+        self._min = np.fmin(self._min, np.fmin.reduce(values, axis=0))
+        self._max = np.fmax(self._max, np.fmax.reduce(values, axis=0))
+
     def fit(self, X, y=None):
 
-        _X = X.copy(deep=self.deep_copy)
-        n, p = _X.shape
+        self._reset()
+        for _values in _float_chunks(X):
+            self._update(_values)
+
+        self._fitted = True
+
+        return self
 
-        self._min = [0 for _ in range(p)]
-        self._max = [0 for _ in range(p)]
+    def partial_fit(self, X, y=None):
 
-        for i in range(p):
-            _data = _X.iloc[:, i].values
-            self._min[i] = np.nanmin(_data)
-            self._max[i] = np.nanmax(_data)
+        if not hasattr(self, "_min"):
+            self._reset()
+        for _values in _float_chunks(X):
+            self._update(_values)
 
         self._fitted = True
 
         return self
 
-    def transform(self, X):
+    def transform(self, X, out=None):
+
+        """
+        Parameters
+        ----------
+        X: data to transform
+
+        out: preallocated array to store transformed values, default = None
+        """
 
         f_min, f_max = self.feature_range
         if not f_min < f_max:
             raise ValueError("Minimum of feature range must be smaller than maximum!")
 
-        _X = X.copy(deep=self.deep_copy)
-        _X = (_X - self._min) / (np.array(self._max) - np.array(self._min))
-        _X = _X * (f_max - f_min) + f_min
+        _values = _output_values(X, dtype=self.dtype, copy=self.deep_copy, out=out)
+        np.subtract(_values, self._min, out=_values, casting="same_kind")
+        np.divide(_values, self._max - self._min, out=_values, casting="same_kind")
+        np.multiply(_values, f_max - f_min, out=_values, casting="same_kind")
+        np.add(_values, f_min, out=_values, casting="same_kind")
 
-        return _X
+        return _as_input(_values, X)
 
     def fit_transform(self, X, y=None):
 
-        _X = X.copy(deep=self.deep_copy)
-
-        self.fit(_X, y)
-
-        self._fitted = True
-
-        _X = self.transform(_X)
+        self.fit(X, y)
 
-        return _X
+        return self.transform(X)
 
     def inverse_transform(self, X):
 
@@ -403,7 +541,7 @@ class MinMaxScale:
 
         _X = X.copy(deep=True)
         _X = (_X - f_min) / (f_max - f_min)
-        _X = _X * (np.array(self._max) - np.array(self._min)) + self._min
+        _X = _X * (self._max - self._min) + self._min
 
         self._fitted = False
 
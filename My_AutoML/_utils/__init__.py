@@ -43,6 +43,7 @@ from ._base import (
     random_index,
     random_list,
     is_date,
+    infer_date_format,
     feature_rounding,
     minloc,
     maxloc,
@@ -61,6 +62,7 @@ from ._data import (
 from ._file import save_model
 from ._stat import (
     nan_cov,
+    nan_corr,
     class_means,
     empirical_covariance,
     class_cov,
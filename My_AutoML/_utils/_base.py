@@ -108,6 +108,61 @@ def is_date(df, rule="any"):
         return all(_check)
 
 
+# common date formats, tried in order if the format can not be guessed
+DATE_FORMATS = [
+    "%Y-%m-%d",
+    "%Y/%m/%d",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%m-%d-%Y",
+    "%d-%m-%Y",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%m/%d/%Y %H:%M:%S",
+    "%d %b %Y",
+    "%b %d, %Y",
+    "%B %d, %Y",
+]
+
+# infer whether values are time string and the date format on a sample of unique values,
+# so the whole column can be converted by pd.to_datetime with the format at once
+# return (is_date, format), format is None if no fixed format fits all sampled values
+def infer_date_format(data, sample_size=1000, seed=1):
+
+    _values = pd.Series(pd.unique(pd.Series(data).dropna().astype(str)))
+    if len(_values) == 0:
+        return False, None
+    _sample = _values.sample(n=min(sample_size, len(_values)), random_state=seed)
+
+    if not is_date(_sample.to_frame()):
+        return False, None
+
+    try:
+        from pandas._libs.tslibs.parsing import guess_datetime_format
+
+        _formats = [guess_datetime_format(_sample.iloc[0])] + DATE_FORMATS
+    except ImportError:
+        _formats = DATE_FORMATS
+
+    for _format in _formats:
+        if _format is None:
+            continue
+        if (
+            pd.to_datetime(_sample, format=_format, errors="coerce")
+            .notnull()
+            .all()
+        ):
+            return True, _format
+
+    # no fixed format, the sample must be parsed value by value
+    try:
+        pd.to_datetime(_sample)
+    except (ValueError, OverflowError):
+        return False, None
+
+    return True, None
+
+
 # Round data for categorical features (in case after preprocessing/modification, the data changed)
 def feature_rounding(X, uni_class=20):
 
@@ -224,6 +279,28 @@ def has_method(obj, name):
     return callable(getattr(obj, name, None))
 
 
+# available memory of the system in bytes, None if not known
+def available_memory():
+
+    try:
+        import psutil
+
+        return psutil.virtual_memory().available
+    except ImportError:
+        pass
+
+    # linux without psutil
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    return None
+
+
 # check if is None
 def is_none(item, pat=[None, "None", "none", "NONE"]):
 
@@ -233,8 +233,22 @@ class formatting:
         for idx, item in enumerate(unique_values):
             unique_map[item] = idx
 
-        # mapping categorical to numerical
-        data = data.replace(unique_map)
+        # categorical dtype only needs to rename the categories
+        if str(data.dtype) == "category":
+            return data.cat.rename_categories(
+                {
+                    item: unique_map[item]
+                    for item in data.cat.categories
+                    if item in unique_map
+                }
+            )
+
+        # mapping categorical to numerical by one hashed lookup,
+        # values not found (missing types) are kept
+        _codes = pd.Index(unique_values, dtype=object).get_indexer(data)
+        data = (
+            data.astype(object).where(_codes < 0, pd.Series(_codes, index=data.index))
+        ).infer_objects()
 
         return data
 
@@ -246,6 +260,17 @@ class formatting:
 
         return x
 
+    # map numerical values to the nearest codes of categories, ties to the smaller code
+    # vectorized version of unify_cate applied on codes np.arange(n_unique)
+    def _unify_codes(self, data, n_unique):
+
+        _values = data.values.astype(float)
+        _codes = np.clip(np.ceil(_values - 0.5), 0, n_unique - 1)
+        # infinite values are equally far from all codes, use the first one
+        _codes[np.isinf(_values)] = 0
+
+        return _codes
+
     def fit(self, X):
 
         # make sure input is a dataframe
@@ -267,6 +292,29 @@ class formatting:
                 else:
                     self.factorize(X[_column])
 
+    # convert categorical to numerical by the codes recorded in fit, so codes of
+    # new data are same as the fitted data, categories not seen in fit are
+    # converted to missing, missing types are kept
+    def recode(self, X):
+
+        for _column in self.columns:
+            if (
+                self.type_table[_column] not in self.numerics
+                and X[_column].dtype not in self.numerics
+            ):
+                _values = X[_column].astype(object)
+                _codes = pd.Index(self.unique_table[_column], dtype=object).get_indexer(
+                    _values
+                )
+                _keep = (_codes < 0) & _values.astype(str).isin(self.nas).values
+                X[_column] = _values.where(
+                    _keep,
+                    pd.Series(np.where(_codes < 0, np.nan, _codes), index=X.index),
+                ).infer_objects()
+
+        if not self.inplace:
+            return X
+
     def refit(self, X):
 
         for _column in self.columns:
@@ -277,18 +325,18 @@ class formatting:
                 # if column originally belongs to categorical,
                 # but converted to numerical, convert back
                 if X[_column].dtype in self.numerics:
-                    # get all possible unique values in unique_table
-                    unique_num = np.arange(len(self.unique_table[_column]))
                     # make sure all values have seen in unique_table
-                    X[_column] = X[_column].apply(
-                        lambda x: self.unify_cate(x, unique_num)
+                    _codes = self._unify_codes(
+                        X[_column], len(self.unique_table[_column])
                     )
+                    _missing = np.isnan(_codes)
 
-                    # get unique category mapping, from numerical-> categorical
-                    unique_map = dict(zip(unique_num, self.unique_table[_column]))
-                    X[_column] = X[_column].map(
-                        unique_map
-                    )  # convert numerical-> categorical
+                    # convert numerical-> categorical by indexing the unique values
+                    _unique = np.empty(len(self.unique_table[_column]), dtype=object)
+                    _unique[:] = self.unique_table[_column]
+                    _values = np.full(len(_codes), np.nan, dtype=object)
+                    _values[~_missing] = _unique[_codes[~_missing].astype(int)]
+                    X[_column] = pd.Series(_values, index=X.index)
 
                 # refit dtype, for double checking
                 X[_column] = X[_column].astype(self.type_table[_column])
@@ -543,15 +591,22 @@ def is_imbalance(data, threshold, value=False):
             else:
                 return False
 
-        for _value in unique_values:
-            if (
-                len(data.loc[data[_column] == _value, _column]) / len(data[_column])
-                > threshold
-            ):
-                if value:
-                    return _column, _value
-                else:
-                    return True
+        # a class over threshold leaves few rows for other unique values
+        if len(unique_values) > len(data[_column]) * (1 - threshold) + 1:
+            continue
+
+        # proportions of all classes by one count
+        _proportion = data[_column].value_counts() / len(data[_column])
+        _exceed = _proportion.index[_proportion > threshold]
+        if len(_exceed) > 0:
+            # the first exceeding class in order of appearance
+            _value = unique_values[
+                np.min(pd.Index(unique_values).get_indexer(_exceed))
+            ]
+            if value:
+                return _column, _value
+            else:
+                return True
     if value:
         return None, None
     else:
@@ -566,21 +621,24 @@ def LinkTable(sample, table, norm="l2"):
     if sample.shape[1] != table.shape[1]:
         raise ValueError("Not same size of columns!")
 
-    _sample = sample.values
-    features = list(table.columns)
-    _table = table.copy(deep=True)
-    _linktable = []
-
-    for sample_point in _sample:
-        for i in range(len(features)):
-            if norm == "l2":
-                # print(sample[_column], sample[_column][0])
-                _table.iloc[:, i] = (_table.iloc[:, i] - sample_point[i]) ** 2
-            if norm == "l1":
-                _table.iloc[:, i] = np.abs(_table.iloc[:, i] - sample_point[i])
-        _linktable.append(_table.sum(axis=1).values.tolist())
-
-    return _linktable
+    _sample = np.asarray(sample, dtype=float)
+    _table = np.asarray(table, dtype=float)
+    _linktable = np.empty((_sample.shape[0], _table.shape[0]))
+
+    # distances of a batch of sample points at once, limit the memory of broadcasting
+    _batch = max(int(1e7 / max(_table.size, 1)), 1)
+    for _start in range(0, _sample.shape[0], _batch):
+        _diff = _table[None, :, :] - _sample[_start : _start + _batch, None, :]
+        if norm == "l2":
+            _linktable[_start : _start + _batch] = np.sum(_diff**2, axis=2)
+        elif norm == "l1":
+            _linktable[_start : _start + _batch] = np.sum(np.abs(_diff), axis=2)
+        else:
+            raise ValueError(
+                'Not recognizing norm! Should be in ["l1", "l2"], get {}'.format(norm)
+            )
+
+    return _linktable.tolist()
 
 
 class ExtremeClass:
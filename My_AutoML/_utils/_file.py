@@ -39,7 +39,13 @@ SOFTWARE.
 """
 
 import os
+import json
+import shutil
+import hashlib
+import tempfile
 import pickle
+import numpy as np
+import pandas as pd
 
 # save model
 def save_model(
@@ -72,6 +78,11 @@ def save_model(
         print(model_hyperparameters, file=f, end="\n")
 
 
+# directory the store paths of pickled StoredComponent are relative to,
+# set by save_methods/load_methods, None means paths are kept absolute
+_PICKLE_BASE = None
+
+
 # save list of methods
 def save_methods(file_name, methods):
 
@@ -83,9 +94,16 @@ def save_methods(file_name, methods):
     methods: list of methods objects to save
     """
 
-    with open(file_name, "wb") as out_f:
-        for method in methods:
-            pickle.dump(method, out_f)
+    global _PICKLE_BASE
+
+    # stored components keep store path relative to the saved file
+    _PICKLE_BASE = os.path.dirname(os.path.abspath(file_name))
+    try:
+        with open(file_name, "wb") as out_f:
+            for method in methods:
+                pickle.dump(method, out_f)
+    finally:
+        _PICKLE_BASE = None
 
 
 # load methods
@@ -97,15 +115,22 @@ def load_methods(file_name):
     file_name: path of the file to load
     """
 
-    with open(file_name, "rb") as in_f:
-        results = []
+    global _PICKLE_BASE
 
-        # load all methods
-        while True:
-            try:
-                results.append(pickle.load(in_f))
-            except EOFError:
-                break
+    # relative store paths are resolved against the directory of the file
+    _PICKLE_BASE = os.path.dirname(os.path.abspath(file_name))
+    try:
+        with open(file_name, "rb") as in_f:
+            results = []
+
+            # load all methods
+            while True:
+                try:
+                    results.append(pickle.load(in_f))
+                except EOFError:
+                    break
+    finally:
+        _PICKLE_BASE = None
 
     return results
 
@@ -115,4 +140,247 @@ def find_exact_path(path, spec_str) :
     for folder in os.listdir(path):
         
         if spec_str in os.path.join(path, folder):
-            return os.path.join(path, folder)
\ No newline at end of file
+            return os.path.join(path, folder)
+
+
+# save data to binary columnar format
+def save_data(data, file_name, format="npy"):
+
+    """
+    Parameters
+    ----------
+    data: data to save, pandas.DataFrame or numpy.ndarray
+
+    file_name: path of the file to save, without file extension
+
+    format: file format, default = "npy"
+    support ("npy", "parquet", "feather"), "parquet" and "feather" require pyarrow
+    """
+
+    if format == "npy":
+        np.save(file_name + ".npy", np.asarray(data))
+    elif format in ["parquet", "feather"]:
+        if not isinstance(data, pd.DataFrame):
+            data = pd.DataFrame(data)
+        # parquet/feather only accept string column names
+        data = data.set_axis([str(col) for col in data.columns], axis=1)
+        if format == "parquet":
+            data.to_parquet(file_name + ".parquet", index=False)
+        else:
+            data.reset_index(drop=True).to_feather(file_name + ".feather")
+    else:
+        raise ValueError(
+            'Only support format ["npy", "parquet", "feather"], get {}.'.format(format)
+        )
+
+    return file_name
+
+
+class ModelStore:
+
+    """
+    Persistent store of fitted pipeline components
+
+    every fitted component is saved as one artifact, numpy arrays in the component
+    are saved as separate .npy files and memory-mapped when loaded, identical
+    components (e.g. same fitted preprocessing in different trials) are only stored
+    once, a manifest records the components of every trial
+
+    path/
+        objects/<key>/object.pkl        pickled component without numpy arrays
+        objects/<key>/buffer_<i>.npy    numpy arrays of the component
+        manifests/<trial_id>.json       {component name: artifact key} of the trial
+
+    Parameters
+    ----------
+    path: directory of the store
+    """
+
+    def __init__(self, path):
+        # absolute path, so references stay valid when working directory changes
+        self.path = os.path.abspath(path)
+
+        os.makedirs(os.path.join(self.path, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(self.path, "manifests"), exist_ok=True)
+
+    def save_object(self, obj):
+
+        # numpy arrays are pickled out-of-band (pickle protocol 5)
+        buffers = []
+        data = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+        buffers = [np.frombuffer(buffer.raw(), dtype=np.uint8) for buffer in buffers]
+
+        # artifact key is the hash of the content, identical components share key
+        _hash = hashlib.md5(data)
+        for buffer in buffers:
+            _hash.update(buffer)
+        key = _hash.hexdigest()
+
+        _path = os.path.join(self.path, "objects", key)
+        if os.path.isdir(_path):  # already stored
+            return key
+
+        # write to temporary directory first, so the artifact is complete
+        # when visible to other processes
+        _tmp_path = tempfile.mkdtemp(dir=os.path.join(self.path, "objects"))
+        with open(os.path.join(_tmp_path, "object.pkl"), "wb") as f:
+            f.write(data)
+        for idx, buffer in enumerate(buffers):
+            np.save(os.path.join(_tmp_path, "buffer_{}.npy".format(idx)), buffer)
+        try:
+            os.rename(_tmp_path, _path)
+        except OSError:  # stored by other process at the same time
+            shutil.rmtree(_tmp_path)
+
+        return key
+
+    def load_object(self, key, mmap=True):
+
+        _path = os.path.join(self.path, "objects", key)
+
+        with open(os.path.join(_path, "object.pkl"), "rb") as f:
+            data = f.read()
+
+        buffers = []
+        n_buffers = len([file for file in os.listdir(_path) if file.endswith(".npy")])
+        for idx in range(n_buffers):
+            _buffer_path = os.path.join(_path, "buffer_{}.npy".format(idx))
+            # empty file can not be memory-mapped
+            if mmap and os.path.getsize(_buffer_path) > 128:
+                buffers.append(np.load(_buffer_path, mmap_mode="r"))
+            else:
+                buffers.append(np.load(_buffer_path))
+
+        return pickle.loads(data, buffers=buffers)
+
+    def save(self, trial_id, components):
+
+        """
+        Parameters
+        ----------
+        trial_id: id of the trial
+
+        components: dict of {component name: fitted component}
+        """
+
+        manifest = {}
+        for name, component in components.items():
+            manifest[name] = {
+                "key": self.save_object(component),
+                "fitted": bool(getattr(component, "_fitted", False)),
+            }
+
+        # one manifest file per trial, trials can write at the same time
+        _path = os.path.join(self.path, "manifests", "{}.json".format(trial_id))
+        with open(_path + ".tmp", "w") as f:
+            json.dump(manifest, f)
+        os.replace(_path + ".tmp", _path)
+
+        return manifest
+
+    def manifest(self, trial_id=None):
+
+        # manifest of one trial
+        if trial_id is not None:
+            with open(
+                os.path.join(self.path, "manifests", "{}.json".format(trial_id))
+            ) as f:
+                return json.load(f)
+
+        # manifest of all trials
+        return {
+            file[:-5]: self.manifest(file[:-5])
+            for file in os.listdir(os.path.join(self.path, "manifests"))
+            if file.endswith(".json")
+        }
+
+    def load(self, trial_id, lazy=True):
+
+        """
+        Parameters
+        ----------
+        trial_id: id of the trial
+
+        lazy: whether to load components only when used, default = True
+        """
+
+        components = {}
+        for name, item in self.manifest(trial_id).items():
+            component = StoredComponent(self.path, item["key"], item["fitted"])
+            components[name] = component if lazy else component.load()
+
+        return components
+
+
+class StoredComponent:
+
+    """
+    Reference to a component in ModelStore, the component is loaded at first use,
+    pickling only keeps the reference (store path and artifact key)
+
+    Parameters
+    ----------
+    path: directory of the store
+
+    key: artifact key of the component
+
+    fitted: whether the component is fitted
+    """
+
+    def __init__(self, path, key, fitted=True):
+        self.__dict__.update(
+            {
+                "_path": os.path.abspath(path),
+                "_key": key,
+                "_stored_fitted": fitted,
+                "_object": None,
+            }
+        )
+
+    def load(self, mmap=True):
+
+        if self._object is None:
+            self.__dict__["_object"] = ModelStore(self._path).load_object(
+                self._key, mmap=mmap
+            )
+
+        return self._object
+
+    def copy_to(self, store):
+
+        # copy the artifact to another store, return the reference in new store
+        _path = os.path.join(store.path, "objects", self._key)
+        if not os.path.isdir(_path):
+            shutil.copytree(os.path.join(self._path, "objects", self._key), _path)
+
+        return StoredComponent(store.path, self._key, self._stored_fitted)
+
+    def __getattr__(self, name):
+
+        # fitted status is known without loading the component
+        if name == "_fitted" and self._object is None:
+            return self._stored_fitted
+
+        return getattr(self.load(), name)
+
+    def __setattr__(self, name, value):
+
+        setattr(self.load(), name, value)
+
+    def __getstate__(self):
+
+        # saved by save_methods, keep store path relative to the saved file
+        # so the model and its store can be loaded from anywhere
+        _path = self._path
+        if _PICKLE_BASE is not None:
+            _path = os.path.relpath(_path, _PICKLE_BASE)
+
+        return {"_path": _path, "_key": self._key, "_fitted": self._stored_fitted}
+
+    def __setstate__(self, state):
+
+        _path = state["_path"]
+        if not os.path.isabs(_path) and _PICKLE_BASE is not None:
+            _path = os.path.join(_PICKLE_BASE, _path)
+
+        self.__init__(_path, state["_key"], state["_fitted"])
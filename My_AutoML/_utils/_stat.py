@@ -42,11 +42,9 @@ import warnings
 import numpy as np
 import pandas as pd
 import scipy.stats
-import copy
 
-# return non-nan covariance matrix between X and y, (return covariance of X if y = None)
-# default calculate at columns (axis = 0), axis = 1 at rows
-def nan_cov(X, y=None, axis=0):
+# prepare X/y for nan-aware statistics, return 2d arrays with variables at columns
+def _nan_prepare(X, y=None, axis=0, dtype=np.float64):
 
     if isinstance(y, pd.DataFrame):
         _empty = y.isnull().all().all()
@@ -55,12 +53,16 @@ def nan_cov(X, y=None, axis=0):
     elif isinstance(y, np.ndarray):
         _empty = np.all(np.isnan(y))
     else:
-        _empty = y == None
+        _empty = y is None
 
-    if _empty:
-        y = copy.deepcopy(X)
-    else:
-        y = y
+    X = np.asarray(X, dtype=dtype)
+    y = X if _empty else np.asarray(y, dtype=dtype)
+
+    # reshape the X/y
+    if X.ndim == 1:
+        X = X.reshape(len(X), 1)
+    if y.ndim == 1:
+        y = y.reshape(len(y), 1)
 
     if axis == 0:
         if len(X) != len(y):
@@ -68,40 +70,118 @@ def nan_cov(X, y=None, axis=0):
     elif axis == 1:
         if len(X[0]) != len(y[0]):
             raise ValueError("X and y must have same length of columns!")
+        # rows as variables
+        X, y = X.T, y.T
 
-    X = np.array(X)
-    y = np.array(y)
+    return X, y
 
-    # reshape the X/y
-    try:
-        X.shape[1]
-    except IndexError:
-        X = X.reshape(len(X), 1)
 
-    try:
-        y.shape[1]
-    except IndexError:
-        y = y.reshape(len(y), 1)
+# nan-aware covariance/correlation of one block of X columns with all y columns
+# all sums are computed by matrix products on zero-filled data and observed masks
+def _nan_cov_block(X, y, pairwise=False, corr=False):
+
+    _x_mask, _y_mask = ~np.isnan(X), ~np.isnan(y)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if pairwise:
+            # only rows where both variables are observed
+            _x = np.where(_x_mask, X, 0)
+            _y = np.where(_y_mask, y, 0)
+            _x_mask, _y_mask = _x_mask.astype(X.dtype), _y_mask.astype(y.dtype)
+
+            _n = _x_mask.T @ _y_mask  # number of pairwise observations
+            _x_sum = _x.T @ _y_mask
+            _y_sum = _x_mask.T @ _y
+            _cov = _x.T @ _y - _x_sum * _y_sum / _n
+
+            if corr:
+                _x_var = (_x**2).T @ _y_mask - _x_sum**2 / _n
+                _y_var = _x_mask.T @ (_y**2) - _y_sum**2 / _n
+                return _cov / np.sqrt(_x_var * _y_var)
+
+            return _cov / (_n - 1)
+        else:
+            # center by non-nan mean, missing values contribute 0
+            _x = np.where(_x_mask, X - np.nanmean(X, axis=0), 0)
+            _y = np.where(_y_mask, y - np.nanmean(y, axis=0), 0)
+            _cov = _x.T @ _y / (len(X) - 1)
+
+            if corr:
+                _x_var = (_x**2).sum(axis=0) / (len(X) - 1)
+                _y_var = (_y**2).sum(axis=0) / (len(y) - 1)
+                return _cov / np.sqrt(np.outer(_x_var, _y_var))
+
+            return _cov
 
-    _x_mean = np.nanmean(X, axis=axis)
-    _y_mean = np.nanmean(y, axis=axis)
 
-    _cov = np.array(
-        [[0.0 for _i in range(y.shape[1 - axis])] for _j in range(X.shape[1 - axis])]
-    )  # initialize covariance matrix
+def _nan_stat(X, y, axis, pairwise, dtype, chunk_size, corr):
 
-    for i in range(_cov.shape[0]):
-        for j in range(_cov.shape[1]):
-            if axis == 0:
-                _cov[i, j] = np.nansum(
-                    (X[:, i] - _x_mean[i]) * (y[:, j] - _y_mean[j])
-                ) / (len(X) - 1)
-            elif axis == 1:
-                _cov[i, j] = np.nansum(
-                    (X[i, :] - _x_mean[i]) * (y[j, :] - _y_mean[j])
-                ) / (len(X[0]) - 1)
+    X, y = _nan_prepare(X, y, axis=axis, dtype=dtype)
 
-    return _cov
+    if chunk_size is None or chunk_size >= X.shape[1]:
+        return _nan_cov_block(X, y, pairwise=pairwise, corr=corr)
+
+    # compute by blocks of X columns to limit memory of intermediate matrices
+    _result = np.empty((X.shape[1], y.shape[1]), dtype=dtype)
+    for _start in range(0, X.shape[1], chunk_size):
+        _end = min(_start + chunk_size, X.shape[1])
+        _result[_start:_end] = _nan_cov_block(
+            X[:, _start:_end], y, pairwise=pairwise, corr=corr
+        )
+
+    return _result
+
+
+# return non-nan covariance matrix between X and y, (return covariance of X if y = None)
+# default calculate at columns (axis = 0), axis = 1 at rows
+def nan_cov(X, y=None, axis=0, pairwise=False, dtype=np.float64, chunk_size=None):
+
+    """
+    Parameters
+    ----------
+    X: data, numpy array or pandas dataframe/series
+
+    y: data to calculate covariance with X, default = None
+    if None, return covariance matrix of X
+
+    axis: calculate covariance at columns (axis = 0) or rows (axis = 1), default = 0
+
+    pairwise: whether to use pairwise-complete observations, default = False
+    if False, variables are centered by their non-nan mean and divided by (n - 1)
+    if True, covariance of every pair only use observations where both are non-nan
+
+    dtype: data type used in calculation, default = np.float64
+    np.float32 halves the memory for wide data
+
+    chunk_size: number of X variables calculated at a time, default = None
+    if None, calculate all at once
+    """
+
+    return _nan_stat(X, y, axis, pairwise, dtype, chunk_size, corr=False)
+
+
+# return non-nan correlation matrix between X and y, (return correlation of X if y = None)
+# default calculate at columns (axis = 0), axis = 1 at rows
+def nan_corr(X, y=None, axis=0, pairwise=False, dtype=np.float64, chunk_size=None):
+
+    """
+    Parameters
+    ----------
+    X: data, numpy array or pandas dataframe/series
+
+    y: data to calculate correlation with X, default = None
+    if None, return correlation matrix of X
+
+    axis: calculate correlation at columns (axis = 0) or rows (axis = 1), default = 0
+
+    pairwise: whether to use pairwise-complete observations, default = False
+
+    dtype: data type used in calculation, default = np.float64
+
+    chunk_size: number of X variables calculated at a time, default = None
+    """
+
+    return _nan_stat(X, y, axis, pairwise, dtype, chunk_size, corr=True)
 
 
 # return class (unique in y) mean of X
@@ -159,52 +239,121 @@ def class_cov(X, y, priors):
 # return Pearson Correlation Coefficients
 def Pearson_Corr(X, y):
 
-    features = list(X.columns)
-    result = []
-    for _column in features:
-        result.append(
-            (nan_cov(X[_column], y) / np.sqrt(nan_cov(X[_column]) * nan_cov(y)))[0][0]
+    # correlation of all features with response in one pass
+    return list(nan_corr(X, y)[:, 0])
+
+
+# discretize every column into integer codes (nan as -1)
+# return codes of shape (n_samples, n_features) and number of categories of each column
+def discretize(X, bins=None):
+
+    """
+    Parameters
+    ----------
+    X: data, numpy array or pandas dataframe/series
+
+    bins: number of histogram bins for numerical columns, default = None
+    if None, every unique value is a category
+    if int, numerical columns with more unique values than bins are cut into
+    equal-width bins
+    """
+
+    if not isinstance(X, pd.DataFrame):
+        X = pd.DataFrame(X)
+
+    _codes = np.empty(X.shape, dtype=np.int64)
+    _n_codes = np.empty(X.shape[1], dtype=np.int64)
+
+    for _idx in range(X.shape[1]):
+        _column = X.iloc[:, _idx]
+        if (
+            bins is not None
+            and pd.api.types.is_numeric_dtype(_column)
+            and _column.nunique() > bins
+        ):
+            _values = _column.values.astype(float)
+            _nan = np.isnan(_values)
+            _edges = np.histogram_bin_edges(_values[~_nan], bins=bins)
+            # inner edges only, so codes are in [0, bins - 1]
+            _code = np.digitize(_values, _edges[1:-1])
+            _code[_nan] = -1
+            _n_code = bins
+        else:
+            _code, _unique = pd.factorize(_column, sort=True)
+            _n_code = len(_unique)
+        _codes[:, _idx] = _code
+        _n_codes[_idx] = _n_code
+
+    return _codes, _n_codes
+
+
+# mutual information from integer codes (nan as -1) using joint histogram
+def _MI_codes(x, n_x, y, n_y):
+
+    _n = len(x)
+
+    # probability (x), probability (y), combine probability (x, y)
+    _x_pro = np.bincount(x[x >= 0], minlength=n_x) / _n
+    _y_pro = np.bincount(y[y >= 0], minlength=n_y) / _n
+    _valid = (x >= 0) & (y >= 0)
+    _pro = (
+        np.bincount(x[_valid] * n_y + y[_valid], minlength=n_x * n_y).reshape(
+            n_x, n_y
         )
+        / _n
+    )
 
-    return result
+    _y_pro = _y_pro[_y_pro > 0]
+    _H_y = -np.sum(_y_pro * np.log(_y_pro))
+    _x_idx, _y_idx = np.nonzero(_pro)
+    _pro_val = _pro[_x_idx, _y_idx]
+    _H_y_X = -np.sum(_pro_val * np.log(_pro_val / _x_pro[_x_idx]))
+
+    return _H_y - _H_y_X
+
+
+# return Mutual Information of every column of X with y
+def MI(X, y, bins=None, n_jobs=1):
+
+    """
+    Parameters
+    ----------
+    X: features, numpy array or pandas dataframe/series
 
+    y: response, only first column is used
 
-# return Mutual Information
-def MI(X, y):
+    bins: number of histogram bins for numerical columns, default = None
+    if None, every unique value is a category
+
+    n_jobs: number of threads to calculate columns in parallel, default = 1
+    """
 
     if len(X) != len(y):
         raise ValueError("X and y not same size!")
 
-    if not isinstance(X, pd.DataFrame):
-        X = pd.DataFrame(X)
     if not isinstance(y, pd.DataFrame):
         y = pd.DataFrame(y)
 
-    features = list(X.columns)
-    _y_column = list(y.columns)
-    result = []
+    # discretize all columns once
+    _X_codes, _X_n_codes = discretize(X, bins=bins)
+    _y_codes, _y_n_codes = discretize(y.iloc[:, [0]], bins=bins)
 
-    _y_pro = y.groupby(_y_column[0]).size().div(len(X)).values
-    _H_y = -sum(item * np.log(item) for item in _y_pro)
-
-    for _column in features:
-
-        _X_y = pd.concat([X[_column], y], axis=1)
-        _pro = (
-            _X_y.groupby([_column, _y_column[0]]).size().div(len(X))
-        )  # combine probability (x, y)
-        _pro_val = _pro.values  # take only values
-        _X_pro = X[[_column]].groupby(_column).size().div(len(X))  # probability (x)
-        _H_y_X = -sum(
-            _pro_val[i]
-            * np.log(
-                _pro_val[i] / _X_pro.loc[_X_pro.index == _pro.index[i][0]].values[0]
-            )
-            for i in range(len(_pro))
-        )
-        result.append(_H_y - _H_y_X)
+    return MI_codes(_X_codes, _X_n_codes, _y_codes[:, 0], _y_n_codes[0], n_jobs)
 
-    return result
+
+# return Mutual Information of every column of discretized X with discretized y
+def MI_codes(X_codes, X_n_codes, y_codes, y_n_codes, n_jobs=1):
+
+    def _MI(idx):
+        return _MI_codes(X_codes[:, idx], X_n_codes[idx], y_codes, y_n_codes)
+
+    if n_jobs == 1:
+        return [_MI(idx) for idx in range(X_codes.shape[1])]
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=None if n_jobs == -1 else n_jobs) as pool:
+        return list(pool.map(_MI, range(X_codes.shape[1])))
 
 
 # return t-statistics of dataset, only two groups dataset are suitable
@@ -193,6 +193,20 @@ parser.add_argument(
     type=bool,
     help="whether to print full status of the job",
 )
+parser.add_argument(
+    "--search_sample",
+    default=None,
+    type=float,
+    help="rows (>= 1) or fraction of rows (< 1) of train data used in search, "
+    "full train data are only used to fit the final ensemble",
+)
+parser.add_argument(
+    "--chunksize",
+    default=None,
+    type=int,
+    help="if provided, train data are read lazily by chunks of rows (requires test_data), "
+    "train data can be a directory of files with same columns",
+)
 parser.add_argument("--seed", default=1, type=int, help="random seed")
 args = parser.parse_args()
 
@@ -220,6 +234,12 @@ SEARCH_ALGO_SETTINGS = args.search_algo_settings
 SEARCH_SCHEDULER = args.search_scheduler
 PROGRESS_REPORTER = args.progress_reporter
 FULL_STATUS = args.full_status
+SEARCH_SAMPLE = (
+    None
+    if args.search_sample is None
+    else (int(args.search_sample) if args.search_sample >= 1 else args.search_sample)
+)
+CHUNKSIZE = args.chunksize
 SEED = args.seed
 
 if __name__ == "__main__":
@@ -230,8 +250,29 @@ if __name__ == "__main__":
     response = args.response
 
     print("Train/Test identification.")
+    # if chunksize provided, train data (file or directory of files) are read lazily
+    # only a sample of rows is read for search, the final ensemble is fitted by chunks
+    # if pipelines support it, otherwise full data are read
+    if CHUNKSIZE is not None:
+        if test == "":
+            raise ValueError("Reading train data by chunks requires test_data!")
+        database = load_data(lazy=True, chunksize=CHUNKSIZE).load(
+            args.data_folder, [train, test]
+        )
+
+        # check whether train/test set share same columns
+        if set(database[train].get_columns()) != set(database[test].get_columns()):
+            raise DatabaseError("Train/Test datasets have different columns!")
+
+        features = database[train].get_columns()
+        features.remove(response)
+
+        # pass reader and response name to the model
+        train_X, train_y = database[train], response
+        test_data = database[test].read()
+        test_X, test_y = test_data[features], test_data[[response]]
     # if test_data provided, use train/test data seperately
-    if test != "":
+    elif test != "":
         database = load_data().load(args.data_folder, [train, test])
 
         # check whether train/test set share same columns
@@ -279,6 +320,7 @@ if __name__ == "__main__":
         search_scheduler=SEARCH_SCHEDULER,
         progress_reporter=PROGRESS_REPORTER,
         full_status=FULL_STATUS,
+        search_sample=SEARCH_SAMPLE,
         seed=SEED,
     )
 
@@ -304,7 +346,7 @@ if __name__ == "__main__":
     }
 
     if args.test_eval == "auto":
-        _type = type_of_task(train_y)
+        _type = type_of_task(test_y if isinstance(train_y, str) else train_y)
         if _type in ["binary", "multiclass"]:
             args.test_eval = "accuracy"
         elif _type in ["integer", "continuous"]:
@@ -73,3 +73,108 @@ class TestScaling(unittest.TestCase):
                     True,
                     "The method {} is not correctly fitted.".format(method_name),
                 )
+
+
+def test_Smote():
+
+    from My_AutoML._balancing import Smote
+
+    X = pd.DataFrame(
+        np.random.normal(0, 10, (200, 5)),
+        columns=["col_" + str(i) for i in range(5)],
+    )
+    y = pd.DataFrame([1 for _ in range(180)] + [0 for _ in range(20)], columns=["col_y"])
+
+    for generation in ["mean", "random"]:
+        mol = Smote(imbalance_threshold=0.8, k=3, generation=generation)
+        _X, _y = mol.fit_transform(X, y)
+
+        # synthetic samples are generated only for the minority class
+        assert len(_X) == len(_y) == 225
+        assert (_y["col_y"] == 1).mean() <= 0.8
+        assert set(_y["col_y"].unique()) == {0, 1}
+        # synthetic samples lie between two minority samples
+        _minority = X.loc[y["col_y"] == 0]
+        assert (_X.iloc[200:].min() >= _minority.min() - 1e-8).all()
+        assert (_X.iloc[200:].max() <= _minority.max() + 1e-8).all()
+
+
+def test_SimpleRandomSampling():
+
+    from My_AutoML._balancing import (
+        SimpleRandomOverSampling,
+        SimpleRandomUnderSampling,
+    )
+
+    X = pd.DataFrame(
+        np.random.normal(0, 10, (200, 5)),
+        columns=["col_" + str(i) for i in range(5)],
+    )
+    y = pd.DataFrame([1 for _ in range(180)] + [0 for _ in range(20)], columns=["col_y"])
+
+    # over-sampling replicates minority samples only
+    _X, _y = SimpleRandomOverSampling(imbalance_threshold=0.8).fit_transform(X, y)
+    assert len(_X) == len(_y) == 225
+    assert (_y["col_y"] == 1).sum() == 180
+    assert (_y["col_y"] == 1).mean() <= 0.8
+    assert set(map(tuple, _X.values)) == set(map(tuple, X.values))
+
+    # under-sampling removes majority samples only
+    _X, _y = SimpleRandomUnderSampling(imbalance_threshold=0.8).fit_transform(X, y)
+    assert len(_X) == len(_y) == 100
+    assert (_y["col_y"] == 0).sum() == 20
+    assert (_y["col_y"] == 1).mean() <= 0.8
+    assert not _X.duplicated().any()
+
+
+def test_NeighborIndex():
+
+    from sklearn.neighbors import NearestNeighbors
+    from My_AutoML._balancing._under_sampling import NeighborIndex
+
+    data = np.random.normal(0, 1, (300, 4))
+    index = NeighborIndex(data, norm="l2")
+
+    # same neighbors as brute force, sample itself excluded
+    _neighbors = index.query(np.arange(300), k=3)
+    _, _expected = NearestNeighbors(n_neighbors=4).fit(data).kneighbors(data)
+    assert (_neighbors == _expected[:, 1:]).all()
+
+    # removed samples and non-candidates are never returned
+    index.remove(np.arange(0, 300, 2))
+    candidates = np.arange(300) % 3 != 0
+    _neighbors = index.query(np.arange(300), k=2, candidates=candidates)
+    assert _neighbors.shape == (300, 2)
+    assert (_neighbors % 2 == 1).all() and (_neighbors % 3 != 0).all()
+    assert (_neighbors != np.arange(300)[:, None]).all()
+
+
+def test_neighbor_balancing():
+
+    from My_AutoML._balancing import balancings
+
+    X = pd.DataFrame(
+        np.random.normal(0, 1, (400, 4)),
+        columns=["col_" + str(i) for i in range(4)],
+    )
+    y = (
+        (X["col_0"] + np.random.normal(0, 0.5, 400) > 1.2).astype(int).to_frame("col_y")
+    )
+    for method_name in [
+        "TomekLink",
+        "EditedNearestNeighbor",
+        "CondensedNearestNeighbor",
+        "OneSidedSelection",
+        "CNN_TomekLink",
+    ]:
+        _X, _y = balancings[method_name](imbalance_threshold=0.8).fit_transform(X, y)
+
+        # only majority samples are removed
+        assert (_y["col_y"] == 1).sum() == (y["col_y"] == 1).sum()
+        assert len(_X) < len(X)
+        assert set(map(tuple, _X.values)) <= set(map(tuple, X.values))
+
+    for method_name in ["Smote_TomekLink", "Smote_ENN"]:
+        _X, _y = balancings[method_name](imbalance_threshold=0.8).fit_transform(X, y)
+        assert len(_X) == len(_y)
+        assert (_y["col_y"] == 0).mean() < (y["col_y"] == 0).mean()
@@ -38,6 +38,9 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+import os
+import pytest
+
 
 def test_load_data():
 
@@ -69,3 +72,52 @@ def test_load_data():
         assert set(database.keys()) == set(
             database_names
         ), "Not all databases are loaded."
+
+
+def test_data_reader():
+
+    import pandas as pd
+    from My_AutoML._base import load_data, DataReader
+
+    data = pd.read_csv("example/example_data/heart.csv")
+    database = load_data(lazy=True, chunksize=100).load("example/example_data", "heart")
+    reader = database["heart"]
+
+    assert isinstance(reader, DataReader), "Lazy load_data should return DataReader."
+    assert reader.get_columns() == list(data.columns)
+    assert pd.concat(list(reader.chunks())).equals(data), "Chunks are not correct."
+
+    # sample of rows keeps the order and values of rows in file
+    sample = reader.sample(n=50, seed=1)
+    assert len(sample) == 50 and sample.index.is_monotonic_increasing
+    assert sample.equals(data.loc[sample.index])
+    assert list(reader.sample(frac=0.5, columns=["Age"]).columns) == ["Age"]
+
+
+def test_data_reader_files(tmp_path):
+
+    import numpy as np
+    import pandas as pd
+    from My_AutoML._base import load_data, DataReader
+
+    data = pd.read_csv("example/example_data/heart.csv")
+    os.makedirs(tmp_path / "heart")
+    for idx, part in enumerate(np.array_split(np.arange(len(data)), 3)):
+        data.iloc[part].to_csv(
+            tmp_path / "heart" / "part_{}.csv".format(idx), index=False
+        )
+
+    # directory of files is read as one dataset
+    reader = load_data(lazy=True, chunksize=100).load(str(tmp_path), "heart")["heart"]
+    assert isinstance(reader, DataReader) and len(reader.files) == 3
+    assert reader.read().equals(data), "Files are not read as one dataset."
+    assert pd.concat(list(reader.chunks())).equals(data), "Chunks are not correct."
+
+    sample = reader.sample(n=50, seed=1)
+    assert len(sample) == 50 and sample.equals(data.loc[sample.index])
+
+    # glob pattern of files, files must share the columns
+    assert DataReader(str(tmp_path / "heart" / "part_*.csv")).read().equals(data)
+    data.iloc[:5, :3].to_csv(tmp_path / "heart" / "part_3.csv", index=False)
+    with pytest.raises(ValueError):
+        DataReader(str(tmp_path / "heart"))
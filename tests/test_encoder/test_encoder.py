@@ -97,3 +97,78 @@ def test_encoder_4():
 
     # check whether the method is fitted
     assert encoder._fitted == True, "The encoder is not correctly fitted."
+
+
+def test_encoder_codebook():
+
+    import numpy as np
+    import pandas as pd
+    from My_AutoML._encoding import DataEncoding
+
+    train = pd.DataFrame(
+        {
+            "col_1": ["b", "a", "c", np.nan, "a"],
+            "col_2": [1.0, 2.0, 3.0, 4.0, 5.0],
+        }
+    )
+    test = pd.DataFrame({"col_1": ["c", "d", np.nan, "a"], "col_2": [1.0, 2.0, 3.0, 4.0]})
+
+    # codes follow sorted categories, missing values kept
+    encoder = DataEncoding()
+    data = encoder.fit(train)
+    assert np.array_equal(data["col_1"].values, [1, 0, 2, np.nan, 0], equal_nan=True)
+    assert list(encoder.category["col_1"]) == ["a", "b", "c"]
+
+    # unseen categories are mapped to reserved code
+    assert np.array_equal(
+        encoder.refit(test)["col_1"].values, [2, np.nan, np.nan, 0], equal_nan=True
+    )
+    encoder = DataEncoding(unseen_code=-1)
+    encoder.fit(train)
+    assert np.array_equal(
+        encoder.refit(test)["col_1"].values, [2, -1, np.nan, 0], equal_nan=True
+    )
+
+    # dummy variables, dense and sparse
+    for sparse in [False, True]:
+        encoder = DataEncoding(dummy_coding=True, sparse=sparse)
+        encoder.fit(train)
+        data = encoder.refit(test)
+        assert list(data.columns) == ["col_2", "col_1_a", "col_1_b", "col_1_c"]
+        assert np.array_equal(
+            data[["col_1_a", "col_1_b", "col_1_c"]].astype(int).values,
+            [[0, 0, 1], [0, 0, 0], [0, 0, 0], [1, 0, 0]],
+        )
+
+
+def test_encoder_schema():
+
+    import numpy as np
+    import pandas as pd
+    from My_AutoML._encoding import DataEncoding
+
+    dates = pd.date_range("2000-01-01", periods=40).strftime("%m/%d/%Y")
+    train = pd.DataFrame(
+        {
+            "col_1": list(dates),
+            "col_2": [str(10000 + i * 7) for i in range(40)],  # zip-like strings
+            "col_3": np.arange(40.0),
+        }
+    )
+
+    encoder = DataEncoding()
+    data = encoder.fit(train)
+    assert encoder._schema["col_1"] == ("date", "%m/%d/%Y")
+    assert encoder._schema["col_2"][0] == "category"
+    assert encoder._schema["col_3"][0] == "numeric"
+    assert np.array_equal(
+        data["col_1"].values,
+        pd.to_datetime(dates, format="%m/%d/%Y").values.astype("int64").astype(float),
+    )
+
+    # refit applies the schema, unparsable dates become missing
+    test = train.iloc[:3].copy()
+    test.loc[1, "col_1"] = "not a date"
+    data = encoder.refit(test)
+    assert np.isnan(data["col_1"].values[1])
+    assert list(data["col_2"].values) == [0, 1, 2]
@@ -768,6 +768,419 @@ def test_objective_9():
     ), "Objective function should return training status."
 
 
+def test_preprocessing_cache():
+
+    import numpy as np
+    import pandas as pd
+    from My_AutoML._hpo._utils import PreprocessingCache
+
+    data = pd.DataFrame(np.zeros((1000, 128)))  # about 1 MB of data
+
+    cache = PreprocessingCache(max_size=2)
+    cache.put("1", data)
+    cache.put("2", data)
+    cache.get("1")  # make "1" most recently used
+    cache.put("3", data)
+
+    assert "1" in cache, "Most recently used result should be kept."
+    assert "2" not in cache, "Least recently used result should be evicted."
+    assert "3" in cache, "Latest result should be cached."
+    assert cache.get("2") is None, "Evicted result should not be found."
+    assert cache.hits == 1 and cache.misses == 1, "Cache statistics not correct."
+    assert cache.get("3") is data, "Cached results should not be copied."
+
+
+def test_objective_cache():
+
+    from My_AutoML._hpo._utils import TabularObjective, _PREPROCESSING_CACHE
+    from My_AutoML._encoding import DataEncoding
+    from My_AutoML._imputation import SimpleImputer
+    from My_AutoML._base import no_processing
+    from My_AutoML._scaling import Standardize
+    from My_AutoML._model import LogisticRegression
+
+    data = load_data().load("example/example_data", "heart")
+    data = data["heart"]
+
+    features = list(data.columns)
+    features.remove("HeartDisease")
+    response = ["HeartDisease"]
+
+    params = {
+        "encoder": {
+            "encoder_1": "DataEncoding",
+        },
+        "imputer": {
+            "imputer_1": "SimpleImputer",
+            "SimpleImputer_method": "mean",
+        },
+        "balancing": {"balancing_1": "no_processing"},
+        "scaling": {"scaling_2": "Standardize"},
+        "feature_selection": {"feature_selection_1": "no_processing"},
+        "model": {
+            "model_17": "LogisticRegression",
+            "LogisticRegression_penalty": "l2",
+            "LogisticRegression_tol": 1e-4,
+            "LogisticRegression_C": 1,
+        },
+    }
+
+    _PREPROCESSING_CACHE.clear()
+
+    clf = TabularObjective(
+        params,
+    )
+    clf.setup(
+        params,
+        _X=data[features],
+        _y=data[response],
+        encoder={"DataEncoding": DataEncoding},
+        imputer={"SimpleImputer": SimpleImputer},
+        balancing={"no_processing": no_processing},
+        scaling={"Standardize": Standardize},
+        feature_selection={"no_processing": no_processing},
+        models={"LogisticRegression": LogisticRegression},
+        model_name="obj_cache",
+        task_mode="classification",
+        objective="accuracy",
+        validation=True,
+        valid_size=0.15,
+        full_status=False,
+        reset_index=True,
+        _iter=1,
+        seed=1,
+    )
+    result_1 = clf.step()
+    hits = _PREPROCESSING_CACHE.hits
+
+    # change only the model, the preprocessing prefix should be reused
+    params["model"]["LogisticRegression_C"] = 0.5
+    clf.reset_config(params)
+    result_2 = clf.step()
+
+    assert (
+        _PREPROCESSING_CACHE.hits - hits == 5
+    ), "All preprocessing stages should be reused from cache."
+    assert clf.enc._fitted, "Cached encoder should be fitted."
+    assert isinstance(result_2["loss"], float), "Objective function should return loss."
+
+    # stages fitted on cached data do not change the cached data
+    _cached = {
+        key: [item.copy() for item in value[1][1] if item is not None]
+        for key, value in _PREPROCESSING_CACHE._cache.items()
+    }
+    params["imputer"]["SimpleImputer_method"] = "median"
+    clf.reset_config(params)
+    clf.step()
+    for key, items in _cached.items():
+        for item, cached_item in zip(
+            items,
+            [item for item in _PREPROCESSING_CACHE._cache[key][1][1] if item is not None],
+        ):
+            assert item.equals(cached_item), "Cached data should not be modified."
+
+
+def test_objective_multi_fidelity():
+
+    from My_AutoML._hpo._utils import TabularObjective
+    from My_AutoML._encoding import DataEncoding
+    from My_AutoML._imputation import SimpleImputer
+    from My_AutoML._base import no_processing
+    from My_AutoML._scaling import Standardize
+    from My_AutoML._model import LogisticRegression
+
+    data = load_data().load("example/example_data", "heart")
+    data = data["heart"]
+
+    features = list(data.columns)
+    features.remove("HeartDisease")
+    response = ["HeartDisease"]
+
+    params = {
+        "encoder": {
+            "encoder_1": "DataEncoding",
+        },
+        "imputer": {
+            "imputer_1": "SimpleImputer",
+            "SimpleImputer_method": "mean",
+        },
+        "balancing": {"balancing_1": "no_processing"},
+        "scaling": {"scaling_2": "Standardize"},
+        "feature_selection": {"feature_selection_1": "no_processing"},
+        "model": {
+            "model_17": "LogisticRegression",
+            "LogisticRegression_penalty": "l2",
+            "LogisticRegression_tol": 1e-4,
+            "LogisticRegression_C": 1,
+        },
+    }
+
+    setting = {
+        "_X": data[features],
+        "_y": data[response],
+        "encoder": {"DataEncoding": DataEncoding},
+        "imputer": {"SimpleImputer": SimpleImputer},
+        "balancing": {"no_processing": no_processing},
+        "scaling": {"Standardize": Standardize},
+        "feature_selection": {"no_processing": no_processing},
+        "models": {"LogisticRegression": LogisticRegression},
+        "model_name": "obj_fidelity",
+        "task_mode": "classification",
+        "objective": "accuracy",
+    }
+
+    # one-shot trial finishes after the first step
+    clf = TabularObjective(params)
+    clf.setup(params, trial_mode="one_shot", **setting)
+    result = clf.step()
+
+    assert result["done"], "One-shot trial should finish after one step."
+
+    # multi-fidelity trial finishes after n_fidelity steps
+    clf = TabularObjective(params)
+    clf.setup(params, trial_mode="multi_fidelity", n_fidelity=3, **setting)
+    results = [clf.step() for _ in range(3)]
+
+    assert [result["done"] for result in results] == [
+        False,
+        False,
+        True,
+    ], "Multi-fidelity trial should finish at the last fidelity."
+
+    # new configuration restarts from the lowest fidelity
+    clf.reset_config(params)
+
+    assert not clf.step()["done"], "Reset trial should start from lowest fidelity."
+
+
+def test_objective_shared_data():
+
+    from My_AutoML._hpo._utils import TabularObjective
+    from My_AutoML._encoding import DataEncoding
+    from My_AutoML._imputation import SimpleImputer
+    from My_AutoML._base import no_processing
+    from My_AutoML._scaling import Standardize
+    from My_AutoML._model import LinearRegression
+
+    data = load_data().load("example/example_data", "insurance")
+    data = data["insurance"]
+
+    features = list(data.columns)
+    features.remove("expenses")
+    response = ["expenses"]
+
+    X, y = data[features], data[response]
+    X_raw, y_raw = X.copy(), y.copy()
+
+    params = {
+        "encoder": {
+            "encoder_1": "DataEncoding",
+        },
+        "imputer": {
+            "imputer_1": "SimpleImputer",
+            "SimpleImputer_method": "mean",
+        },
+        "balancing": {"balancing_1": "no_processing"},
+        "scaling": {"scaling_2": "Standardize"},
+        "feature_selection": {"feature_selection_1": "no_processing"},
+        "model": {
+            "model_13": "LinearRegression",
+        },
+    }
+
+    for validation in [True, False]:
+        clf = TabularObjective(
+            params,
+        )
+        clf.setup(
+            params,
+            _X=X,
+            _y=y,
+            encoder={"DataEncoding": DataEncoding},
+            imputer={"SimpleImputer": SimpleImputer},
+            balancing={"no_processing": no_processing},
+            scaling={"Standardize": Standardize},
+            feature_selection={"no_processing": no_processing},
+            models={"LinearRegression": LinearRegression},
+            model_name="obj_shared",
+            task_mode="regression",
+            objective="MSE",
+            validation=validation,
+            cache_size=0,
+        )
+        clf.step()
+
+        # the shared data should not be changed by the trials
+        assert X.equals(X_raw), "Objective function should not modify features."
+        assert y.equals(y_raw), "Objective function should not modify response."
+
+
+def test_objective_save_preprocessed():
+
+    import os
+    import numpy as np
+    from My_AutoML._hpo._utils import TabularObjective
+    from My_AutoML._encoding import DataEncoding
+    from My_AutoML._imputation import SimpleImputer
+    from My_AutoML._base import no_processing
+    from My_AutoML._scaling import Standardize
+    from My_AutoML._model import LinearRegression
+
+    data = load_data().load("example/example_data", "insurance")
+    data = data["insurance"]
+
+    features = list(data.columns)
+    features.remove("expenses")
+    response = ["expenses"]
+
+    params = {
+        "encoder": {
+            "encoder_1": "DataEncoding",
+        },
+        "imputer": {
+            "imputer_1": "SimpleImputer",
+            "SimpleImputer_method": "mean",
+        },
+        "balancing": {"balancing_1": "no_processing"},
+        "scaling": {"scaling_2": "Standardize"},
+        "feature_selection": {"feature_selection_1": "no_processing"},
+        "model": {
+            "model_13": "LinearRegression",
+        },
+    }
+
+    for file in ["train_preprocessed.npy", "test_preprocessed.npy"]:
+        if os.path.exists(file):
+            os.remove(file)
+
+    for save_preprocessed in [False, "npy"]:
+        clf = TabularObjective(
+            params,
+        )
+        clf.setup(
+            params,
+            _X=data[features],
+            _y=data[response],
+            encoder={"DataEncoding": DataEncoding},
+            imputer={"SimpleImputer": SimpleImputer},
+            balancing={"no_processing": no_processing},
+            scaling={"Standardize": Standardize},
+            feature_selection={"no_processing": no_processing},
+            models={"LinearRegression": LinearRegression},
+            model_name="obj_save",
+            task_mode="regression",
+            objective="MSE",
+            validation=True,
+            save_preprocessed=save_preprocessed,
+        )
+        clf.step()
+        clf.cleanup()  # wait for background writing
+
+        if save_preprocessed:
+            assert os.path.exists(
+                "train_preprocessed.npy"
+            ), "Preprocessed train set should be saved."
+            assert np.load("test_preprocessed.npy").shape[1] == len(features) + 1
+        else:
+            assert not os.path.exists(
+                "train_preprocessed.npy"
+            ), "Preprocessed data should not be saved by default."
+
+
+def test_inference_plan():
+
+    import numpy as np
+    from My_AutoML._hpo._utils import Pipeline, ClassifierEnsemble
+    from My_AutoML._encoding import DataEncoding
+    from My_AutoML._imputation import SimpleImputer
+    from My_AutoML._scaling import Standardize
+    from My_AutoML._model import LogisticRegression, LDA
+
+    data = load_data().load("example/example_data", "heart")
+    data = data["heart"]
+
+    features = list(data.columns)
+    features.remove("HeartDisease")
+    X, y = data[features], data[["HeartDisease"]]
+
+    # pipelines share the fitted preprocessing
+    encoder, imputer, scaling = DataEncoding(), SimpleImputer(), Standardize()
+    _X = imputer.fill(encoder.fit(X))
+    _X = scaling.fit(_X).transform(_X)
+    pipelines = [
+        (
+            "pipe_{}".format(idx + 1),
+            Pipeline(
+                encoder=encoder,
+                imputer=imputer,
+                scaling=scaling,
+                model=model.fit(_X, y.values.ravel()),
+            ),
+        )
+        for idx, model in enumerate([LogisticRegression(), LDA()])
+    ]
+    ensemble = ClassifierEnsemble(estimators=pipelines, voting="soft").fit(X, y)
+
+    plan = ensemble.compile()
+    assert plan.n_stages == 3, "Shared preprocessing should only run once."
+
+    y_pred = ensemble.predict(X)
+    assert set(plan.latency_.keys()) == {
+        "encoder",
+        "imputer",
+        "scaling",
+        "feature_selection",
+        "model",
+    }, "Plan should report latency of every stage."
+    assert np.allclose(
+        np.asarray(plan.run(X, "predict_proba")),
+        np.asarray([pipeline.predict_proba(X) for (_, pipeline) in pipelines]),
+    ), "Plan should predict same as pipelines."
+
+    # micro-batching of single-row requests
+    preds = plan.predict_batch([X.iloc[idx] for idx in range(5)])
+    assert len(preds) == 5, "Batch prediction should return one per request."
+    assert np.all(
+        np.concatenate([pred.values for pred in preds]) == y_pred.values[:5]
+    ), "Batch prediction should be same as prediction."
+
+    # single pipeline predicts by the plan, owned results are not copied
+    pipeline = pipelines[0][1]
+    _calls = []
+    _transform = type(scaling).transform
+
+    def _record(self, X, out=None):
+        _calls.append(self.deep_copy)
+        return _transform(self, X, out=out)
+
+    type(scaling).transform = _record
+    try:
+        X_before = X.copy()
+        y_prob = pipeline.predict_proba(X)
+    finally:
+        type(scaling).transform = _transform
+    assert pipeline.compile() is pipeline._plan, "Plan should be compiled once."
+    assert _calls == [False], "Owned data should be transformed without copy."
+    assert scaling.deep_copy and imputer.deep_copy, "deep_copy should be restored."
+    assert X.equals(X_before), "Input data should not be modified."
+    assert np.allclose(
+        y_prob,
+        pipeline.model.predict_proba(
+            scaling.transform(imputer.transform(encoder.refit(X)))
+        ),
+    ), "Pipeline should predict same as running the stages."
+
+    # data passed through unchanged is not owned by the next stage
+    from My_AutoML._base import no_processing
+
+    _X = imputer.transform(encoder.refit(X)).astype(float)
+    X_before = _X.copy()
+    Pipeline(
+        imputer=no_processing().fit(_X), scaling=scaling, model=pipeline.model
+    ).fit(_X, y).predict(_X)
+    assert _X.equals(X_before), "Input data should not be modified."
+
+
 def test_heart():
 
     # test load_data here
@@ -926,3 +1339,145 @@ def test_stroke_with_limit():
     mol.fit(data[features], data[response])
 
     assert mol._fitted == True, "AutoTabular with limited space failed to fit."
+
+
+def test_heart_search_sample():
+
+    from My_AutoML._base import DataReader
+
+    reader = load_data(lazy=True).load("example/example_data", "heart")["heart"]
+
+    mol = My_AutoML.AutoTabular(
+        model_name="heart_sample",
+        search_algo="GridSearch",
+        timeout=60,
+        search_sample=300,
+    )
+    # search on 300 rows, final ensemble fitted on full data
+    mol.fit(reader, "HeartDisease")
+
+    data = reader.read()
+    features = list(data.columns)
+    features.remove("HeartDisease")
+    y_pred = mol.predict(data[features])
+
+    assert mol._fitted == True, "Classification for Heart data failed to fit."
+    assert mol.model._refit == True, "Pipelines are not refitted on full data."
+    assert len(y_pred) == len(data), "Prediction length not correct."
+
+
+def test_fit_reader(monkeypatch):
+
+    import numpy as np
+    import pytest
+    import My_AutoML._hpo._base as hpo_base
+    from My_AutoML._hpo._utils import Pipeline, ClassifierEnsemble
+    from My_AutoML._encoding import DataEncoding
+    from My_AutoML._imputation import SimpleImputer
+    from My_AutoML._base import no_processing
+    from My_AutoML._scaling import Standardize
+    from My_AutoML._model import GaussianNB, RandomForestClassifier
+
+    reader = load_data(lazy=True, chunksize=200).load("example/example_data", "heart")[
+        "heart"
+    ]
+    data = reader.read()
+    features = list(data.columns)
+    features.remove("HeartDisease")
+    X, y = data[features], data[["HeartDisease"]]
+
+    def _pipeline(imputer, model):
+        return Pipeline(
+            encoder=DataEncoding(),
+            imputer=imputer,
+            balancing=no_processing(),
+            scaling=Standardize(),
+            feature_selection=no_processing(),
+            model=model,
+        )
+
+    def _read(columns=None):
+        raise AssertionError("Full data should not be read.")
+
+    mol = hpo_base.AutoTabularBase(task_mode="classification")
+
+    # all stages support partial_fit, pipelines are fitted by chunks
+    mol._ensemble = ClassifierEnsemble(
+        estimators=[
+            ("pipe_1", _pipeline(no_processing(), GaussianNB())),
+            ("pipe_2", _pipeline(no_processing(), RandomForestClassifier())),
+        ]
+    )
+    with monkeypatch.context() as m:
+        m.setattr(reader, "read", _read)
+        mol._fit_reader(reader, features, ["HeartDisease"], row_bytes=100)
+    assert mol._ensemble._fitted and len(mol._ensemble.predict(X)) == len(X)
+    assert np.allclose(
+        mol._ensemble.estimators[0][1].predict_proba(X),
+        _pipeline(no_processing(), GaussianNB()).fit(X, y).predict_proba(X),
+    ), "Pipeline fitted by chunks should be same as fitted on full data."
+
+    # imputer can not be fitted by chunks, refuse if full data not fit in memory
+    mol._ensemble = ClassifierEnsemble(
+        estimators=[("pipe_1", _pipeline(SimpleImputer(), GaussianNB()))]
+    )
+    monkeypatch.setattr(hpo_base, "available_memory", lambda: 1024)
+    with pytest.raises(MemoryError):
+        mol._fit_reader(reader, features, ["HeartDisease"], row_bytes=100)
+    monkeypatch.setattr(hpo_base, "available_memory", lambda: 1024 ** 3)
+    mol._fit_reader(reader, features, ["HeartDisease"], row_bytes=100)
+    assert mol._ensemble._fitted and len(mol._ensemble.predict(X)) == len(X)
+
+
+def test_fit_reader_chunk_classes(tmp_path, monkeypatch):
+
+    import pandas as pd
+    import pytest
+    import My_AutoML._hpo._base as hpo_base
+    from My_AutoML._hpo._utils import Pipeline, ClassifierEnsemble
+    from My_AutoML._encoding import DataEncoding
+    from My_AutoML._base import no_processing, DataReader
+    from My_AutoML._scaling import Standardize
+    from My_AutoML._model import RandomForestClassifier
+
+    # sorted by response, some chunks only have one class
+    data = pd.read_csv("example/example_data/heart.csv")
+    data = data.sort_values("HeartDisease").reset_index(drop=True)
+    data.to_csv(tmp_path / "heart.csv", index=False)
+    reader = DataReader(str(tmp_path / "heart.csv"), chunksize=200)
+    features = list(data.columns)
+    features.remove("HeartDisease")
+
+    def _pipeline():
+        return Pipeline(
+            encoder=DataEncoding(),
+            imputer=no_processing(),
+            balancing=no_processing(),
+            scaling=Standardize(),
+            feature_selection=no_processing(),
+            model=RandomForestClassifier(),
+        )
+
+    # forest can not be fitted by chunks lacking a class
+    assert _pipeline().stream_blockers(chunk_classes=False) == ["model"]
+    with pytest.raises(ValueError):
+        _pipeline().fit_chunks(
+            lambda: (
+                (_chunk[features], _chunk[["HeartDisease"]])
+                for _chunk in reader.chunks()
+            ),
+            n_rows=len(data),
+            classes=[0, 1],
+            chunk_classes=True,
+        )
+
+    # full data are read instead
+    mol = hpo_base.AutoTabularBase(task_mode="classification")
+    mol._ensemble = ClassifierEnsemble(estimators=[("pipe_1", _pipeline())])
+    monkeypatch.setattr(hpo_base, "available_memory", lambda: 1024**3)
+    mol._fit_reader(reader, features, ["HeartDisease"], row_bytes=100)
+    assert len(mol._ensemble.predict(data[features])) == len(data)
+    assert mol._ensemble.estimators[0][1].predict_proba(data[features]).shape == (
+        len(data),
+        2,
+    )
@@ -247,3 +247,416 @@ def test_kNNImputer():
 #     assert (
 #         fill_data.isnull().any().any() == False
 #     ), "The imputation method {} fail to impute all missings.".format("k_Prototype_NN")
+
+
+def test_JointImputer():
+
+    from My_AutoML._imputation import JointImputer
+
+    np.random.seed(1)
+    data = pd.DataFrame(
+        np.random.multivariate_normal(
+            mean=[0, 1, 2],
+            cov=[[1, 0.9, 0.5], [0.9, 1, 0.4], [0.5, 0.4, 1]],
+            size=2000,
+        ),
+        columns=["col_1", "col_2", "col_3"],
+    )
+    missing = data.copy()
+    missing.loc[missing.index[::5], "col_2"] = np.nan
+    missing.loc[missing.index[1::7], ["col_1", "col_3"]] = np.nan
+
+    imputer = JointImputer()
+    imputer.fit(missing)
+    filled_data = imputer.transform(missing)
+
+    assert imputer._fitted == True, "The method JointImputer is not correctly fitted."
+    assert (
+        filled_data.isnull().any().any() == False
+    ), "The imputation method JointImputer fail to impute all missings."
+    # observed values are not changed
+    assert filled_data[~missing.isnull()].equals(missing[~missing.isnull()])
+    # imputed values should follow conditional distribution
+    _index = missing.index[::5]
+    assert (
+        np.corrcoef(filled_data.loc[_index, "col_2"], data.loc[_index, "col_2"])[0, 1]
+        > 0.7
+    ), "The imputation method JointImputer fail to use the conditional distribution."
+
+
+def test_clustering_distance():
+
+    from My_AutoML._imputation._clustering import (
+        nan_distance,
+        category_dissimilarity,
+    )
+
+    X = np.random.rand(50, 4)
+    X[np.random.rand(50, 4) < 0.2] = np.nan
+    centroids = np.random.rand(3, 4)
+    centroids[0, 1] = np.nan
+
+    # compare with row by row calculation
+    for distance in ["l1", "l2"]:
+        expected = np.array(
+            [
+                [
+                    np.sqrt(np.nansum((row - center) ** 2))
+                    if distance == "l2"
+                    else np.nansum(np.abs(row - center))
+                    for center in centroids
+                ]
+                for row in X
+            ]
+        )
+        assert np.allclose(nan_distance(X, centroids, distance=distance), expected)
+        assert np.allclose(
+            nan_distance(
+                X, centroids, distance=distance, dtype=np.float32, batch_size=7
+            ),
+            expected,
+            atol=1e-5,
+        ), "The float32/batched distance is not correct."
+
+    codes = np.random.randint(0, 3, size=(20, 2)).astype(float)
+    codes[0, 0] = np.nan
+    centroid_codes = np.array([[0, 1], [2, 2]], dtype=float)
+    dissimilarity = category_dissimilarity(codes, centroid_codes, batch_size=3)
+    assert np.array_equal(
+        dissimilarity,
+        (codes[:, None, :] != centroid_codes[None, :, :]).sum(axis=2),
+    )
+
+    # weighted dissimilarity, missing categories have no weight
+    counts = np.full(codes.shape, 2.0)
+    counts[0, 0] = 0
+    weighted = category_dissimilarity(
+        codes, centroid_codes, counts, np.full(centroid_codes.shape, 4.0)
+    )
+    assert np.allclose(weighted[1:], dissimilarity[1:] * 0.75)
+
+
+def test_neighbor_index():
+
+    from My_AutoML._imputation._clustering import AAI_kNN, NeighborIndex
+
+    train = np.random.rand(40, 5)
+    train[np.random.rand(40, 5) < 0.2] = np.nan
+    test = np.random.rand(6, 5)
+    test[0, 2] = np.nan
+    candidates = ~np.isnan(train[:, 2])
+
+    for similarity in ["PCC", "COS"]:
+        imputer = AAI_kNN(similarity=similarity)
+        measure = (
+            imputer.Pearson_Correlation_Coefficient
+            if similarity == "PCC"
+            else imputer.Cosine_based_similarity
+        )
+
+        positions, k_similarity = NeighborIndex(
+            train, similarity=similarity, batch_size=4
+        ).query(test, 3, candidates=candidates)
+
+        for row, _positions, _similarity in zip(test, positions, k_similarity):
+            # compare with row by row similarity
+            expected = np.array(
+                [measure(row, train[i]) if candidates[i] else -np.inf for i in range(40)]
+            )
+            assert np.array_equal(
+                np.sort(_positions), np.sort(np.argsort(expected)[-3:])
+            ), "The neighbors of {} are not correct.".format(similarity)
+            assert np.allclose(_similarity, expected[_positions])
+            assert np.all(np.diff(_similarity) >= 0), "Similarity not ascending."
+
+        # default batches are limited by number of elements of similarity matrix
+        index = NeighborIndex(train, similarity=similarity)
+        index._batch_elements = 50
+        _positions, _similarity = index.query(test, 3, candidates=candidates)
+        assert np.allclose(_similarity, k_similarity)
+
+
+def test_imputer_transform():
+
+    from My_AutoML._imputation import imputers
+
+    np.random.seed(1)
+    data = pd.DataFrame(
+        np.random.normal(size=(200, 4)) * 10,
+        columns=["col_1", "col_2", "col_3", "col_4"],
+    )
+    data.loc[np.random.rand(200) < 0.1, "col_2"] = np.nan
+    data.loc[np.random.rand(200) < 0.1, "col_3"] = np.nan
+    train, test = data.iloc[:150], data.iloc[150:].copy()
+    # missing in column without missing values in train set
+    test.loc[test.index[:3], "col_1"] = np.nan
+
+    for method_name, method_object in zip(imputers.keys(), imputers.values()):
+
+        imputer = (
+            method_object(n_neighbors=3)
+            if method_name == "KNNImputer"
+            else method_object()
+        )
+        imputer.fit(train)
+        # fitted state not changed by transform
+        state = {
+            key: value
+            for key, value in vars(imputer).items()
+            if key in ["_models", "_imputer", "_mean", "_mu"]
+        }
+        filled_data = imputer.transform(test)
+
+        assert imputer._fitted == True, "The method {} is not correctly fitted.".format(
+            method_name
+        )
+        assert (
+            filled_data.isnull().any().any() == False
+        ), "The imputation method {} fail to impute all missings.".format(method_name)
+        assert filled_data[~test.isnull()].equals(
+            test[~test.isnull()]
+        ), "The imputation method {} changes observed values.".format(method_name)
+        for key, value in state.items():
+            assert (
+                vars(imputer)[key] is value
+            ), "The method {} is refitted in transform.".format(method_name)
+
+
+def test_MissForestImputer():
+
+    from My_AutoML._imputation import MissForestImputer
+
+    np.random.seed(1)
+    data = pd.DataFrame(
+        np.random.normal(size=(200, 3)),
+        columns=["col_1", "col_2", "col_3"],
+    )
+    # categorical column depending on col_1
+    data["col_4"] = (data["col_1"] > 0).astype(int) + 1
+    missing = data.copy()
+    missing.loc[missing.index[::6], "col_4"] = np.nan
+    missing.loc[missing.index[1::9], "col_2"] = np.nan
+
+    imputer = MissForestImputer(max_iter=3, n_estimators=20, n_jobs=1)
+    filled_data = imputer.fill(missing)
+
+    assert (
+        filled_data.isnull().any().any() == False
+    ), "The imputation method MissForestImputer fail to impute all missings."
+    # categorical column imputed by classifier, only observed classes
+    assert set(filled_data["col_4"].unique()) <= {1, 2}
+    assert (
+        filled_data.loc[missing.index[::6], "col_4"] == data.loc[data.index[::6], "col_4"]
+    ).mean() > 0.8
+    assert list(imputer._models.keys()) == ["col_2", "col_4"]
+
+
+def test_MICE():
+
+    from My_AutoML._imputation import MICE
+
+    np.random.seed(1)
+    data = pd.DataFrame(
+        np.random.normal(size=(300, 3)),
+        columns=["col_1", "col_2", "col_3"],
+    )
+    # linear and binary columns depending on col_1
+    data["col_4"] = 2 * data["col_1"] - data["col_2"]
+    data["col_5"] = (data["col_1"] > 0).astype(int)
+    missing = data.copy()
+    missing.loc[missing.index[::7], "col_4"] = np.nan
+    missing.loc[missing.index[1::5], "col_5"] = np.nan
+    missing.loc[missing.index[2::9], "col_2"] = np.nan
+
+    imputer = MICE(cycle=20)
+    filled_data = imputer.fill(missing)
+
+    assert (
+        filled_data.isnull().any().any() == False
+    ), "The imputation method MICE fail to impute all missings."
+    # converged before reaching the maximum cycles
+    assert imputer._n_cycle < 20
+    assert (
+        np.abs(
+            filled_data.loc[missing.index[::7], "col_4"]
+            - data.loc[data.index[::7], "col_4"]
+        ).median()
+        < 0.1
+    )
+    assert set(filled_data["col_5"].unique()) <= {0, 1}
+
+    # multiple imputations pooled
+    imputer = MICE(cycle=5, n_imputations=3, n_jobs=2)
+    filled_data = imputer.fill(missing)
+    assert len(imputer.imputations) == 3
+    assert filled_data.isnull().any().any() == False
+    assert imputer.transform(missing).isnull().any().any() == False
+
+
+def test_ExpectationMaximization():
+
+    from My_AutoML._imputation import ExpectationMaximization
+
+    np.random.seed(1)
+    data = pd.DataFrame(
+        np.random.multivariate_normal(
+            [1, 2, 3], [[1, 0.9, 0.5], [0.9, 1, 0.4], [0.5, 0.4, 1]], size=500
+        ),
+        columns=["col_1", "col_2", "col_3"],
+    )
+    missing = data.copy()
+    missing.loc[missing.index[::5], "col_1"] = np.nan
+    missing.loc[missing.index[1::7], "col_2"] = np.nan
+    missing.loc[missing.index[::11], "col_3"] = np.nan
+
+    imputer = ExpectationMaximization()
+    filled_data = imputer.fill(missing)
+
+    assert (
+        filled_data.isnull().any().any() == False
+    ), "The imputation method ExpectationMaximization fail to impute all missings."
+    # observed log-likelihood never decreases
+    assert np.all(np.diff(imputer.loglikelihood) >= -1e-6)
+    assert len(imputer.loglikelihood) < 50
+    # conditional expectation uses the correlated feature
+    assert (
+        np.abs(
+            filled_data.loc[missing.index[::5], "col_1"]
+            - data.loc[data.index[::5], "col_1"]
+        ).mean()
+        < 0.5
+    )
+    assert np.allclose(imputer.transform(missing), filled_data)
+
+
+def test_CMI_transform():
+
+    from My_AutoML._imputation._clustering import CMI
+
+    np.random.seed(1)
+    data = pd.DataFrame(
+        np.random.normal(size=(100, 3)), columns=["col_1", "col_2", "col_3"]
+    )
+    data.loc[np.random.rand(100) < 0.15, "col_2"] = np.nan
+    train = data.iloc[:60]
+    test_1 = data.iloc[60:80].reset_index(drop=True)
+    test_2 = data.iloc[80:].reset_index(drop=True)
+
+    imputer = CMI(k=3, threads=1)
+    imputer.fit(train)
+
+    # transform does not change the train group assignment
+    filled_data = imputer.transform(test_2)
+    imputer.transform(test_1)
+    assert len(imputer.group_assign_train) == 60
+    assert imputer.transform(test_2).equals(filled_data)
+    assert filled_data.isnull().any().any() == False
+
+
+def test_AAI_kNN(monkeypatch):
+
+    from My_AutoML._imputation import _clustering
+
+    np.random.seed(1)
+    data = pd.DataFrame(
+        np.random.normal(size=(200, 4)), columns=["col_1", "col_2", "col_3", "col_4"]
+    )
+    data.loc[np.random.rand(200) < 0.1, "col_2"] = np.nan
+    data.loc[np.random.rand(200) < 0.1, "col_3"] = np.nan
+
+    for AutAI_tmp in [True, False]:
+        imputer = _clustering.AAI_kNN(AutAI_tmp=AutAI_tmp, threads=1)
+        filled_data = imputer.fill(data)
+
+        assert filled_data.isnull().any().any() == False
+        assert np.allclose(filled_data[data.notnull()].fillna(0), data.fillna(0))
+        assert imputer.transform(data.iloc[:20]).isnull().any().any() == False
+
+    # count the neighbor indexes built in fit
+    n_index = []
+
+    class CountedIndex(_clustering.NeighborIndex):
+        def __init__(self, *args, **kwargs):
+            n_index.append(1)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(_clustering, "NeighborIndex", CountedIndex)
+
+    imputer = _clustering.AAI_kNN(threads=2)
+    filled_data = imputer.fill(data)
+
+    # indexes of data, AutAI completed data and imputed train set, built once
+    # for all pool tasks
+    assert len(n_index) == 3, "Neighbor index is not built once per fit."
+    assert filled_data.isnull().any().any() == False
+
+
+def test_clustering_categorical_codes():
+
+    from My_AutoML._imputation._clustering import AAI_kNN, CMI, k_Prototype_NN
+
+    # categorical column determines the numerical columns
+    np.random.seed(1)
+    cat = np.array(["a", "b"])[np.random.randint(0, 2, 60)]
+    train = pd.DataFrame(
+        {
+            "cat": cat,
+            "col_1": np.where(cat == "a", 0.0, 10.0) + np.random.normal(0, 0.1, 60),
+            "col_2": np.where(cat == "a", 0.0, 10.0) + np.random.normal(0, 0.1, 60),
+        }
+    )
+    train.loc[[3, 7], "col_1"] = np.nan
+    # categories appear in different order than train set
+    test = pd.DataFrame(
+        {"cat": ["a", "b", "b"], "col_1": [0.0, np.nan, np.nan], "col_2": [0, 10, 10]}
+    )
+
+    for imputer in [
+        AAI_kNN(threads=1),
+        CMI(k=2, threads=1),
+        k_Prototype_NN(k=2, threads=1),
+    ]:
+        imputer.fill(train.copy())
+        filled_data = imputer.transform(test.copy())
+
+        assert list(filled_data["cat"]) == ["a", "b", "b"]
+        assert filled_data.isnull().any().any() == False
+        # codes of test set follow the train set, neighbors are of same category
+        # (kernel weights of CMI mix the categories)
+        if not isinstance(imputer, CMI):
+            assert np.all(
+                filled_data.loc[1:, "col_1"] > 5
+            ), "{} uses wrong codes.".format(type(imputer).__name__)
+
+
+def test_k_Prototype_NN_models(monkeypatch):
+
+    from My_AutoML._imputation import _clustering
+
+    np.random.seed(1)
+    data = pd.DataFrame(
+        np.random.normal(size=(60, 3)), columns=["col_1", "col_2", "col_3"]
+    )
+    data["cat"] = np.array(["a", "b", "c"])[np.random.randint(0, 3, 60)]
+    data.loc[np.random.rand(60) < 0.1, "col_2"] = np.nan
+
+    # record the states sent with imputation tasks
+    states = []
+    _map = _clustering.SharedPool.map
+
+    def _recorded_map(self, method, iterable, *args, state={}, copy_data=False):
+        if method == "_kNN_impute":
+            states.append(state)
+        return _map(self, method, iterable, *args, state=state, copy_data=copy_data)
+
+    monkeypatch.setattr(_clustering.SharedPool, "map", _recorded_map)
+
+    imputer = _clustering.k_Prototype_NN(k=2, threads=2)
+    imputer.fill(data)
+    models = imputer.models
+    filled_data = imputer.transform(data.iloc[:20])
+
+    # fitted models are not sent with every task, and kept after transform
+    assert states == [{}, {}], "Models should not be sent with tasks."
+    assert imputer.models is models and len(models) == 2
+    assert filled_data.isnull().any().any() == False
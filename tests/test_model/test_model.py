@@ -255,6 +255,45 @@ def test_add_classifier():
     assert mol._fitted == True, "Model ComplementNB has not been fitted."
 
 
+def test_iterative_fit():
+
+    from My_AutoML._model._sklearn import (
+        RandomForestClassifier,
+        ExtraTreesRegressor,
+        HistGradientBoostingClassifier,
+    )
+
+    data = pd.read_csv("example/example_data/heart.csv")
+    # encoding categorical features
+    encoder = formatting()
+    encoder.fit(data)
+
+    # X/y split
+    X = data.iloc[:, :-1]
+    y = data.iloc[:, -1]
+
+    for method in [RandomForestClassifier, ExtraTreesRegressor]:
+        mol = method()
+        mol.iterative_fit(X, y, n_iter=4)
+        _tree = mol.estimator.estimators_[0]
+        mol.iterative_fit(X, y, n_iter=8)
+
+        # earlier trees are kept, only new trees are fitted
+        assert len(mol.estimator.estimators_) == 12, "Trees should be added."
+        assert mol.estimator.estimators_[0] is _tree, "Earlier trees should be kept."
+        assert mol._fitted == False, "Model should not be fully fitted."
+
+        mol.iterative_fit(X, y, n_iter=mol.max_iter)
+        assert len(mol.estimator.estimators_) == mol.max_iter
+        assert mol._fitted == True, "Model should be fully fitted at max_iter."
+
+    mol = HistGradientBoostingClassifier()
+    mol.iterative_fit(X, y, n_iter=4)
+    mol.iterative_fit(X, y, n_iter=4)
+
+    assert mol.estimator.n_iter_ <= 8, "Iterations should be added by warm start."
+
+
 def test_add_regressor():
 
     # from My_AutoML._model._sklearn import HistGradientBoostingRegressor
@@ -151,3 +151,43 @@ def test_feature_truncation():
     assert (
         (capped_data_2 <= transformer.quantile_list).all().all()
     ), "The feature truncation is not correctly done."
+
+
+def test_scaling_partial_fit():
+
+    from My_AutoML._scaling import Standardize, Normalize, MinMaxScale
+
+    data = pd.DataFrame(
+        np.random.RandomState(1).normal(2, 3, size=(300, 3)),
+        columns=["col_1", "col_2", "col_3"],
+    )
+    data.iloc[::5, 1] = np.nan
+
+    # statistics accumulated by chunks equal statistics of all data
+    for method in [Standardize, Normalize, MinMaxScale]:
+        full = method().fit(data)
+        stream = method()
+        for start in range(0, 300, 70):
+            stream.partial_fit(data.iloc[start : start + 70])
+        assert np.allclose(full.transform(data), stream.transform(data), equal_nan=True)
+
+    mol = Standardize().fit(data)
+    assert np.allclose(mol._mean, data.mean())
+    assert np.allclose(mol._std, data.std())
+
+    # float32 output, preallocated output and in place transform
+    assert mol.transform(data.astype(np.float32)).dtypes.eq(np.float32).all()
+    assert Standardize(dtype="float32").fit_transform(data).dtypes.eq(np.float32).all()
+    out = np.empty(data.shape)
+    scaled_data = mol.transform(data, out=out)
+    assert np.shares_memory(scaled_data.values, out)
+    _data = data.copy()
+    Standardize(deep_copy=False).fit_transform(_data)
+    assert np.allclose(_data, scaled_data, equal_nan=True)
+
+    # integer data are cast to float without copy argument errors
+    _int_data = pd.DataFrame(np.arange(12).reshape(4, 3), columns=data.columns)
+    for method in [Standardize, Normalize, MinMaxScale]:
+        assert (
+            method(deep_copy=False).partial_fit(_int_data).transform(_int_data)
+        ).dtypes.eq(np.float64).all()
@@ -296,6 +296,32 @@ def test_nan_cov():
         nan_cov(pd.DataFrame([4, 5, 6, np.nan, 1, np.nan]))[0, 0] == 2.8
     ), "nan_cov returns not as expected."
 
+    X = np.random.normal(size=(100, 10))
+    X[np.random.random(size=(100, 10)) < 0.1] = np.nan
+
+    assert np.allclose(
+        nan_cov(X, pairwise=True), pd.DataFrame(X).cov().values
+    ), "pairwise nan_cov should match pandas covariance."
+    assert np.allclose(
+        nan_cov(X, chunk_size=3), nan_cov(X)
+    ), "nan_cov by chunks should match full calculation."
+
+
+def test_nan_corr():
+
+    from My_AutoML._utils._stat import nan_corr, Pearson_Corr
+
+    X = np.random.normal(size=(100, 10))
+    X[np.random.random(size=(100, 10)) < 0.1] = np.nan
+    y = pd.DataFrame(np.random.normal(size=(100, 1)))
+
+    assert np.allclose(
+        nan_corr(X, pairwise=True), pd.DataFrame(X).corr().values
+    ), "pairwise nan_corr should match pandas correlation."
+    assert np.allclose(
+        Pearson_Corr(pd.DataFrame(X), y), nan_corr(X, y)[:, 0]
+    ), "Pearson_Corr returns not as expected."
+
 
 def test_class_means():
 
@@ -351,6 +377,19 @@ def test_MI():
 
     assert len(mi) == 2, "MI should return a list of length 2, get {}".format(len(mi))
 
+    # MI of a variable with itself is its entropy
+    X = pd.DataFrame({"X_1": [0, 0, 1, 1], "X_2": [0, 1, 0, 1]})
+    y = pd.Series([0, 0, 1, 1])
+
+    assert np.allclose(
+        MI(X, y), [np.log(2), 0]
+    ), "MI returns not as expected, get {}.".format(MI(X, y))
+    assert np.allclose(MI(X, y), MI(X, y, n_jobs=2)), "Parallel MI should match."
+    assert np.allclose(
+        MI(pd.DataFrame({"X_1": np.arange(100)}), y=np.arange(100) // 50, bins=2),
+        [np.log(2)],
+    ), "MI with histogram bins returns not as expected."
+
 
 def test_t_score():
 
@@ -487,6 +526,79 @@ def test_save_model():
     assert os.path.exists("model_name") == True, "The model is not saved."
 
 
+def test_model_store():
+
+    import pickle
+    import shutil
+    from sklearn.ensemble import RandomForestClassifier
+    from My_AutoML._utils._file import ModelStore, StoredComponent
+
+    X = np.random.random(size=(100, 5))
+    y = np.random.randint(0, 2, size=100)
+    model = RandomForestClassifier(n_estimators=5, random_state=1).fit(X, y)
+
+    if os.path.isdir("tmp_model_store"):
+        shutil.rmtree("tmp_model_store")
+    store = ModelStore("tmp_model_store")
+    store.save("trial_1", {"scaling": X.mean(axis=0), "model": model})
+    store.save("trial_2", {"scaling": X.mean(axis=0), "model": model})
+
+    # identical components are only stored once
+    assert len(os.listdir("tmp_model_store/objects")) == 2, "Components not deduplicated."
+    assert set(store.manifest().keys()) == {"trial_1", "trial_2"}
+
+    components = store.load("trial_1")
+    assert isinstance(
+        components["model"], StoredComponent
+    ), "Components should be loaded lazily."
+    assert components["model"]._object is None
+    assert np.all(
+        components["model"].predict(X) == model.predict(X)
+    ), "Loaded model predicts differently."
+
+    # pickle only keeps the reference to the component
+    _reference = pickle.loads(pickle.dumps(components["model"]))
+    assert _reference._object is None
+    assert np.all(_reference.predict_proba(X) == model.predict_proba(X))
+
+    shutil.rmtree("tmp_model_store")
+
+
+def test_model_store_relocate(tmp_path, monkeypatch):
+
+    import shutil
+    from sklearn.ensemble import RandomForestClassifier
+    from My_AutoML._utils._file import (
+        ModelStore,
+        StoredComponent,
+        save_methods,
+        load_methods,
+    )
+
+    X = np.random.random(size=(100, 5))
+    y = np.random.randint(0, 2, size=100)
+    model = RandomForestClassifier(n_estimators=5, random_state=1).fit(X, y)
+
+    # save model with relative paths, as the final model of AutoTabular
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("fit")
+    monkeypatch.chdir(tmp_path / "fit")
+    store = ModelStore("model_store")
+    store.save("trial_1", {"model": model})
+    save_methods("model", [store.load("trial_1")])
+
+    # load and predict from another working directory
+    monkeypatch.chdir(tmp_path)
+    [components] = load_methods("fit/model")
+    assert isinstance(components["model"], StoredComponent)
+    assert np.all(components["model"].predict(X) == model.predict(X))
+
+    # model and store moved together are still loadable
+    shutil.move(str(tmp_path / "fit"), str(tmp_path / "moved"))
+    [components] = load_methods("moved/model")
+    assert np.all(components["model"].predict(X) == model.predict(X))
+
+
 def test_formatting():
 
     from My_AutoML._utils._data import formatting
@@ -503,6 +615,30 @@ def test_formatting():
     assert True, "The formatting is not correctly done."
 
 
+def test_formatting_round_trip():
+
+    from My_AutoML._utils._data import formatting
+
+    data = pd.DataFrame(
+        {
+            "col_1": [1, 2, 3, np.nan],
+            "col_2": ["John", np.nan, "Amy", "John"],
+            "col_3": ["b", "NA", "a", "b"],
+        }
+    )
+
+    formatter = formatting()
+    formatter.fit(data)
+    # codes follow order of appearance, missing types kept
+    assert np.array_equal(data["col_2"].values, [0, np.nan, 1, 0], equal_nan=True)
+    assert list(data["col_3"]) == [0, "NA", 1, 0]
+
+    # unseen codes are mapped to the nearest code, ties to the smaller one
+    data["col_2"] = [2.6, np.nan, 0.5, -1]
+    formatter.refit(data)
+    assert list(data["col_2"].fillna("missing")) == ["Amy", "missing", "John", "John"]
+
+
 def test_get_missing_matrix():
 
     from My_AutoML._utils._data import get_missing_matrix